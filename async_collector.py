@@ -0,0 +1,149 @@
+import asyncio
+from contextlib import nullcontext
+from functools import partial
+
+from ingest import INVALID_ITEM
+
+# Поштучные добавления, которые объединяются в один пакетный вызов
+BULK_METHODS = {'add_new_book': 'add_new_books', 'add_new_movie': 'add_new_movies',
+                'add_title': 'add_titles'}
+
+
+class AsyncCollector:
+    """
+    Асинхронный фасад над BooksCollector / MovieCollector.
+    Каждый публичный метод коллекции доступен как корутина:
+    - чтения (READ_METHODS) выполняются сразу и не ждут очередь записей
+    - изменения (WRITE_METHODS) ставятся в очередь единственной задачи-писателя,
+      которая применяет накопившиеся операции пачкой: подряд идущие
+      add_new_* сворачиваются в один вызов add_new_*s, а для
+      Concurrent*Collector блокировка записи берется один раз на пачку
+    Корутина изменения завершается после того, как операция применена.
+    """
+
+    def __init__(self, collector, max_batch=1000, linger=0):
+        self._collector = collector
+        self._read_methods = frozenset(type(collector).READ_METHODS)
+        self._write_methods = frozenset(type(collector).WRITE_METHODS)
+        self._max_batch = max_batch
+        self._linger = linger  # Пауза перед сбором пачки, чтобы накопить запись
+        self._queue = None
+        self._writer = None
+        self.batches = 0
+        self.applied = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        if name in self._read_methods:
+            return partial(self._read, name)
+        if name in self._write_methods:
+            return partial(self._write, name)
+        raise AttributeError(f'{type(self._collector).__name__} has no public method {name!r}')
+
+    async def _read(self, name, *args, **kwargs):
+        return getattr(self._collector, name)(*args, **kwargs)
+
+    async def _write(self, name, *args, **kwargs):
+        if self._writer is None:
+            self._queue = asyncio.Queue()
+            self._writer = asyncio.get_running_loop().create_task(self._write_loop())
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((name, args, kwargs, future))
+        return await future
+
+    async def flush(self):
+        """Дожидается применения всех поставленных в очередь изменений."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def close(self):
+        """Применяет оставшиеся изменения и останавливает задачу-писателя."""
+        if self._writer is None:
+            return
+        await self.flush()
+        self._writer.cancel()
+        try:
+            await self._writer
+        except asyncio.CancelledError:
+            pass
+        self._writer = None
+        self._queue = None
+
+    async def _write_loop(self):
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            if self._linger:
+                await asyncio.sleep(self._linger)
+            while len(batch) < self._max_batch and not queue.empty():
+                batch.append(queue.get_nowait())
+            try:
+                self._apply(batch)
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    def _apply(self, batch):
+        lock = getattr(self._collector, '_lock', None)
+        with lock.write_locked() if lock is not None else nullcontext():
+            position = 0
+            while position < len(batch):
+                name, args, kwargs, _ = batch[position]
+                end = position + 1
+                if _coalescible(name, args, kwargs):
+                    # Подряд идущие поштучные добавления - один пакетный вызов
+                    while end < len(batch) and batch[end][0] == name and _coalescible(*batch[end][:3]):
+                        end += 1
+                if end - position > 1:
+                    self._run_bulk(batch[position:end], name)
+                else:
+                    self._run(batch[position:end], name, *args, **kwargs)
+                position = end
+        self.batches += 1
+        self.applied += len(batch)
+
+    def _run(self, operations, name, *args, **kwargs):
+        try:
+            result = getattr(self._collector, name)(*args, **kwargs)
+        except Exception as error:
+            for *_, future in operations:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        for *_, future in operations:
+            if not future.done():
+                future.set_result(result)
+
+    def _run_bulk(self, operations, name):
+        """
+        Применяет поштучные добавления одним пакетным вызовом.
+        Каждая операция получает тот же итог, что и при отдельном вызове:
+        add_new_* ничего не возвращает, а отклоненный как некорректный
+        элемент выполняется отдельно, чтобы его ошибку получила только его корутина.
+        """
+        try:
+            report = getattr(self._collector, BULK_METHODS[name])([operation[1][0] for operation in operations])
+        except Exception as error:
+            for *_, future in operations:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        invalid = {position for position, _, reason in report.rejected if reason == INVALID_ITEM}
+        for position, (_, args, kwargs, future) in enumerate(operations):
+            if position in invalid:
+                self._run([operations[position]], name, *args, **kwargs)
+            elif not future.done():
+                future.set_result(None)
+
+
+def _coalescible(name, args, kwargs):
+    # В пакет сворачиваются только добавления по одному названию-строке: пакетный
+    # метод понимает пары (название, жанр), а поштучный - нет
+    return name in BULK_METHODS and len(args) == 1 and not kwargs and isinstance(args[0], str)
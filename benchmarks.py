@@ -0,0 +1,324 @@
+"""
+Нагрузочные замеры горячих путей BooksCollector и MovieCollector.
+
+Запуск замеров и сохранение результата:
+    python benchmarks.py run --sizes 1000 100000 1000000 --output bench.json
+Сравнение двух запусков (код возврата 1 при замедлении больше порога):
+    python benchmarks.py compare old.json new.json --threshold 0.25
+Стоимость создания пустых коллекций (время и память на экземпляр):
+    python benchmarks.py startup --count 100000
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from itertools import count
+
+from books_collector import BooksCollector
+from movie_collector import MovieCollector
+
+DEFAULT_SIZES = (1000, 100000, 1000000)
+# Сколько длится замер одной операции и ограничения на число вызовов
+TIME_BUDGET = 0.2
+MIN_CALLS = 5
+MAX_CALLS = 20000
+
+
+# Размер второй коллекции для слияния и сравнения: половина названий общая
+PEER_SIZE = 1000
+
+
+def _peer(collector_class, prefix, size):
+    """Вторая коллекция: общие названия со сдвинутыми жанрами и новые названия."""
+    peer = collector_class()
+    genres = peer.config.genres
+    count = min(size, PEER_SIZE)
+    peer.add_titles((f'{prefix} {n}', genres[(n + 1) % len(genres)]) for n in range(0, size, max(size // count, 1)))
+    peer.add_titles((f'Источник {n}', genres[n % len(genres)]) for n in range(count))
+    for n in range(0, count, 10):
+        peer.add_to_favorites(f'Источник {n}')
+    return peer
+
+
+def _movie_operations(size):
+    last = f'Фильм {size - 1}'
+    peer = _peer(MovieCollector, 'Фильм', size)
+    return {
+        'add_new_movie': lambda c, i: c.add_new_movie(f'Новый фильм {i}'),
+        'add_new_movies': lambda c, i: c.add_new_movies([(f'Пакет {i}-{n}', 'Драма') for n in range(100)]),
+        'set_movie_genre': lambda c, i: c.set_movie_genre(f'Фильм {i % size}', 'Комедия' if i % 2 else 'Драма'),
+        'get_movie_genre': lambda c, i: c.get_movie_genre(f'Фильм {i % size}'),
+        'set_movie_genres': lambda c, i: c.set_movie_genres(f'Фильм {i % size}', ['Фантастика', 'Комедия']),
+        'get_movie_genres': lambda c, i: c.get_movie_genres(f'Фильм {i % size}'),
+        'find_movies': lambda c, i: c.find_movies('Фантастика AND Комедия AND NOT Ужасы'),
+        'count_movies_matching': lambda c, i: c.count_movies_matching('Драма OR Комедия'),
+        'get_movies_by_genre': lambda c, i: c.get_movies_by_genre('Ужасы'),
+        'get_movies_by_genre_page': lambda c, i: c.get_movies_by_genre_page('Ужасы', cursor=i % size),
+        'count_movies_by_genre': lambda c, i: c.count_movies_by_genre('Ужасы'),
+        'get_movies_for_children': lambda c, i: c.get_movies_for_children(),
+        'get_movies_for_children_page': lambda c, i: c.get_movies_for_children_page(cursor=i % size),
+        'count_movies_for_children': lambda c, i: c.count_movies_for_children(),
+        'add_movie_to_favorites': lambda c, i: c.add_movie_to_favorites(f'Фильм {i % size}'),
+        'remove_movie_from_favorites': lambda c, i: c.remove_movie_from_favorites(f'Фильм {i % size}'),
+        'get_favorites_movies': lambda c, i: c.get_favorites_movies(),
+        'get_all_movies': lambda c, i: c.get_all_movies(),
+        'contains': lambda c, i: last in c,
+        'search_movies': lambda c, i: c.search_movies(f'фильм {i % size}'),
+        'changes_since': lambda c, i: c.changes_since(c.version - 100),
+        'search_movies_substring': lambda c, i: c.search_movies(f'льм {i % size}', substring=True),
+        'merge': lambda c, i: c.merge(peer, 'theirs' if i % 2 else 'ours'),
+        'diff': lambda c, i: c.diff(peer),
+        'favorites_union': lambda c, i: c.favorites_union(peer),
+        'favorites_intersection': lambda c, i: c.favorites_intersection(peer),
+    }
+
+
+def _book_operations(size):
+    last = f'Книга {size - 1}'
+    peer = _peer(BooksCollector, 'Книга', size)
+    return {
+        'add_new_book': lambda c, i: c.add_new_book(f'Новая книга {i}'),
+        'add_new_books': lambda c, i: c.add_new_books([(f'Пакет {i}-{n}', 'Комедии') for n in range(100)]),
+        'set_book_genre': lambda c, i: c.set_book_genre(f'Книга {i % size}', 'Комедии' if i % 2 else 'Ужасы'),
+        'get_book_genre': lambda c, i: c.get_book_genre(f'Книга {i % size}'),
+        'set_book_genres': lambda c, i: c.set_book_genres(f'Книга {i % size}', ['Фантастика', 'Комедии']),
+        'get_book_genres': lambda c, i: c.get_book_genres(f'Книга {i % size}'),
+        'find_books': lambda c, i: c.find_books('Фантастика AND Комедии AND NOT Ужасы'),
+        'count_books_matching': lambda c, i: c.count_books_matching('Ужасы OR Детективы'),
+        'get_books_with_specific_genre': lambda c, i: c.get_books_with_specific_genre('Ужасы'),
+        'get_books_with_specific_genre_page':
+            lambda c, i: c.get_books_with_specific_genre_page('Ужасы', cursor=i % size),
+        'count_books_with_specific_genre': lambda c, i: c.count_books_with_specific_genre('Ужасы'),
+        'get_books_for_children': lambda c, i: c.get_books_for_children(),
+        'get_books_for_children_page': lambda c, i: c.get_books_for_children_page(cursor=i % size),
+        'count_books_for_children': lambda c, i: c.count_books_for_children(),
+        'add_book_in_favorites': lambda c, i: c.add_book_in_favorites(f'Книга {i % size}'),
+        'delete_book_from_favorites': lambda c, i: c.delete_book_from_favorites(f'Книга {i % size}'),
+        'get_list_of_favorites_books': lambda c, i: c.get_list_of_favorites_books(),
+        'get_books_genre': lambda c, i: c.get_books_genre(),
+        'contains': lambda c, i: last in c,
+        'search_books': lambda c, i: c.search_books(f'книга {i % size}'),
+        'changes_since': lambda c, i: c.changes_since(c.version - 100),
+        'search_books_substring': lambda c, i: c.search_books(f'нига {i % size}', substring=True),
+        'merge': lambda c, i: c.merge(peer, 'theirs' if i % 2 else 'ours'),
+        'diff': lambda c, i: c.diff(peer),
+        'favorites_union': lambda c, i: c.favorites_union(peer),
+        'favorites_intersection': lambda c, i: c.favorites_intersection(peer),
+    }
+
+
+def seed_movies(size, **options):
+    collector = MovieCollector(**options)
+    genres = collector.available_genres
+    collector.add_new_movies((f'Фильм {n}', genres[n % len(genres)]) for n in range(size))
+    for n in range(0, size, 10):
+        collector.add_movie_to_favorites(f'Фильм {n}')
+    return collector
+
+
+def seed_books(size, **options):
+    collector = BooksCollector(**options)
+    genres = collector.genre
+    collector.add_new_books((f'Книга {n}', genres[n % len(genres)]) for n in range(size))
+    for n in range(0, size, 10):
+        collector.add_book_in_favorites(f'Книга {n}')
+    return collector
+
+
+SUITES = {
+    'MovieCollector': (seed_movies, _movie_operations),
+    'BooksCollector': (seed_books, _book_operations),
+}
+COLLECTORS = {
+    'MovieCollector': MovieCollector,
+    'BooksCollector': BooksCollector,
+}
+
+
+def percentile(sorted_values, fraction):
+    """Процентиль по отсортированному списку (ближайший ранг)."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def measure(operation, collector, counter, time_budget=TIME_BUDGET):
+    """Вызывает операцию, пока не исчерпан бюджет времени; возвращает статистику."""
+    latencies = []
+    clock = time.perf_counter_ns
+    deadline = clock() + int(time_budget * 1e9)
+    while len(latencies) < MAX_CALLS and (len(latencies) < MIN_CALLS or clock() < deadline):
+        i = next(counter)
+        start = clock()
+        operation(collector, i)
+        latencies.append(clock() - start)
+    total = sum(latencies)
+    latencies.sort()
+    # Пиковая память одного вызова измеряется отдельно, чтобы не искажать время
+    tracemalloc.start()
+    operation(collector, next(counter))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'calls': len(latencies),
+        'throughput': len(latencies) / (total / 1e9) if total else float('inf'),
+        'mean_us': total / len(latencies) / 1e3,
+        'p50_us': percentile(latencies, 0.50) / 1e3,
+        'p95_us': percentile(latencies, 0.95) / 1e3,
+        'p99_us': percentile(latencies, 0.99) / 1e3,
+        'max_us': latencies[-1] / 1e3,
+        'peak_bytes': peak,
+    }
+
+
+def run(sizes=DEFAULT_SIZES, suites=tuple(SUITES), time_budget=TIME_BUDGET, compact=False, log=None,
+        cache_size=0):
+    """
+    Выполняет замеры и возвращает результат в виде словаря для JSON.
+    Чтения замеряются на одной коллекции заданного размера, а каждое
+    изменение (WRITE_METHODS) - на своей заново заполненной, поэтому
+    добавления и слияние не увеличивают каталог для следующих операций.
+    Для каждой операции сохраняется фактический размер каталога до и после замера.
+    """
+    results = {}
+    for suite in suites:
+        seed, operations = SUITES[suite]
+        writes = set(COLLECTORS[suite].WRITE_METHODS)
+        results[suite] = {}
+        for size in sizes:
+            tracemalloc.start()
+            started = time.perf_counter()
+            collector = seed(size, compact=compact, cache_size=cache_size)
+            seed_seconds = time.perf_counter() - started
+            seed_memory, seed_peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            entry = {'seed_seconds': seed_seconds, 'seed_memory_bytes': seed_memory,
+                     'seed_peak_bytes': seed_peak, 'operations': {}}
+            counter = count()
+            suite_operations = operations(size)
+            measured = {}
+            # Сначала все чтения на нетронутой коллекции, затем изменения - каждое на своей
+            for name, operation in sorted(suite_operations.items(), key=lambda item: item[0] in writes):
+                target = seed(size, compact=compact, cache_size=cache_size) if name in writes else collector
+                before = len(target.get_all_titles())
+                stats = measure(operation, target, counter, time_budget)
+                stats['catalog_size'] = before
+                stats['catalog_size_after'] = len(target.get_all_titles())
+                measured[name] = stats
+                if log:
+                    log(f"{suite:15} {size:>8} {name:32} {stats['throughput']:>12.0f} ops/s  "
+                        f"p50 {stats['p50_us']:>10.2f}us  p99 {stats['p99_us']:>10.2f}us")
+            entry['operations'] = {name: measured[name] for name in suite_operations}
+            results[suite][str(size)] = entry
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'compact': compact,
+            'cache_size': cache_size,
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+
+
+def startup(suites=tuple(COLLECTORS), instances=10000):
+    """
+    Замеряет создание пустых коллекций: время на экземпляр (лучшее из 5 повторов)
+    и память, которую удерживает один экземпляр. Возвращает {набор: статистика}.
+    """
+    results = {}
+    for suite in suites:
+        cls = COLLECTORS[suite]
+        timings = []
+        for _ in range(5):
+            started = time.perf_counter_ns()
+            for _ in range(instances):
+                cls()
+            timings.append(time.perf_counter_ns() - started)
+        tracemalloc.start()
+        collectors = [cls() for _ in range(instances)]
+        memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        # Список экземпляров тоже попадает в замер: его вклад вычитается
+        memory -= sys.getsizeof(collectors)
+        results[suite] = {
+            'create_us': min(timings) / instances / 1e3,
+            'instance_bytes': memory / instances,
+        }
+    return results
+
+
+def compare(old, new, threshold=0.25, metric='p50_us'):
+    """
+    Сравнивает два результата run().
+    Возвращает список замедлений (набор, размер, операция, было, стало, отношение)
+    для операций, где метрика выросла больше чем на threshold (0.25 = 25%).
+    """
+    regressions = []
+    for suite, sizes in new['results'].items():
+        for size, entry in sizes.items():
+            old_entry = old['results'].get(suite, {}).get(size)
+            if old_entry is None:
+                continue
+            for name, stats in entry['operations'].items():
+                old_stats = old_entry['operations'].get(name)
+                if old_stats is None or not old_stats[metric]:
+                    continue
+                ratio = stats[metric] / old_stats[metric]
+                if ratio > 1 + threshold:
+                    regressions.append((suite, size, name, old_stats[metric], stats[metric], ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+    run_parser = commands.add_parser('run', help='выполнить замеры')
+    run_parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES))
+    run_parser.add_argument('--suite', choices=list(SUITES), action='append')
+    run_parser.add_argument('--time-budget', type=float, default=TIME_BUDGET)
+    run_parser.add_argument('--compact', action='store_true', help='компактный режим хранения')
+    run_parser.add_argument('--cache-size', type=int, default=0, help='размер кеша выборок (0 - выключен)')
+    run_parser.add_argument('--output', help='файл для сохранения результата в JSON')
+    compare_parser = commands.add_parser('compare', help='сравнить два результата')
+    compare_parser.add_argument('old')
+    compare_parser.add_argument('new')
+    compare_parser.add_argument('--threshold', type=float, default=0.25)
+    compare_parser.add_argument('--metric', default='p50_us')
+    startup_parser = commands.add_parser('startup', help='замерить создание пустых коллекций')
+    startup_parser.add_argument('--suite', choices=list(COLLECTORS), action='append')
+    startup_parser.add_argument('--count', type=int, default=10000, help='число экземпляров')
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        result = run(args.sizes, args.suite or tuple(SUITES), args.time_budget, args.compact, log=print,
+                     cache_size=args.cache_size)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as file:
+                json.dump(result, file, ensure_ascii=False, indent=2)
+        return 0
+    if args.command == 'startup':
+        for suite, stats in startup(args.suite or tuple(COLLECTORS), args.count).items():
+            print(f"{suite:15} {stats['create_us']:>8.2f}us  {stats['instance_bytes']:>8.0f} B/экземпляр")
+        return 0
+
+    with open(args.old, encoding='utf-8') as file:
+        old = json.load(file)
+    with open(args.new, encoding='utf-8') as file:
+        new = json.load(file)
+    regressions = compare(old, new, args.threshold, args.metric)
+    for suite, size, name, before, after, ratio in regressions:
+        print(f'{suite} {size} {name}: {args.metric} {before:.2f} -> {after:.2f} (x{ratio:.2f})')
+    if regressions:
+        print(f'Замедлений больше {args.threshold:.0%}: {len(regressions)}')
+        return 1
+    print('Замедлений не обнаружено')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,48 +1,92 @@
-class BooksCollector:
+from catalog import CHILDREN_ALLOWED_GENRES, CatalogCollector, CatalogConfig
 
-    def __init__(self):
-        self.books_genre = {}
-        self.favorites = []
-        self.genre = ['Фантастика', 'Ужасы', 'Детективы', 'Мультфильмы', 'Комедии']
-        self.genre_age_rating = ['Ужасы', 'Детективы']
+
+class BooksCollector(CatalogCollector):
+    # Книги: название от 1 до 40 символов, детские - только с допустимым жанром без рейтинга
+    CONFIG = CatalogConfig(['Фантастика', 'Ужасы', 'Детективы', 'Мультфильмы', 'Комедии'],
+                           restricted_genres=['Ужасы', 'Детективы'], min_length=1, max_length=40,
+                           children_policy=CHILDREN_ALLOWED_GENRES)
+    # Методы только для чтения и изменяющие коллекцию (используются обертками)
+    READ_METHODS = ('get_book_genre', 'get_book_genres', 'get_books_with_specific_genre',
+                    'get_books_with_specific_genre_page', 'count_books_with_specific_genre',
+                    'get_books_genre', 'get_books_for_children', 'get_books_for_children_page',
+                    'count_books_for_children', 'find_books', 'count_books_matching',
+                    'get_list_of_favorites_books', 'search_books', 'changes_since',
+                    'diff', 'favorites_union', 'favorites_intersection', 'dump_jsonl', 'dump_snapshot')
+    WRITE_METHODS = ('add_new_book', 'add_new_books', 'set_book_genre', 'set_book_genres',
+                     'add_book_in_favorites', 'delete_book_from_favorites', 'merge', 'load_jsonl',
+                     'load_snapshot')
+
+    __slots__ = ()
+    # Жанры и жанры с возрастным рейтингом - общие неизменяемые таблицы класса
+    genre = CONFIG.genres
+    genre_age_rating = CONFIG.restricted_genres
+
+    def __init__(self, compact=False, cache_size=0, database=None):
+        super().__init__(compact, cache_size=cache_size, database=database)
+
+    # Прежние имена методов - обертки над методами ядра
+    books_genre = CatalogCollector.titles_genre
 
     def add_new_book(self, name):
-        if not self.books_genre.get(name) and 0 < len(name) < 41:
-            self.books_genre[name] = ''
+        return self.add_title(name)
+
+    def add_new_books(self, items):
+        return self.add_titles(items)
 
     def set_book_genre(self, name, genre):
-        if name in self.books_genre and genre in self.genre:
-            self.books_genre[name] = genre
+        return self.set_genre(name, genre)
+
+    def set_book_genres(self, name, genres):
+        return self.set_genres(name, genres)
 
     def get_book_genre(self, name):
-        return self.books_genre.get(name)
+        return self.get_genre(name)
+
+    def get_book_genres(self, name):
+        return self.get_genres(name)
 
     def get_books_with_specific_genre(self, genre):
-        books_with_specific_genre = []
-        if self.books_genre and genre in self.genre:
-            for name, book_genre in self.books_genre.items():
-                if book_genre == genre:
-                    books_with_specific_genre.append(name)
-        return books_with_specific_genre
+        return self.get_titles_by_genre(genre)
+
+    def iter_books_with_specific_genre(self, genre, cursor=None):
+        return self.iter_titles_by_genre(genre, cursor)
+
+    def get_books_with_specific_genre_page(self, genre, limit=20, cursor=None, offset=0):
+        return self.get_titles_by_genre_page(genre, limit, cursor, offset)
+
+    def count_books_with_specific_genre(self, genre):
+        return self.count_titles_by_genre(genre)
 
     def get_books_genre(self):
-        return self.books_genre
+        return self.get_all_titles()
 
     def get_books_for_children(self):
-        books_for_children = []
-        for name, genre in self.books_genre.items():
-            if genre not in self.genre_age_rating and genre in self.genre:
-                books_for_children.append(name)
-        return books_for_children
+        return self.get_titles_for_children()
+
+    def iter_books_for_children(self, cursor=None):
+        return self.iter_titles_for_children(cursor)
+
+    def get_books_for_children_page(self, limit=20, cursor=None, offset=0):
+        return self.get_titles_for_children_page(limit, cursor, offset)
+
+    def count_books_for_children(self):
+        return self.count_titles_for_children()
+
+    def find_books(self, query, limit=20, cursor=None, offset=0):
+        return self.find_titles(query, limit, cursor, offset)
+
+    def count_books_matching(self, query):
+        return self.count_titles_matching(query)
+
+    def search_books(self, query, limit=20, offset=0, substring=False):
+        return self.search_titles(query, limit, offset, substring)
 
     def add_book_in_favorites(self, name):
-        if name in self.books_genre:
-            if name not in self.favorites:
-                self.favorites.append(name)
+        return self.add_to_favorites(name)
 
     def delete_book_from_favorites(self, name):
-        if name in self.favorites:
-            self.favorites.remove(name)
+        return self.remove_from_favorites(name)
 
     def get_list_of_favorites_books(self):
-        return self.favorites
\ No newline at end of file
+        return self.get_favorites()
\ No newline at end of file
@@ -0,0 +1,675 @@
+from collections.abc import ItemsView, MutableMapping
+
+from changelog import FAVORITE, GENRE, ChangeLog
+from compact_store import CompactTitleStore
+from genre_masks import GenreMaskColumn
+from indexes import FavoritesSet
+from ingest import validate_batch
+from jsonl_io import dump_jsonl, load_jsonl
+from merge import KEEP_OURS, MergeReport, conflict_resolver, diff, favorites_intersection, favorites_union, \
+    iter_diff, merge_titles
+from pagination import cursor_position, iter_names, take_page
+from result_cache import ResultCache
+from snapshot import MappedTitleStore, write_snapshot
+from sqlite_store import SqliteTitleStore
+from title_search import TitleSearchIndex
+from title_store import EMPTY_STORE, DictTitleStore
+
+# Политики детской выборки
+# - CHILDREN_ALLOWED_GENRES: жанр из списка допустимых и без возрастного ограничения
+# - CHILDREN_ANY_GENRE: жанр установлен (любой) и без возрастного ограничения
+CHILDREN_ALLOWED_GENRES = 'allowed_genres'
+CHILDREN_ANY_GENRE = 'any_genre'
+# Ключ кеша детской выборки (выборки по жанру - ('genre', жанр))
+_CHILDREN_KEY = ('children',)
+
+
+class GenreTable(tuple):
+    """
+    Неизменяемый список жанров, общий для всех экземпляров коллекции.
+    Равен списку или кортежу с теми же жанрами в том же порядке.
+    """
+
+    __slots__ = ()
+
+    def __eq__(self, other):
+        if isinstance(other, (list, tuple)):
+            return tuple.__eq__(self, tuple(other))
+        return NotImplemented
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = tuple.__hash__
+
+
+class CatalogConfig:
+    """
+    Правила каталога для CatalogCollector.
+    - genres: допустимые жанры (порядок задает коды и биты масок)
+    - restricted_genres: жанры с возрастным ограничением
+    - min_length, max_length: допустимая длина названия включительно
+    - children_policy: CHILDREN_ALLOWED_GENRES или CHILDREN_ANY_GENRE
+    """
+
+    __slots__ = ('genres', 'restricted_genres', 'min_length', 'max_length', 'children_policy',
+                 'genre_set', 'restricted_set')
+
+    def __init__(self, genres, restricted_genres=(), min_length=1, max_length=100,
+                 children_policy=CHILDREN_ANY_GENRE):
+        if children_policy not in (CHILDREN_ALLOWED_GENRES, CHILDREN_ANY_GENRE):
+            raise ValueError(f'неизвестная политика детской выборки: {children_policy!r}')
+        self.genres = GenreTable(genres)
+        self.restricted_genres = GenreTable(restricted_genres)
+        self.min_length = min_length
+        self.max_length = max_length
+        self.children_policy = children_policy
+        # Неизменяемые множества для проверки вхождения за O(1)
+        self.genre_set = frozenset(self.genres)
+        self.restricted_set = frozenset(self.restricted_genres)
+
+    def is_valid_name(self, name):
+        return self.min_length <= len(name) <= self.max_length
+
+    def is_for_children(self, genre):
+        """Подходит ли жанр для детской выборки по политике каталога."""
+        if self.children_policy == CHILDREN_ALLOWED_GENRES:
+            return genre in self.genre_set and genre not in self.restricted_set
+        return bool(genre) and genre not in self.restricted_set
+
+    def primary_genre(self, genres):
+        """Основной жанр из нескольких: первый с возрастным ограничением, иначе первый."""
+        return next((genre for genre in genres if genre in self.restricted_set), genres[0])
+
+
+class TitlesView(MutableMapping):
+    """
+    Словарь {название: жанр} коллекции (titles_genre, books_genre, movies_genre).
+    Чтение идет прямо из хранилища, запись - через коллекцию, поэтому индекс
+    жанров, детская выборка, маски жанров, журнал изменений и кеш не расходятся
+    со словарем. Представление живое: видит все последующие изменения.
+    - view[название] = жанр добавляет название, если его нет, и устанавливает
+      жанр без проверки правил каталога (как прямая запись в словарь)
+    - Удаление (del, pop, clear) не поддерживается - TypeError:
+      коллекция не удаляет названия
+    """
+
+    __slots__ = ('_collector',)
+
+    def __init__(self, collector):
+        self._collector = collector
+
+    def __getitem__(self, name):
+        genre = self._collector._store.get(name)
+        if genre is None:
+            raise KeyError(name)
+        return genre
+
+    def __setitem__(self, name, genre):
+        if not isinstance(name, str) or not isinstance(genre, str):
+            raise TypeError('название и жанр должны быть строками')
+        self._collector._assign_genre(name, genre)
+
+    def __delitem__(self, name):
+        raise TypeError('названия нельзя удалять из коллекции')
+
+    def __contains__(self, name):
+        return name in self._collector._store
+
+    def __iter__(self):
+        return (name for name, _ in self._collector._store.items())
+
+    def __len__(self):
+        return len(self._collector._store)
+
+    def items(self):
+        return _TitlesItems(self)
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+
+class _TitlesItems(ItemsView):
+    # Пары берутся из хранилища за один проход, без поиска жанра по каждому названию
+    __slots__ = ()
+
+    def __iter__(self):
+        return iter(self._mapping._collector._store.items())
+
+
+class CatalogCollector:
+    """
+    Общее ядро коллекций: хранилище с индексами (словарь, компактное или
+    снимок через mmap), избранное, пакетная загрузка, поиск, страницы,
+    журнал изменений и маски жанров. Правила каталога задает атрибут класса
+    CONFIG (CatalogConfig), поэтому новый каталог - это подкласс с CONFIG.
+    BooksCollector и MovieCollector - тонкие обертки с прежними именами методов.
+    Создание экземпляра почти ничего не стоит: таблицы жанров общие
+    (CONFIG), хранилище, индексы, избранное и журнал изменений создаются
+    при первом обращении, а атрибуты экземпляра - слоты без __dict__.
+    """
+
+    __slots__ = ('config', '_compact', '_database', '_sqlite', '_store', '_search_index',
+                 '_genre_masks', '_favorites', '_change_log', '_cache',
+                 '_instrumentation')  # Заполняется instrumentation.instrument()
+
+    CONFIG = None
+    # Методы только для чтения и изменяющие коллекцию (используются обертками)
+    READ_METHODS = ('get_genre', 'get_genres', 'get_titles_by_genre', 'get_titles_by_genre_page',
+                    'count_titles_by_genre', 'get_titles_for_children', 'get_titles_for_children_page',
+                    'count_titles_for_children', 'find_titles', 'count_titles_matching',
+                    'get_favorites', 'get_all_titles', 'search_titles', 'changes_since',
+                    'diff', 'favorites_union', 'favorites_intersection', 'dump_jsonl', 'dump_snapshot')
+    WRITE_METHODS = ('add_title', 'add_titles', 'set_genre', 'set_genres', 'add_to_favorites',
+                     'remove_from_favorites', 'merge', 'load_jsonl', 'load_snapshot')
+
+    def __init__(self, compact=False, config=None, cache_size=0, database=None):
+        """
+        compact=True включает компактное хранилище: названия в таблице строк,
+        жанры - однобайтовыми кодами. Ответы методов не меняются.
+        database - путь к файлу SQLite: коллекция и избранное хранятся в базе
+        и переживают перезапуск; существующая база открывается с содержимым.
+        config заменяет CONFIG класса для отдельного экземпляра.
+        cache_size > 0 включает LRU-кеш выборок по жанру и детской выборки
+        на cache_size запросов (см. cache_stats).
+        """
+        self.config = self.CONFIG if config is None else config
+        # Хранилище {название: жанр} с индексом жанров и детской выборкой
+        self._compact = compact
+        self._database = database
+        self._sqlite = None
+        # Пока ничего не добавлено - общее пустое хранилище только для чтения,
+        # настоящее создается при первой записи (см. _writable_store)
+        self._store = EMPTY_STORE if database is None else self._new_store()
+        # Индекс поиска по названиям строится при первом поиске
+        self._search_index = None
+        # Столбец битовых масок жанров строится при первом обращении к нескольким жанрам
+        self._genre_masks = None
+        # Избранное: упорядоченное множество с O(1) операциями, создается при первом обращении
+        self._favorites = None
+        # Журнал изменений для инкрементальной синхронизации реплик; для пустой
+        # коллекции создается при первой записи или первом запросе версии
+        self._change_log = None if database is None else self._reopened_log()
+        # Кеш результатов выборок (по умолчанию выключен)
+        self._cache = ResultCache(cache_size) if cache_size else None
+
+    @property
+    def titles_genre(self):
+        """Словарь {название: жанр} (TitlesView: запись обновляет индексы)."""
+        return TitlesView(self)
+
+    @titles_genre.setter
+    def titles_genre(self, titles_genre):
+        """
+        При прямой замене словаря индексы пересобираются. Словарь копируется,
+        поэтому его дальнейшие изменения не обходят индексы.
+        """
+        self._store = self._new_store(dict(titles_genre))
+        self._search_index = None
+        self._genre_masks = None
+        self._changes.reset(len(self._store))
+        if self._cache is not None:
+            self._cache.clear()
+
+    @property
+    def favorites(self):
+        if self._favorites is None:
+            # Избранное хранилища (снимка, базы) подхватывается при первом обращении
+            self._adopt_favorites(self._store.favorites())
+        return self._favorites
+
+    @favorites.setter
+    def favorites(self, favorites):
+        """Присвоенный список избранного преобразуется в FavoritesSet."""
+        self._adopt_favorites(favorites)
+        self._changes.reset(len(self._store))
+
+    def _adopt_favorites(self, names):
+        """
+        Делает names текущим избранным. Если хранилище держит избранное
+        само (база SQLite), содержимое записывается туда, иначе создается FavoritesSet.
+        """
+        favorites = self._store.favorites()
+        if isinstance(favorites, FavoritesSet):
+            if names is not favorites:
+                favorites.replace(names)
+            self._favorites = favorites
+        else:
+            self._favorites = FavoritesSet(names)
+
+    @property
+    def _changes(self):
+        if self._change_log is None:
+            self._change_log = ChangeLog(size=len(self._store))
+        return self._change_log
+
+    def _reopened_log(self):
+        """
+        Журнал для открытой базы. Версии, выданные до повторного открытия, не
+        больше сохраненной в базе, поэтому журнал начинается выше нее и запросы
+        с такими версиями получают full=True. Пустая новая база начинает с нуля.
+        """
+        size = len(self._store)
+        saved = self._sqlite.saved_version()
+        return ChangeLog(size=size, version=saved + 1 if saved or size else 0)
+
+    def _publish(self, version):
+        # Версия, выданная наружу, сохраняется в базе (для режима database)
+        if self._sqlite is not None:
+            self._sqlite.save_version(version)
+        return version
+
+    @property
+    def version(self):
+        """Текущая версия коллекции: растет с каждым изменением."""
+        return self._publish(self._changes.version)
+
+    def _new_store(self, titles_genre=None):
+        """
+        Создает хранилище выбранного режима (словарь, компактное или база).
+        База открывается один раз, дальше ее содержимое заменяется.
+        """
+        if self._database is not None:
+            if self._sqlite is None:
+                self._sqlite = SqliteTitleStore(self.config.is_for_children, self._database)
+            if titles_genre is not None:
+                self._sqlite.replace(titles_genre)
+            return self._sqlite
+        if self._compact:
+            return CompactTitleStore(self.config.is_for_children, titles_genre, self.config.genres)
+        return DictTitleStore(self.config.is_for_children, titles_genre)
+
+    def _writable_store(self):
+        """
+        Возвращает изменяемое хранилище.
+        Снимок и пустое хранилище новой коллекции доступны только для чтения,
+        поэтому перед первой записью данные переносятся в хранилище выбранного
+        режима, а избранное материализуется.
+        """
+        if self._store.read_only:
+            if self._change_log is None:
+                # Журнал отсчитывает размер от исходного, еще не измененного хранилища
+                self._change_log = ChangeLog(size=len(self._store))
+            favorites = self.favorites
+            mapped = self._store
+            items = mapped.items()
+            # Режим словаря хранит переданный словарь у себя, поэтому ему - новый словарь
+            self._store = self._new_store(items if self._compact or self._database else dict(items))
+            self._adopt_favorites(favorites)
+        return self._store
+
+    def close(self):
+        """Закрывает соединения с базой (для режима database)."""
+        if self._sqlite is not None:
+            self._sqlite.close()
+
+    def add_title(self, name):
+        """
+        Добавляет новое название без жанра.
+        Условия добавления:
+        - Названия еще нет в коллекции
+        - Длина названия в границах каталога
+        """
+        if name not in self._store and self.config.is_valid_name(name):
+            self._append_title(name)
+
+    def _append_title(self, name):
+        self._writable_store().add(name)  # Жанр по умолчанию - пустая строка
+        if self._search_index is not None:
+            self._search_index.add(name)
+        if self._genre_masks is not None:
+            self._genre_masks.append()
+        self._changes.record_added(1)
+
+    def _assign_genre(self, name, genre):
+        """Запись в titles_genre: добавляет название при необходимости, правила не проверяются."""
+        if name not in self._store:
+            self._append_title(name)
+        self._set_genres(name, genre, (genre,) if genre else ())
+
+    def add_titles(self, items):
+        """
+        Пакетно добавляет названия за один проход проверки.
+        - items: названия или пары (название, жанр)
+        - Правила те же, что у add_title и set_genre
+        - Уже существующие названия не изменяются (причина DUPLICATE)
+        Возвращает IngestReport с отклоненными элементами и причинами.
+        """
+        config = self.config
+        accepted, report = validate_batch(items, self._store, config.min_length, config.max_length,
+                                          config.genre_set)
+        if accepted:
+            self._writable_store().add_many(accepted)
+            if self._search_index is not None:
+                self._search_index.add_many(accepted)
+            if self._genre_masks is not None:
+                masks = self._genre_masks
+                masks.extend(masks.mask_of((genre,)) for genre in accepted.values())
+            self._changes.record_added(len(accepted))
+            if self._cache is not None:
+                self._invalidate_cached(set(accepted.values()))
+        return report
+
+    def set_genre(self, name, genre):
+        """
+        Устанавливает жанр.
+        Условия установки:
+        - Название есть в коллекции
+        - Жанр есть в списке допустимых жанров
+        """
+        if name in self._store and genre in self.config.genre_set:
+            self._set_genres(name, genre, (genre,))
+
+    def set_genres(self, name, genres):
+        """
+        Устанавливает несколько жанров.
+        Условия установки:
+        - Название есть в коллекции
+        - Список не пуст и все жанры есть в списке допустимых жанров
+        Основным жанром (get_genre, выборки по одному жанру) становится
+        первый жанр с возрастным ограничением, а если их нет - первый жанр,
+        поэтому название с любым ограниченным жанром не попадает в детскую выборку.
+        """
+        genres = list(dict.fromkeys(genres))
+        genre_set = self.config.genre_set
+        if name not in self._store or not genres or not all(genre in genre_set for genre in genres):
+            return
+        self._genre_mask_column()
+        self._set_genres(name, self.config.primary_genre(genres), genres)
+
+    def _set_genres(self, name, primary, genres):
+        """Меняет основной жанр и маску жанров; в журнал попадает только реальное изменение."""
+        old_genre = self._store.get(name)
+        changed = old_genre != primary
+        if changed:
+            self._writable_store().set_genre(name, primary)
+            if self._cache is not None:
+                self._invalidate_cached((old_genre, primary))
+        if self._genre_masks is not None:
+            masks = self._genre_masks
+            changed = masks.set(self._store.position(name), genres) or changed
+            if changed and self._database is not None:
+                # База хранит маску, чтобы жанры set_genres пережили повторное открытие
+                self._writable_store().set_genres_mask(name, masks.mask_of(genres))
+        if changed:
+            self._changes.record(GENRE, name)
+
+    def _invalidate_cached(self, genres):
+        """Сбрасывает в кеше только выборки затронутых жанров и детскую, если она затронута."""
+        keys = [('genre', genre) for genre in genres if genre]
+        if any(self.config.is_for_children(genre) for genre in genres):
+            keys.append(_CHILDREN_KEY)
+        self._cache.invalidate(keys)
+
+    def cache_stats(self):
+        """
+        Статистика кеша выборок: hits, misses, hit_ratio, invalidations, size, maxsize.
+        Возвращает None, если кеш выключен.
+        """
+        return self._cache.stats() if self._cache is not None else None
+
+    def _genre_mask_column(self):
+        """Столбец масок жанров в порядке добавления; строится по основным жанрам при первом вызове."""
+        if self._genre_masks is None:
+            masks = GenreMaskColumn(self.config.genres)
+            if self._store is self._sqlite:
+                # В базе маска сохранена для названий с set_genres, у остальных - NULL
+                masks.extend(masks.mask_of((genre,)) if mask is None else mask
+                             for genre, mask in self._store.genres_masks())
+            else:
+                masks.extend(masks.mask_of((genre,)) for _, genre in self._store.items())
+            self._genre_masks = masks
+        return self._genre_masks
+
+    def __contains__(self, name):
+        """Проверяет, есть ли название в коллекции."""
+        return name in self._store
+
+    def get_genre(self, name):
+        """
+        Возвращает жанр по названию.
+        - Возвращает None, если названия нет в коллекции
+        - Возвращает жанр (строку), если название есть
+        """
+        return self._store.get(name)
+
+    def get_genres(self, name):
+        """
+        Возвращает все жанры названия в порядке жанров каталога.
+        - Возвращает None, если названия нет в коллекции
+        - Возвращает пустой список, если жанр не установлен
+        """
+        genre = self._store.get(name)
+        if genre is None:
+            return None
+        if self._genre_masks is None and self._store is self._sqlite:
+            self._genre_mask_column()
+        if self._genre_masks is None:
+            return [genre] if genre in self.config.genre_set else []
+        return self._genre_masks.genres_at(self._store.position(name))
+
+    def get_titles_by_genre(self, genre):
+        """
+        Возвращает список названий указанного жанра.
+        - Возвращает пустой список, если жанр недопустим
+        - Возвращает все названия с указанным жанром в порядке добавления
+        Использует индекс жанров: O(размер результата).
+        """
+        if genre not in self.config.genre_set:
+            return []
+        if self._cache is None:
+            return self._store.titles(genre)
+        # В кеше - кортеж, вызывающий получает свою копию списка
+        return list(self._cache.get_or_compute(('genre', genre), lambda: tuple(self._store.titles(genre))))
+
+    def iter_titles_by_genre(self, genre, cursor=None):
+        """
+        Лениво перебирает названия указанного жанра в порядке добавления.
+        - cursor: продолжить после названия с этим курсором (Page.cursor)
+        Для первого совпадения не нужно строить весь список: next(iter_titles_by_genre(...)).
+        """
+        after = cursor_position(cursor)
+        if genre not in self.config.genre_set:
+            return iter(())
+        return iter_names(self._store.iter_titles(genre, after))
+
+    def get_titles_by_genre_page(self, genre, limit=20, cursor=None, offset=0):
+        """
+        Возвращает страницу названий указанного жанра (Page).
+        - limit: размер страницы
+        - cursor: курсор предыдущей страницы (None - с начала)
+        - offset: сколько названий пропустить после курсора
+        Стоимость - O(offset + limit); курсор не сбивается при добавлении названий.
+        """
+        after = cursor_position(cursor)
+        if genre not in self.config.genre_set:
+            return take_page((), limit, offset)
+        return take_page(self._store.iter_titles(genre, after), limit, offset)
+
+    def count_titles_by_genre(self, genre):
+        """Возвращает количество названий указанного жанра без построения списка."""
+        if genre not in self.config.genre_set:
+            return 0
+        return self._store.count(genre)
+
+    def get_titles_for_children(self):
+        """
+        Возвращает названия, подходящие для детей по политике каталога.
+        Выборка поддерживается инкрементально: O(размер результата).
+        """
+        if self._cache is None:
+            return self._store.children()
+        return list(self._cache.get_or_compute(_CHILDREN_KEY, lambda: tuple(self._store.children())))
+
+    def iter_titles_for_children(self, cursor=None):
+        """Лениво перебирает детские названия в порядке добавления, начиная после cursor."""
+        return iter_names(self._store.iter_children(cursor_position(cursor)))
+
+    def get_titles_for_children_page(self, limit=20, cursor=None, offset=0):
+        """Возвращает страницу детских названий (Page), параметры как у get_titles_by_genre_page."""
+        return take_page(self._store.iter_children(cursor_position(cursor)), limit, offset)
+
+    def count_titles_for_children(self):
+        """Возвращает количество детских названий за O(1)."""
+        return self._store.children_count()
+
+    def find_titles(self, query, limit=20, cursor=None, offset=0):
+        """
+        Возвращает страницу названий (Page), жанры которых подходят под запрос.
+        - query: жанры с операторами AND, OR, NOT и скобками,
+          например 'Фантастика AND Комедия AND NOT Ужасы'
+        - limit, cursor, offset: как у get_titles_by_genre_page
+        Запрос фильтрует столбец битовых масок жанров одной векторной операцией.
+        Недопустимый жанр в запросе ничему не соответствует, ошибка синтаксиса - ValueError.
+        """
+        after = cursor_position(cursor)
+        masks = self._genre_mask_column()
+        positions = masks.positions(masks.compile(query), after)
+        return take_page(((position, self._store.name_at(position)) for position in positions), limit, offset)
+
+    def count_titles_matching(self, query):
+        """Возвращает количество названий, жанры которых подходят под запрос."""
+        masks = self._genre_mask_column()
+        return masks.count(masks.compile(query))
+
+    def search_titles(self, query, limit=20, offset=0, substring=False):
+        """
+        Ищет по названию без учета регистра (ё и е не различаются).
+        - substring=False: названия, начинающиеся с query, в алфавитном порядке
+        - substring=True: названия, содержащие query, в порядке добавления
+        - limit/offset: страница результата (limit=None - без ограничения)
+        Индекс строится при первом вызове и дальше поддерживается при добавлении.
+        """
+        if self._search_index is None:
+            self._search_index = TitleSearchIndex(name for name, _ in self._store.items())
+        if substring:
+            return self._search_index.substring(query, limit, offset)
+        return self._search_index.prefix(query, limit, offset)
+
+    def add_to_favorites(self, name):
+        """
+        Добавляет название в избранное.
+        Условия:
+        - Название есть в коллекции
+        - Название еще не в избранном
+        """
+        if name in self._store and name not in self.favorites:
+            self.favorites.add(name)
+            self._changes.record(FAVORITE, name)
+
+    def remove_from_favorites(self, name):
+        """
+        Удаляет название из избранного.
+        - Если названия нет в избранном, ничего не происходит
+        """
+        if name in self.favorites:
+            self.favorites.discard(name)
+            self._changes.record(FAVORITE, name)
+
+    def get_favorites(self):
+        """
+        Возвращает избранное списком в порядке добавления (копия, O(n)).
+        Само множество избранного с O(1) проверкой вхождения - атрибут favorites.
+        """
+        return list(self.favorites)
+
+    def get_all_titles(self):
+        """
+        Возвращает полный словарь (название: жанр) - обычный dict, снятый с
+        хранилища (O(n)). Изменяемое живое представление - атрибут titles_genre.
+        """
+        return dict(self._store.items())
+
+    def changes_since(self, version):
+        """
+        Возвращает изменения после указанной версии (ChangeSet):
+        добавленные названия и смены жанра, изменения избранного и новую версию.
+        Стоимость - O(числа изменений), а не размера коллекции. Если журнал
+        уже уплотнен дальше version или коллекция была заменена целиком,
+        возвращается ChangeSet с full=True.
+        """
+        changes = self._changes.changes_since(version, self._store, self.favorites)
+        self._publish(changes.version)
+        return changes
+
+    def merge(self, other, policy=KEEP_OURS, favorites=True):
+        """
+        Вливает в коллекцию названия и жанры другой коллекции (MergeReport).
+        - Новые названия проверяются правилами каталога и добавляются пакетами
+        - Пустой жанр заполняется их жанром; разные установленные жанры -
+          конфликт, который разрешает policy: KEEP_OURS, TAKE_THEIRS,
+          PREFER_RESTRICTED или функция (название, наш_жанр, их_жанр) -> жанр
+        - favorites=True добавляет их избранное (названия, которые есть у нас)
+        Другая коллекция читается прямо из хранилища за один проход: O(len(other)).
+        Она не должна изменяться во время слияния (ее блокировка не берется).
+        """
+        resolve = conflict_resolver(policy, self.config.primary_genre)
+        if other is self:
+            return MergeReport()
+        # Хранилище создается до прохода, чтобы искать названия в нем напрямую
+        store = self._writable_store()
+        report = merge_titles(other._store.items(), store.get, self.add_titles, self.set_genre,
+                              resolve, self.config.genre_set)
+        if favorites:
+            for name in other.favorites:
+                self.add_to_favorites(name)
+        return report
+
+    def iter_diff(self, other):
+        """
+        Лениво перебирает различия с другой коллекцией: кортежи
+        (вид, название, наш_жанр, их_жанр), вид - ADDED, REMOVED или REGENRED.
+        Для многомиллионных коллекций различия не накапливаются в памяти.
+        """
+        return iter_diff(self._store, other._store)
+
+    def diff(self, other):
+        """
+        Возвращает различия с другой коллекцией (CatalogDiff):
+        added - есть только у другой, removed - только у этой,
+        regenred - есть у обеих с разными жанрами. O(len(self) + len(other)).
+        """
+        return diff(self._store, other._store)
+
+    def favorites_union(self, other):
+        """Объединение избранного с другой коллекцией (FavoritesSet, сначала наш порядок)."""
+        return favorites_union(self.favorites, other.favorites)
+
+    def favorites_intersection(self, other):
+        """Пересечение избранного с другой коллекцией (FavoritesSet в нашем порядке)."""
+        return favorites_intersection(self.favorites, other.favorites)
+
+    def load_jsonl(self, path):
+        """
+        Потоково загружает названия, жанры и избранное из JSONL-файла.
+        Файл читается построчно, названия добавляются пакетами через add_titles.
+        Возвращает IngestReport с номерами отклоненных строк.
+        """
+        return load_jsonl(path, self.add_titles, self.add_to_favorites)
+
+    def dump_jsonl(self, path):
+        """Сохраняет названия, жанры и избранное в JSONL-файл."""
+        dump_jsonl(path, self._store.items(), self.favorites)
+
+    def dump_snapshot(self, path):
+        """
+        Сохраняет коллекцию в компактный двоичный снимок:
+        таблица строк, однобайтовый код жанра на название и битовая карта избранного.
+        """
+        write_snapshot(path, self._store.items(), self.favorites, self.config.genres)
+
+    def load_snapshot(self, path):
+        """
+        Открывает снимок через mmap, заменяя текущее содержимое.
+        Чтение (жанр, выборки по жанру, детские названия, избранное)
+        обслуживается прямо из отображенного файла; при первом изменении
+        коллекции данные переносятся в обычное хранилище.
+        """
+        self._store = MappedTitleStore(path, self.config.is_for_children)
+        self._search_index = None
+        self._genre_masks = None
+        self._favorites = None
+        self._changes.reset(len(self._store))
+        if self._cache is not None:
+            self._cache.clear()
@@ -0,0 +1,165 @@
+from bisect import bisect_right
+from itertools import islice
+
+# Виды записей журнала: смена жанра названия, изменение избранного
+GENRE = 'genre'
+FAVORITE = 'favorite'
+
+
+class ChangeSet:
+    """
+    Изменения коллекции после указанной версии.
+    - version: текущая версия коллекции (передается в следующий changes_since)
+    - titles: {название: жанр} - добавленные названия и названия со сменой жанра
+    - favorites: {название: True/False} - в избранном ли название сейчас
+    - full: True, если запрошенная версия старше журнала; тогда изменений
+      недостаточно и реплика должна заново выгрузить коллекцию целиком
+    Значения - текущие, поэтому изменения идемпотентны.
+    """
+
+    __slots__ = ('version', 'titles', 'favorites', 'full')
+
+    def __init__(self, version, titles=None, favorites=None, full=False):
+        self.version = version
+        self.titles = {} if titles is None else titles
+        self.favorites = {} if favorites is None else favorites
+        self.full = full
+
+    def __len__(self):
+        return len(self.titles) + len(self.favorites)
+
+    def __repr__(self):
+        return (f'ChangeSet(version={self.version}, titles={self.titles!r}, '
+                f'favorites={self.favorites!r}, full={self.full})')
+
+
+class ChangeLog:
+    """
+    Журнал изменений коллекции с монотонной версией.
+    Каждое изменение увеличивает версию на 1, пакет из k добавлений - на k.
+    - Добавления не хранятся поштучно: названия дописываются в конец хранилища,
+      поэтому журнал помнит только серии добавлений (версия начала, размер
+      коллекции в начале), а добавленные после версии v названия - это хвост
+      хранилища начиная с size_at(v)
+    - Для смены жанра и избранного хранится ключ (вид, название) с версией
+      последнего изменения; повторные изменения одного ключа не раздувают журнал
+    Значения (жанр, признак избранного) берутся из коллекции при запросе,
+    так что changes_since(v) стоит O(изменений после v).
+    Политика уплотнения: когда записей и серий вместе больше max_entries,
+    вытесняются старейшие из них до 3/4 max_entries, а нижняя граница журнала
+    (floor) поднимается до версии вытесненных;
+    запросы с версией ниже границы получают ChangeSet с full=True.
+    """
+
+    def __init__(self, max_entries=100000, size=0, version=0):
+        self.max_entries = max_entries
+        # Журнал может начинаться не с нуля (продолжение версий сохраненной коллекции):
+        # изменения до начальной версии по нему не восстановить
+        self.version = version
+        self.floor = version  # Изменения с версиями <= floor не восстановить по журналу
+        self._entries = {}  # (вид, название) -> версия, по возрастанию версии
+        # Серии добавлений: версия и размер коллекции в начале серии
+        self._run_versions = [version]
+        self._run_sizes = [size]  # size - число названий в коллекции при создании журнала
+        self._size = size
+        self._adding = True
+
+    def __len__(self):
+        return len(self._entries) + len(self._run_versions)
+
+    def record(self, kind, name):
+        self.version += 1
+        key = (kind, name)
+        # Удаление и повторная вставка переносит ключ в конец порядка словаря
+        self._entries.pop(key, None)
+        self._entries[key] = self.version
+        self._adding = False
+        if len(self) > self.max_entries:
+            self._evict()
+
+    def record_added(self, count):
+        """Отмечает добавление count новых названий в конец хранилища."""
+        if not self._adding:
+            if len(self._run_sizes) > 1 and self._run_sizes[-1] == self._size:
+                # Прошлая серия ничего не добавила: она сдвигается сюда, а не дополняется новой
+                self._run_versions[-1] = self.version
+            else:
+                self._run_versions.append(self.version)
+                self._run_sizes.append(self._size)
+            self._adding = True
+            if len(self) > self.max_entries:
+                self._evict()
+        self.version += count
+        self._size += count
+
+    def reset(self, size):
+        """Отмечает замену коллекции целиком (size - новый размер): прежние версии требуют полной выгрузки."""
+        self.version += 1
+        self.floor = self.version
+        self._entries = {}
+        self._run_versions = [self.version]
+        self._run_sizes = [size]
+        self._size = size
+        self._adding = True
+
+    def size_at(self, version):
+        """Размер коллекции на момент версии version."""
+        run = bisect_right(self._run_versions, version) - 1
+        end = self._run_sizes[run + 1] if run + 1 < len(self._run_sizes) else self._size
+        start = self._run_sizes[run]
+        return start + min(version - self._run_versions[run], end - start)
+
+    def changed_since(self, version):
+        """Ключи (вид, название), измененные после version, в порядке изменений."""
+        changed = []
+        for key in reversed(self._entries):
+            if self._entries[key] <= version:
+                break
+            changed.append(key)
+        changed.reverse()
+        return changed
+
+    def changes_since(self, version, store, favorites):
+        """Изменения после version по текущему состоянию хранилища и избранного (ChangeSet)."""
+        if version < self.floor:
+            return ChangeSet(self.version, full=True)
+        titles = dict(store.items_from(self.size_at(version)))
+        changed_favorites = {}
+        for kind, name in self.changed_since(version):
+            if kind == GENRE:
+                titles[name] = store.get(name)
+            else:
+                changed_favorites[name] = name in favorites
+        return ChangeSet(self.version, titles, changed_favorites)
+
+    def _evict(self):
+        """
+        Уплотняет журнал до 3/4 max_entries: граница поднимается по самым старым
+        событиям - записям и началам серий вместе, - пока остаток не уложится в
+        цель. Каждое уплотнение освобождает четверть журнала, поэтому его
+        стоимость на одно изменение - O(1) в среднем.
+        """
+        target = self.max_entries - self.max_entries // 4
+        versions = iter(self._entries.values())
+        entry = next(versions, None)
+        # Серия нужна, пока граница не дошла до начала следующей: событие - начало следующей серии
+        run = 1
+        runs = self._run_versions
+        dropped = 0
+        excess = len(self) - target
+        while excess > 0 and (entry is not None or run < len(runs)):
+            if run >= len(runs) or (entry is not None and entry <= runs[run]):
+                self.floor = max(self.floor, entry)
+                dropped += 1
+                entry = next(versions, None)
+            else:
+                self.floor = max(self.floor, runs[run])
+                run += 1
+            excess -= 1
+        if dropped:
+            self._entries = dict(islice(self._entries.items(), dropped, None))
+        # Серии до границы нужны только последней, в которую попадает floor
+        run = bisect_right(runs, self.floor) - 1
+        if run > 0:
+            del self._run_versions[:run]
+            del self._run_sizes[:run]
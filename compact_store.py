@@ -0,0 +1,226 @@
+import re
+from array import array
+from zlib import crc32
+
+
+def title_hash(encoded):
+    """Стабильный между процессами хеш названия (в отличие от hash())."""
+    return crc32(encoded)
+
+
+class CodedTitleTable:
+    """
+    Общая часть компактных хранилищ: таблица названий с номерами.
+    Наследник задает:
+    - _blob: UTF-8 названия подряд, _offsets: границы названий в _blob
+    - _codes: код жанра на каждое название (по байту), _genres: код -> жанр
+    - _hash: хеш-таблица с открытой адресацией (номер + 1, 0 - пусто)
+    Выборки по жанру - поиск байта кода регулярным выражением по _codes,
+    то есть один проход на уровне C без Python-объектов на каждое название.
+    """
+
+    def _raw_name(self, title_id):
+        return self._blob[self._offsets[title_id]:self._offsets[title_id + 1]]
+
+    def _name(self, title_id):
+        return str(self._raw_name(title_id), 'utf-8')
+
+    def _find(self, name, encoded=None):
+        if encoded is None:
+            try:
+                encoded = name.encode('utf-8')
+            except (AttributeError, UnicodeEncodeError):
+                return -1
+        mask = len(self._hash) - 1
+        slot = title_hash(encoded) & mask
+        while True:
+            value = self._hash[slot]
+            if not value:
+                return -1
+            if self._raw_name(value - 1) == encoded:
+                return value - 1
+            slot = (slot + 1) & mask
+
+    def position(self, name):
+        return self._find(name)
+
+    def name_at(self, position):
+        return self._name(position)
+
+    def _compile_patterns(self, is_for_children):
+        self._code_patterns = {genre: re.compile(re.escape(bytes([code])))
+                               for code, genre in enumerate(self._genres)}
+        self._children_codes = bytes(code for code, genre in enumerate(self._genres)
+                                     if is_for_children(genre))
+        self._children_pattern = (re.compile(b'[' + re.escape(self._children_codes) + b']')
+                                  if self._children_codes else None)
+
+    def genres(self):
+        """Таблица жанров: код -> жанр."""
+        return list(self._genres)
+
+    def mapping(self):
+        """Материализует словарь название -> жанр (O(n))."""
+        return dict(self.items())
+
+    def items(self):
+        genres = self._genres
+        codes = self._codes
+        for title_id in range(len(self)):
+            yield self._name(title_id), genres[codes[title_id]]
+
+    def items_from(self, position):
+        genres = self._genres
+        codes = self._codes
+        for title_id in range(max(position, 0), len(self)):
+            yield self._name(title_id), genres[codes[title_id]]
+
+    def get(self, name):
+        title_id = self._find(name)
+        return None if title_id < 0 else self._genres[self._codes[title_id]]
+
+    def __contains__(self, name):
+        return self._find(name) >= 0
+
+    def titles(self, genre):
+        pattern = self._code_patterns.get(genre)
+        if pattern is None:
+            return []
+        return [self._name(match.start()) for match in pattern.finditer(self._codes)]
+
+    def iter_titles(self, genre, after=-1):
+        """Лениво выдает пары (номер, название) жанра с номером больше after."""
+        return self._iter_codes(lambda: self._code_patterns.get(genre), after)
+
+    def count(self, genre):
+        if genre not in self._code_patterns:
+            return 0
+        return self._code_counts()[self._genres.index(genre)]
+
+    def children(self):
+        if self._children_pattern is None:
+            return []
+        return [self._name(match.start()) for match in self._children_pattern.finditer(self._codes)]
+
+    def iter_children(self, after=-1):
+        return self._iter_codes(lambda: self._children_pattern, after)
+
+    def _iter_codes(self, pattern_of, after):
+        # Каждое совпадение ищется отдельным search() с позиции после предыдущего:
+        # между выдачами массив кодов может расти, поэтому совпадения не берутся
+        # из одного finditer. Шаблон запрашивается заново, так как при появлении
+        # нового жанра шаблоны перекомпилируются.
+        position = after + 1
+        while True:
+            pattern = pattern_of()
+            match = pattern.search(self._codes, position) if pattern is not None else None
+            if match is None:
+                return
+            title_id = match.start()
+            yield title_id, self._name(title_id)
+            position = title_id + 1
+
+    def children_count(self):
+        counts = self._code_counts()
+        return sum(counts[code] for code in self._children_codes)
+
+
+class CompactTitleStore(CodedTitleTable):
+    """
+    Компактное изменяемое хранилище для больших каталогов.
+    Вместо словаря строк названия хранятся одной UTF-8 таблицей строк,
+    жанр - однобайтовым кодом в array('B'), поиск названия - через
+    хеш-таблицу array('I'). На название приходится примерно длина UTF-8
+    плюс ~25 байт вместо сотен байт на объекты str и записи словарей.
+    Ответы методов те же, что у DictTitleStore, но mapping() каждый раз
+    строит новый словарь, а выборки по жанру стоят O(n) на уровне C.
+    """
+
+    read_only = False
+
+    def __init__(self, is_for_children, mapping=None, genres=()):
+        self._is_for_children = is_for_children
+        self._base_genres = [''] + [genre for genre in genres if genre]
+        self.replace({} if mapping is None else mapping)
+
+    def replace(self, mapping):
+        """Заменяет содержимое парами из mapping (словарь или итерируемое пар)."""
+        self._genres = list(self._base_genres)
+        self._code_by_genre = {genre: code for code, genre in enumerate(self._genres)}
+        self._counts = [0] * len(self._genres)
+        self._blob = bytearray()
+        self._offsets = array('Q', [0])
+        self._codes = array('B')
+        self._hash = array('I', bytes(4 * 8))
+        self._compile_patterns(self._is_for_children)
+        items = mapping.items() if hasattr(mapping, 'items') else mapping
+        for name, genre in items:
+            self._append(name, genre)
+
+    def _code(self, genre):
+        code = self._code_by_genre.get(genre)
+        if code is None:
+            code = len(self._genres)
+            if code > 255:
+                raise ValueError('компактное хранилище поддерживает не больше 256 жанров')
+            self._genres.append(genre)
+            self._code_by_genre[genre] = code
+            self._counts.append(0)
+            self._compile_patterns(self._is_for_children)
+        return code
+
+    def _append(self, name, genre=''):
+        encoded = name.encode('utf-8')
+        title_id = len(self._codes)
+        if (title_id + 1) * 2 > len(self._hash):
+            self._grow_hash()
+        mask = len(self._hash) - 1
+        slot = title_hash(encoded) & mask
+        while self._hash[slot]:
+            slot = (slot + 1) & mask
+        self._hash[slot] = title_id + 1
+        self._blob += encoded
+        self._offsets.append(len(self._blob))
+        code = self._code(genre)
+        self._codes.append(code)
+        self._counts[code] += 1
+
+    def _grow_hash(self):
+        # Заполненность хеш-таблицы держится не выше 1/2
+        table = array('I', bytes(8 * len(self._hash)))
+        mask = len(table) - 1
+        for title_id in range(len(self._codes)):
+            slot = title_hash(self._raw_name(title_id)) & mask
+            while table[slot]:
+                slot = (slot + 1) & mask
+            table[slot] = title_id + 1
+        self._hash = table
+
+    def _code_counts(self):
+        return self._counts
+
+    def __len__(self):
+        return len(self._codes)
+
+    def add(self, name):
+        self._append(name)
+
+    def add_many(self, titles):
+        """Добавляет новые названия: titles - словарь {название: жанр}."""
+        for name, genre in titles.items():
+            self._append(name, genre)
+
+    def set_genre(self, name, genre):
+        title_id = self._find(name)
+        code = self._code(genre)
+        self._counts[self._codes[title_id]] -= 1
+        self._counts[code] += 1
+        self._codes[title_id] = code
+
+    def favorites(self):
+        return ()
+
+    def memory_size(self):
+        """Приблизительный объем данных хранилища в байтах."""
+        return (len(self._blob) + self._offsets.itemsize * len(self._offsets)
+                + self._codes.itemsize * len(self._codes) + self._hash.itemsize * len(self._hash))
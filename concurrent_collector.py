@@ -0,0 +1,141 @@
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
+from books_collector import BooksCollector
+from movie_collector import MovieCollector
+
+
+class RWLock:
+    """
+    Блокировка читатель/писатель с приоритетом писателей.
+    - Читателей может быть несколько одновременно, писатель - только один
+    - Ожидающий писатель не пропускает новых читателей (нет голодания записи)
+    - Повторный захват тем же потоком разрешен: писатель может читать
+      и снова писать, читатель - снова читать
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = None  # Поток, удерживающий запись
+        self._writer_depth = 0
+        self._writers_waiting = 0
+        self._local = threading.local()
+
+    @contextmanager
+    def read_locked(self):
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write_locked(self):
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+    def acquire_read(self):
+        me = threading.get_ident()
+        depth = getattr(self._local, 'depth', 0)
+        with self._condition:
+            if self._writer != me and not depth:
+                while self._writer is not None or self._writers_waiting:
+                    self._condition.wait()
+            self._readers += 1
+        self._local.depth = depth + 1
+
+    def release_read(self):
+        self._local.depth -= 1
+        with self._condition:
+            self._readers -= 1
+            if not self._readers:
+                self._condition.notify_all()
+
+    def acquire_write(self):
+        me = threading.get_ident()
+        with self._condition:
+            if self._writer == me:
+                self._writer_depth += 1
+                return
+            if getattr(self._local, 'depth', 0):
+                raise RuntimeError('нельзя повысить блокировку чтения до записи')
+            self._writers_waiting += 1
+            while self._writer is not None or self._readers:
+                self._condition.wait()
+            self._writers_waiting -= 1
+            self._writer = me
+            self._writer_depth = 1
+
+    def release_write(self):
+        with self._condition:
+            self._writer_depth -= 1
+            if not self._writer_depth:
+                self._writer = None
+                self._condition.notify_all()
+
+
+def _with_lock(method, lock_method):
+    @wraps(method)
+    def locked(self, *args, **kwargs):
+        with getattr(self._lock, lock_method)():
+            return method(self, *args, **kwargs)
+    return locked
+
+
+def _synchronize(cls):
+    """
+    Оборачивает методы READ_METHODS/WRITE_METHODS класса в блокировки.
+    Записи в обход этих методов - запись через TitlesView (books_genre,
+    movies_genre) и присваивание свойств (словаря, избранного) - тоже
+    выполняются под блокировкой записи.
+    """
+    for name in cls.READ_METHODS:
+        setattr(cls, name, _with_lock(getattr(cls, name), 'read_locked'))
+    for name in cls.WRITE_METHODS:
+        setattr(cls, name, _with_lock(getattr(cls, name), 'write_locked'))
+    cls._assign_genre = _with_lock(cls._assign_genre, 'write_locked')
+    for name in dir(cls):
+        attribute = getattr(cls, name)
+        if isinstance(attribute, property) and attribute.fset is not None:
+            setattr(cls, name, attribute.setter(_with_lock(attribute.fset, 'write_locked')))
+    return cls
+
+
+@_synchronize
+class ConcurrentBooksCollector(BooksCollector):
+    """
+    Потокобезопасная коллекция книг для общего использования потоками.
+    Чтения выполняются параллельно под блокировкой чтения, изменения -
+    под блокировкой записи. get_books_genre и get_list_of_favorites_books
+    возвращают словарь и список, снятые под блокировкой чтения.
+    Ленивые iter_* выполняются без блокировки; для согласованных выборок
+    под блокировкой используются страницы get_*_page с курсором.
+    """
+
+    __slots__ = ('_lock',)
+
+    def __init__(self, *args, **kwargs):
+        self._lock = RWLock()
+        super().__init__(*args, **kwargs)
+
+
+@_synchronize
+class ConcurrentMovieCollector(MovieCollector):
+    """
+    Потокобезопасная коллекция фильмов для общего использования потоками.
+    Чтения выполняются параллельно под блокировкой чтения, изменения -
+    под блокировкой записи. get_all_movies и get_favorites_movies
+    возвращают словарь и список, снятые под блокировкой чтения. Ленивые iter_* блокировку
+    не берут, страницы get_*_page снимаются под блокировкой чтения.
+    """
+
+    __slots__ = ('_lock',)
+
+    def __init__(self, *args, **kwargs):
+        self._lock = RWLock()
+        super().__init__(*args, **kwargs)
@@ -0,0 +1,145 @@
+import re
+
+try:
+    import numpy
+except ImportError:  # Без NumPy фильтрация выполняется через bytes.translate
+    numpy = None
+
+# Жанры кодируются битами одного байта на название
+MAX_GENRES = 8
+_HIT = re.compile(b'\x01')
+_TOKEN = re.compile(r'\(|\)|[^\s()]+')
+_OPERATORS = ('AND', 'OR', 'NOT')
+
+
+def parse_query(query):
+    """
+    Разбирает запрос по жанрам в дерево.
+    Операторы AND, OR, NOT (заглавными буквами) и скобки; приоритет
+    NOT > AND > OR. Название жанра может состоять из нескольких слов.
+    Узлы дерева: ('genre', название), ('not', узел), ('and', узел, узел), ('or', узел, узел).
+    """
+    tokens = _TOKEN.findall(query)
+    position = 0
+
+    def peek():
+        return tokens[position] if position < len(tokens) else None
+
+    def take():
+        nonlocal position
+        position += 1
+        return tokens[position - 1]
+
+    def parse_or():
+        node = parse_and()
+        while peek() == 'OR':
+            take()
+            node = ('or', node, parse_and())
+        return node
+
+    def parse_and():
+        node = parse_not()
+        while peek() == 'AND':
+            take()
+            node = ('and', node, parse_not())
+        return node
+
+    def parse_not():
+        if peek() == 'NOT':
+            take()
+            return ('not', parse_not())
+        if peek() == '(':
+            take()
+            node = parse_or()
+            if peek() != ')':
+                raise ValueError(f'ожидалась ")" в запросе {query!r}')
+            take()
+            return node
+        words = []
+        while peek() is not None and peek() not in _OPERATORS and peek() not in '()':
+            words.append(take())
+        if not words:
+            raise ValueError(f'ожидался жанр в запросе {query!r}')
+        return ('genre', ' '.join(words))
+
+    tree = parse_or()
+    if peek() is not None:
+        raise ValueError(f'лишний токен {peek()!r} в запросе {query!r}')
+    return tree
+
+
+def _evaluate(node, mask, bits):
+    kind = node[0]
+    if kind == 'genre':
+        return bool(mask & bits.get(node[1], 0))
+    if kind == 'not':
+        return not _evaluate(node[1], mask, bits)
+    if kind == 'and':
+        return _evaluate(node[1], mask, bits) and _evaluate(node[2], mask, bits)
+    return _evaluate(node[1], mask, bits) or _evaluate(node[2], mask, bits)
+
+
+class GenreMaskColumn:
+    """
+    Столбец битовых масок жанров: байт на название в порядке добавления.
+    Бит i означает жанр genres[i]; жанры вне списка битов не получают.
+    Запрос компилируется в таблицу истинности на все 256 значений маски,
+    после чего фильтрация - одна векторная операция над столбцом:
+    индексирование массива NumPy, если он установлен, иначе bytes.translate
+    и поиск единичных байтов регулярным выражением - без Python-кода на название.
+    """
+
+    def __init__(self, genres, masks=()):
+        if len(genres) > MAX_GENRES:
+            raise ValueError(f'битовая маска поддерживает не больше {MAX_GENRES} жанров')
+        self.genres = list(genres)
+        self._bits = {genre: 1 << bit for bit, genre in enumerate(self.genres)}
+        self._column = bytearray(masks)
+
+    def __len__(self):
+        return len(self._column)
+
+    def mask_of(self, genres):
+        mask = 0
+        for genre in genres:
+            mask |= self._bits.get(genre, 0)
+        return mask
+
+    def append(self, genres=()):
+        self._column.append(self.mask_of(genres))
+
+    def extend(self, masks):
+        self._column.extend(masks)
+
+    def set(self, position, genres):
+        """Заменяет маску названия; возвращает True, если она изменилась."""
+        mask = self.mask_of(genres)
+        if self._column[position] == mask:
+            return False
+        self._column[position] = mask
+        return True
+
+    def genres_at(self, position):
+        mask = self._column[position]
+        return [genre for genre in self.genres if mask & self._bits[genre]]
+
+    def compile(self, query):
+        """Таблица истинности запроса: 256 байт, 1 - маска подходит."""
+        tree = parse_query(query)
+        return bytes(_evaluate(tree, mask, self._bits) for mask in range(256))
+
+    def positions(self, table, after=-1):
+        """Лениво выдает позиции названий, маска которых подходит под таблицу, после after."""
+        start = after + 1
+        if numpy is not None:
+            column = numpy.frombuffer(bytes(self._column[start:]), dtype=numpy.uint8)
+            hits = numpy.frombuffer(table, dtype=numpy.uint8)[column]
+            return (start + int(offset) for offset in numpy.flatnonzero(hits))
+        hits = self._column[start:].translate(table)
+        return (start + match.start() for match in _HIT.finditer(hits))
+
+    def count(self, table):
+        if numpy is not None:
+            column = numpy.frombuffer(bytes(self._column), dtype=numpy.uint8)
+            return int(numpy.count_nonzero(numpy.frombuffer(table, dtype=numpy.uint8)[column]))
+        return self._column.translate(table).count(1)
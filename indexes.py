@@ -0,0 +1,239 @@
+from bisect import bisect_left, bisect_right
+from itertools import chain, islice
+
+
+class TitleBucket:
+    """
+    Множество названий, упорядоченное по порядку добавления в коллекцию.
+    Каждому названию соответствует порядковый номер (seq), выданный при
+    добавлении в коллекцию, поэтому порядок обхода совпадает с порядком
+    ключей исходного словаря.
+    Пары (номер, название) хранятся блоками не длиннее 2 * BLOCK_SIZE,
+    упорядоченными по номеру; для каждого блока известен наибольший номер.
+    - Добавление в конец (seq больше последнего) - O(1)
+    - Добавление не в конец и удаление - O(log n + BLOCK_SIZE): меняется один блок
+    - Обход - O(размер результата), обход с номера - O(log n + размер страницы)
+    Чтение ничего не перестраивает, поэтому параллельные читатели безопасны.
+    """
+
+    BLOCK_SIZE = 1000
+
+    def __init__(self):
+        self._seq_blocks = []  # Блоки номеров, внутри и между блоками по возрастанию
+        self._name_blocks = []  # Названия, параллельно _seq_blocks
+        self._maxes = []  # Наибольший номер каждого блока
+        self._index = {}  # Название -> порядковый номер
+        # Растет при каждом сдвиге элементов внутри блоков (вставка не в конец,
+        # удаление, разбиение блока): по нему ленивый обход находит свое место заново
+        self._shifts = 0
+
+    def add(self, name, seq):
+        if name in self._index:
+            return
+        self._index[name] = seq
+        maxes = self._maxes
+        if not maxes or seq > maxes[-1]:
+            if not maxes:
+                self._seq_blocks.append([])
+                self._name_blocks.append([])
+                maxes.append(seq)
+            block = len(maxes) - 1
+            self._seq_blocks[block].append(seq)
+            self._name_blocks[block].append(name)
+            maxes[block] = seq
+        else:
+            block = bisect_left(maxes, seq)
+            seqs = self._seq_blocks[block]
+            position = bisect_left(seqs, seq)
+            seqs.insert(position, seq)
+            self._name_blocks[block].insert(position, name)
+            self._shifts += 1
+        if len(self._seq_blocks[block]) > 2 * self.BLOCK_SIZE:
+            self._split(block)
+
+    def _split(self, block):
+        half = self.BLOCK_SIZE
+        seqs = self._seq_blocks[block]
+        names = self._name_blocks[block]
+        self._seq_blocks[block + 1:block + 1] = [seqs[half:]]
+        self._name_blocks[block + 1:block + 1] = [names[half:]]
+        del seqs[half:], names[half:]
+        self._maxes.insert(block, seqs[-1])
+        self._shifts += 1
+
+    def discard(self, name):
+        seq = self._index.pop(name, None)
+        if seq is None:
+            return
+        block = bisect_left(self._maxes, seq)
+        seqs = self._seq_blocks[block]
+        position = bisect_left(seqs, seq)
+        del seqs[position]
+        del self._name_blocks[block][position]
+        if seqs:
+            self._maxes[block] = seqs[-1]
+        else:
+            del self._seq_blocks[block], self._name_blocks[block], self._maxes[block]
+        self._shifts += 1
+
+    def __contains__(self, name):
+        return name in self._index
+
+    def __len__(self):
+        return len(self._index)
+
+    def __iter__(self):
+        return chain.from_iterable(self._name_blocks)
+
+    def _locate(self, after):
+        # Блок и позиция первого элемента с номером больше after
+        block = bisect_right(self._maxes, after)
+        if block == len(self._maxes):
+            return block, 0
+        return block, bisect_right(self._seq_blocks[block], after)
+
+    def iter_after(self, after=-1):
+        """
+        Лениво выдает пары (номер, название) с номером больше after.
+        Добавленные во время обхода названия с большими номерами тоже будут выданы.
+        """
+        shifts = self._shifts
+        block, position = self._locate(after)
+        while True:
+            if shifts != self._shifts:
+                # Элементы сдвинулись: место обхода находится заново по последнему номеру
+                shifts = self._shifts
+                block, position = self._locate(after)
+            if block >= len(self._seq_blocks):
+                return
+            seqs = self._seq_blocks[block]
+            if position >= len(seqs):
+                block, position = block + 1, 0
+                continue
+            after = seqs[position]
+            name = self._name_blocks[block][position]
+            position += 1
+            yield after, name
+
+
+class GenreIndex:
+    """
+    Вторичный индекс жанр -> названия.
+    Обновляется инкрементально при добавлении книги/фильма и смене жанра,
+    поэтому запрос по жанру стоит O(размер результата).
+    """
+
+    def __init__(self):
+        self._positions = {}  # Название -> порядковый номер добавления
+        self._buckets = {}  # Жанр -> TitleBucket
+        self._next_seq = 0
+
+    def add_title(self, name, genre=''):
+        seq = self._next_seq
+        self._next_seq += 1
+        self._positions[name] = seq
+        self._bucket(genre).add(name, seq)
+
+    def add_titles(self, titles):
+        """Пакетно добавляет новые названия: titles - пары (название, жанр)."""
+        positions = self._positions
+        seq = self._next_seq
+        for name, genre in titles:
+            positions[name] = seq
+            self._bucket(genre).add(name, seq)
+            seq += 1
+        self._next_seq = seq
+
+    def set_genre(self, name, old_genre, new_genre):
+        if old_genre == new_genre:
+            return
+        bucket = self._buckets.get(old_genre)
+        if bucket is not None:
+            bucket.discard(name)
+        self._bucket(new_genre).add(name, self._positions[name])
+
+    def position(self, name):
+        return self._positions[name]
+
+    def titles(self, genre):
+        bucket = self._buckets.get(genre)
+        return list(bucket) if bucket is not None else []
+
+    def iter_titles(self, genre, after=-1):
+        """Лениво выдает пары (номер, название) жанра с номером больше after."""
+        bucket = self._buckets.get(genre)
+        return bucket.iter_after(after) if bucket is not None else iter(())
+
+    def count(self, genre):
+        bucket = self._buckets.get(genre)
+        return len(bucket) if bucket is not None else 0
+
+    def rebuild(self, mapping):
+        """Полностью пересобирает индекс по словарю название -> жанр."""
+        self._positions = {}
+        self._buckets = {}
+        self._next_seq = 0
+        for name, genre in mapping.items():
+            self.add_title(name, genre)
+
+    def _bucket(self, genre):
+        bucket = self._buckets.get(genre)
+        if bucket is None:
+            bucket = self._buckets[genre] = TitleBucket()
+        return bucket
+
+
+class FavoritesSet:
+    """
+    Избранное: множество названий с сохранением порядка добавления.
+    Основано на словаре, поэтому проверка вхождения, добавление и удаление
+    стоят O(1). Сравнивается со списками и поддерживает доступ по индексу,
+    так что может использоваться там, где раньше возвращался список.
+    """
+
+    def __init__(self, names=()):
+        self._items = dict.fromkeys(names)
+
+    def add(self, name):
+        self._items[name] = None
+
+    def discard(self, name):
+        self._items.pop(name, None)
+
+    def append(self, name):
+        self.add(name)
+
+    def remove(self, name):
+        if name not in self._items:
+            raise ValueError(f'{name!r} is not in favorites')
+        del self._items[name]
+
+    def __contains__(self, name):
+        return name in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self._items)[index]
+        if index < 0:
+            index += len(self._items)
+        if not 0 <= index < len(self._items):
+            raise IndexError('favorites index out of range')
+        return next(islice(self._items, index, None))
+
+    def __eq__(self, other):
+        if isinstance(other, FavoritesSet):
+            return list(self._items) == list(other)
+        if isinstance(other, (list, tuple)):
+            return list(self._items) == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(list(self._items))
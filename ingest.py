@@ -0,0 +1,71 @@
+# Причины отклонения при пакетной загрузке
+INVALID_ITEM = 'invalid_item'
+INVALID_LENGTH = 'invalid_length'
+DUPLICATE = 'duplicate'
+INVALID_GENRE = 'invalid_genre'
+
+
+class IngestReport:
+    """
+    Итог пакетной загрузки.
+    - added: сколько названий добавлено
+    - rejected: список (номер_элемента, название, причина); при заданном
+      limit хранятся только первые limit отклонений
+    - rejected_count: сколько элементов отклонено всего
+    Название с недопустимым жанром добавляется без жанра, но тоже попадает
+    в rejected с причиной INVALID_GENRE.
+    """
+
+    def __init__(self, limit=None):
+        self.added = 0
+        self.rejected = []
+        self.rejected_count = 0
+        self._limit = limit
+        self._counts = {}  # Причина -> число отклонений, включая не попавшие в rejected
+
+    def reject(self, position, name, reason):
+        self.rejected_count += 1
+        self._counts[reason] = self._counts.get(reason, 0) + 1
+        if self._limit is None or len(self.rejected) < self._limit:
+            self.rejected.append((position, name, reason))
+
+    def reasons(self):
+        """Количество отклонений по каждой причине."""
+        return dict(self._counts)
+
+    def __repr__(self):
+        return f'IngestReport(added={self.added}, rejected={self.rejected_count})'
+
+
+def validate_batch(items, existing, min_length, max_length, genres):
+    """
+    Проверяет пакет за один проход.
+    items - названия или пары (название, жанр); пустой жанр означает 'без жанра'.
+    Элемент другого вида (в том числе пара с жанром не строкой) отклоняется как INVALID_ITEM.
+    Возвращает словарь принятых названий {название: жанр} в порядке
+    поступления и отчет IngestReport.
+    """
+    report = IngestReport()
+    accepted = {}
+    for position, item in enumerate(items):
+        if isinstance(item, str):
+            name, genre = item, None
+        elif isinstance(item, (tuple, list)) and len(item) == 2 and isinstance(item[0], str) \
+                and (item[1] is None or isinstance(item[1], str)):
+            name, genre = item
+        else:
+            report.reject(position, item, INVALID_ITEM)
+            continue
+        if not min_length <= len(name) <= max_length:
+            report.reject(position, name, INVALID_LENGTH)
+            continue
+        if name in existing or name in accepted:
+            report.reject(position, name, DUPLICATE)
+            continue
+        if not genre or genre in genres:
+            accepted[name] = genre or ''
+        else:
+            accepted[name] = ''
+            report.reject(position, name, INVALID_GENRE)
+    report.added = len(accepted)
+    return accepted, report
@@ -0,0 +1,196 @@
+import cProfile
+import io
+import pstats
+import threading
+from time import perf_counter_ns
+
+# Подклассы с замерами, по одному на исходный класс коллекции
+_instrumented_classes = {}
+
+
+class MethodStats:
+    """Накопленная статистика одного метода."""
+
+    __slots__ = ('calls', 'errors', 'total_ns', 'max_ns', 'result_items')
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.result_items = 0  # Суммарный размер результатов (len), где он определен
+
+    def as_dict(self):
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'total_seconds': self.total_ns / 1e9,
+            'mean_seconds': self.total_ns / self.calls / 1e9 if self.calls else 0.0,
+            'max_seconds': self.max_ns / 1e9,
+            'result_items': self.result_items,
+        }
+
+
+class Instrumentation:
+    """
+    Статистика вызовов методов одной коллекции.
+    - Число вызовов, ошибок, суммарная и максимальная задержка, размер результатов
+    - snapshot() - словарь для API, prometheus() - текст в формате Prometheus
+    - profile_every=N: каждый N-й вызов выполняется под cProfile,
+      накопленный профиль доступен через profile_stats()
+    """
+
+    def __init__(self, collector_name, profile_every=0):
+        self.collector_name = collector_name
+        self.profile_every = profile_every
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._profiler = cProfile.Profile() if profile_every else None
+        self._profiled_calls = 0
+        self._profiling = False
+        self._calls = 0
+
+    def _start_profile(self):
+        # Профилируется не больше одного вызова одновременно: вложенные
+        # вызовы и вызовы из других потоков в это время не выбираются
+        if not self.profile_every:
+            return None
+        with self._lock:
+            self._calls += 1
+            if self._profiling or self._calls % self.profile_every:
+                return None
+            self._profiling = True
+            self._profiled_calls += 1
+            return self._profiler
+
+    def _stop_profile(self):
+        with self._lock:
+            self._profiling = False
+
+    def _record(self, name, elapsed_ns, result, failed):
+        size = _result_size(result)
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = MethodStats()
+            stats.calls += 1
+            stats.total_ns += elapsed_ns
+            if elapsed_ns > stats.max_ns:
+                stats.max_ns = elapsed_ns
+            if failed:
+                stats.errors += 1
+            elif size is not None:
+                stats.result_items += size
+
+    def snapshot(self):
+        """Статистика по методам: {метод: {calls, errors, total_seconds, ...}}."""
+        with self._lock:
+            return {name: stats.as_dict() for name, stats in sorted(self._stats.items())}
+
+    def reset(self):
+        with self._lock:
+            self._stats = {}
+            if self._profiler is not None and not self._profiling:
+                self._profiler = cProfile.Profile()
+                self._profiled_calls = 0
+
+    def prometheus(self, prefix='collector'):
+        """Статистика в текстовом формате экспозиции Prometheus."""
+        metrics = (
+            ('calls_total', 'counter', 'Число вызовов метода', 'calls', None),
+            ('errors_total', 'counter', 'Число вызовов, завершившихся исключением', 'errors', None),
+            ('latency_seconds_total', 'counter', 'Суммарное время выполнения метода', 'total_ns', 1e-9),
+            ('latency_seconds_max', 'gauge', 'Максимальное время одного вызова', 'max_ns', 1e-9),
+            ('result_items_total', 'counter', 'Суммарный размер результатов метода', 'result_items', None),
+        )
+        with self._lock:
+            stats = sorted(self._stats.items())
+            lines = []
+            for suffix, kind, description, field, scale in metrics:
+                metric = f'{prefix}_{suffix}'
+                lines.append(f'# HELP {metric} {description}')
+                lines.append(f'# TYPE {metric} {kind}')
+                for name, method_stats in stats:
+                    value = getattr(method_stats, field)
+                    # Счетчики - целые числа без округления, секунды - float с полной точностью
+                    text = str(int(value)) if scale is None else repr(float(value * scale))
+                    lines.append(f'{metric}{{collector="{self.collector_name}",method="{name}"}} {text}')
+        return '\n'.join(lines) + '\n'
+
+    def profile_stats(self):
+        """Профиль выборочных вызовов (pstats.Stats) или None, если выборка выключена."""
+        if self._profiler is None or not self._profiled_calls:
+            return None
+        return pstats.Stats(self._profiler, stream=io.StringIO())
+
+
+def _result_size(result):
+    if result is None or isinstance(result, (str, bytes)):
+        return None
+    try:
+        return len(result)
+    except TypeError:
+        return None
+
+
+def _measured(name, method):
+    def measured(self, *args, **kwargs):
+        instrumentation = self._instrumentation
+        profiler = instrumentation._start_profile()
+        failed = True
+        result = None
+        start = perf_counter_ns()
+        try:
+            if profiler is not None:
+                try:
+                    result = profiler.runcall(method, self, *args, **kwargs)
+                finally:
+                    instrumentation._stop_profile()
+            else:
+                result = method(self, *args, **kwargs)
+            failed = False
+            return result
+        finally:
+            instrumentation._record(name, perf_counter_ns() - start, result, failed)
+
+    measured.__name__ = method.__name__
+    measured.__qualname__ = method.__qualname__
+    measured.__doc__ = method.__doc__
+    return measured
+
+
+def _instrumented_class(cls):
+    subclass = _instrumented_classes.get(cls)
+    if subclass is None:
+        methods = {name: _measured(name, getattr(cls, name))
+                   for name in cls.READ_METHODS + cls.WRITE_METHODS}
+        methods['_uninstrumented_class'] = cls
+        # Без новых слотов и __dict__ раскладка экземпляра совпадает с cls, и __class__ можно подменить
+        methods['__slots__'] = ()
+        subclass = _instrumented_classes[cls] = type(cls.__name__, (cls,), methods)
+    return subclass
+
+
+def instrument(collector, profile_every=0):
+    """
+    Включает замеры на коллекции и возвращает ее Instrumentation.
+    Класс экземпляра подменяется подклассом с измеряющими обертками
+    методов READ_METHODS/WRITE_METHODS, поэтому без instrument() коллекция
+    не платит за замеры ничего. Повторный вызов возвращает уже включенные замеры.
+    """
+    if hasattr(type(collector), '_uninstrumented_class'):
+        return collector._instrumentation
+    collector._instrumentation = Instrumentation(type(collector).__name__, profile_every)
+    collector.__class__ = _instrumented_class(type(collector))
+    return collector._instrumentation
+
+
+def uninstrument(collector):
+    """Выключает замеры и возвращает последнюю накопленную Instrumentation (или None)."""
+    cls = type(collector)
+    if not hasattr(cls, '_uninstrumented_class'):
+        return None
+    collector.__class__ = cls._uninstrumented_class
+    instrumentation = collector._instrumentation
+    del collector._instrumentation
+    return instrumentation
@@ -0,0 +1,97 @@
+import json
+import os
+from itertools import islice
+
+from ingest import INVALID_ITEM, IngestReport
+
+# Размер пакета, которым записи передаются в пакетную загрузку
+BATCH_SIZE = 10000
+# Сколько отклоненных строк load_jsonl хранит в отчете (остальные только считаются)
+MAX_REJECTED = 1000
+
+
+def iter_jsonl(path):
+    """Построчно читает JSONL-файл, отдавая пары (номер_строки, запись)."""
+    with open(path, encoding='utf-8') as file:
+        for line_no, line in enumerate(file, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield line_no, json.loads(line)
+            except ValueError as error:
+                raise ValueError(f'{path}:{line_no}: некорректный JSON: {error}') from None
+
+
+def load_jsonl(path, add_titles, add_to_favorites):
+    """
+    Потоково загружает коллекцию из JSONL.
+    Формат строк:
+    - {"name": "Название", "genre": "Жанр"} - название с жанром ("" - без жанра)
+    - {"favorite": "Название"} - добавление в избранное
+    Названия передаются в add_titles пакетами по BATCH_SIZE, поэтому
+    потребление памяти не зависит от размера файла.
+    Возвращает IngestReport, где номер элемента - номер строки файла; в нем
+    хранятся первые MAX_REJECTED отклонений, а для некорректной записи -
+    только номер строки и причина (название None).
+    """
+    report = IngestReport(limit=MAX_REJECTED)
+    pending = []  # Пары (номер_строки, элемент) текущего пакета
+
+    def flush():
+        batch = add_titles(item for _, item in pending)
+        report.added += batch.added
+        for position, name, reason in batch.rejected:
+            report.reject(pending[position][0], name, reason)
+        pending.clear()
+
+    for line_no, record in iter_jsonl(path):
+        if not isinstance(record, dict):
+            report.reject(line_no, None, INVALID_ITEM)
+        elif 'favorite' in record:
+            if not isinstance(record['favorite'], str):
+                report.reject(line_no, None, INVALID_ITEM)
+                continue
+            # Избранное может ссылаться на название из незавершенного пакета
+            if pending:
+                flush()
+            add_to_favorites(record['favorite'])
+        elif isinstance(record.get('name'), str) and _is_genre(record.get('genre')):
+            pending.append((line_no, (record['name'], record.get('genre') or '')))
+            if len(pending) >= BATCH_SIZE:
+                flush()
+        else:
+            report.reject(line_no, None, INVALID_ITEM)
+    if pending:
+        flush()
+    return report
+
+
+def _is_genre(value):
+    # Жанр - строка; отсутствующий или null означает 'без жанра'
+    return value is None or isinstance(value, str)
+
+
+def dump_jsonl(path, titles, favorites):
+    """
+    Потоково сохраняет коллекцию в JSONL: сначала названия с жанрами,
+    затем избранное в порядке добавления. Файл заменяется атомарно.
+    """
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as file:
+        for chunk in _chunks(titles):
+            file.writelines(
+                json.dumps({'name': name, 'genre': genre}, ensure_ascii=False) + '\n'
+                for name, genre in chunk
+            )
+        for chunk in _chunks(favorites):
+            file.writelines(
+                json.dumps({'favorite': name}, ensure_ascii=False) + '\n' for name in chunk
+            )
+    os.replace(tmp_path, path)
+
+
+def _chunks(iterable):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, BATCH_SIZE)):
+        yield chunk
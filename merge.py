@@ -0,0 +1,163 @@
+from indexes import FavoritesSet
+from ingest import INVALID_GENRE, IngestReport
+
+# Политики разрешения конфликта жанров (у названия в обеих коллекциях
+# установлены разные жанры); вместо политики можно передать функцию
+# policy(название, наш_жанр, их_жанр) -> жанр
+KEEP_OURS = 'ours'
+TAKE_THEIRS = 'theirs'
+PREFER_RESTRICTED = 'restricted'  # Жанр с возрастным ограничением, иначе наш
+# Виды различий двух коллекций
+ADDED = 'added'
+REMOVED = 'removed'
+REGENRED = 'regenred'
+# Новые названия передаются в пакетную загрузку пакетами такого размера
+BATCH_SIZE = 10000
+
+
+class MergeReport(IngestReport):
+    """
+    Итог слияния коллекций.
+    - added, rejected: как у IngestReport (номер элемента - номер названия
+      во вливаемой коллекции)
+    - regenred: у скольких существующих названий сменился жанр
+    - conflicts: список (название, наш_жанр, их_жанр) для названий с разными
+      установленными жанрами, независимо от выбранного политикой жанра
+    Пустой жанр конфликтом не считается: установленный жанр заполняет пустой.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.regenred = 0
+        self.conflicts = []
+
+    def __repr__(self):
+        return (f'MergeReport(added={self.added}, regenred={self.regenred}, '
+                f'conflicts={len(self.conflicts)}, rejected={self.rejected_count})')
+
+
+class CatalogDiff:
+    """
+    Различия двух коллекций (diff от нашей к их).
+    - added: {название: жанр} - есть только у них
+    - removed: {название: жанр} - есть только у нас
+    - regenred: {название: (наш_жанр, их_жанр)} - есть у обеих, жанры различаются
+    """
+
+    __slots__ = ('added', 'removed', 'regenred')
+
+    def __init__(self, added=None, removed=None, regenred=None):
+        self.added = {} if added is None else added
+        self.removed = {} if removed is None else removed
+        self.regenred = {} if regenred is None else regenred
+
+    def __len__(self):
+        return len(self.added) + len(self.removed) + len(self.regenred)
+
+    def __repr__(self):
+        return (f'CatalogDiff(added={len(self.added)}, removed={len(self.removed)}, '
+                f'regenred={len(self.regenred)})')
+
+
+def conflict_resolver(policy, primary_genre):
+    """
+    Функция resolve(название, наш_жанр, их_жанр) -> жанр для политики policy.
+    primary_genre - выбор основного жанра каталога (CatalogConfig.primary_genre).
+    """
+    if callable(policy):
+        return policy
+    if policy == KEEP_OURS:
+        return lambda name, ours, theirs: ours
+    if policy == TAKE_THEIRS:
+        return lambda name, ours, theirs: theirs
+    if policy == PREFER_RESTRICTED:
+        return lambda name, ours, theirs: primary_genre((ours, theirs))
+    raise ValueError(f'неизвестная политика слияния: {policy!r}')
+
+
+def merge_titles(items, get_genre, add_titles, set_genre, resolve, genres):
+    """
+    Потоково вливает пары (название, жанр) из items за один проход.
+    - Новые названия передаются в add_titles пакетами по BATCH_SIZE
+    - Пустой жанр заполняется их жанром, конфликт разрешает resolve
+    - Жанр не из genres не устанавливается (причина INVALID_GENRE)
+    get_genre(название) - текущий жанр или None, если названия нет.
+    Стоимость - O(len(items)), память - O(BATCH_SIZE + конфликты).
+    """
+    report = MergeReport()
+    pending = []  # Пары (номер, (название, жанр)) текущего пакета
+
+    def flush():
+        batch = add_titles(item for _, item in pending)
+        report.added += batch.added
+        for position, name, reason in batch.rejected:
+            report.reject(pending[position][0], name, reason)
+        pending.clear()
+
+    for position, (name, theirs) in enumerate(items):
+        ours = get_genre(name)
+        if ours is None:
+            pending.append((position, (name, theirs)))
+            if len(pending) >= BATCH_SIZE:
+                flush()
+            continue
+        if not theirs or theirs == ours:
+            continue
+        genre = theirs
+        if ours:
+            report.conflicts.append((name, ours, theirs))
+            genre = resolve(name, ours, theirs)
+        if genre == ours:
+            continue
+        if genre in genres:
+            set_genre(name, genre)
+            report.regenred += 1
+        else:
+            report.reject(position, name, INVALID_GENRE)
+    if pending:
+        flush()
+    return report
+
+
+def iter_diff(ours, theirs):
+    """
+    Лениво перебирает различия двух хранилищ: кортежи (вид, название, наш_жанр, их_жанр).
+    Сначала REMOVED и REGENRED в нашем порядке добавления, затем ADDED в их порядке;
+    отсутствующий жанр - None. Один проход по каждому хранилищу с поиском
+    названия в другом - O(len(ours) + len(theirs)), без промежуточных словарей.
+    """
+    for name, genre in ours.items():
+        other = theirs.get(name)
+        if other is None:
+            yield REMOVED, name, genre, None
+        elif other != genre:
+            yield REGENRED, name, genre, other
+    for name, genre in theirs.items():
+        if name not in ours:
+            yield ADDED, name, None, genre
+
+
+def diff(ours, theirs):
+    """Собирает различия двух хранилищ в CatalogDiff."""
+    result = CatalogDiff()
+    for kind, name, genre, other in iter_diff(ours, theirs):
+        if kind == ADDED:
+            result.added[name] = other
+        elif kind == REMOVED:
+            result.removed[name] = genre
+        else:
+            result.regenred[name] = (genre, other)
+    return result
+
+
+def favorites_union(first, second):
+    """Объединение избранного: порядок first, затем новые названия из second."""
+    result = FavoritesSet(first)
+    for name in second:
+        result.add(name)
+    return result
+
+
+def favorites_intersection(first, second):
+    """Пересечение избранного в порядке first; проверка вхождения в second - O(1)."""
+    return FavoritesSet(name for name in first if name in second)
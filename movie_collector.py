@@ -1,85 +1,124 @@
-class MovieCollector:
-    def __init__(self):
-        # Словарь фильмов: {название_фильма: жанр}
-        self.movies_genre = {}
-        # Список избранных фильмов
-        self.favorites = []
-        # Доступные жанры фильмов
-        self.available_genres = ['Драма', 'Фантастика', 'Комедия', 'Боевик', 'Ужасы']
-        # Жанры, не подходящие для детей
-        self.adult_genres = ['Ужасы', 'Боевик']
+from catalog import CHILDREN_ANY_GENRE, CatalogCollector, CatalogConfig
 
-    def add_new_movie(self, name):
+
+class MovieCollector(CatalogCollector):
+    """
+    Коллекция фильмов поверх общего ядра CatalogCollector.
+    - Название от 1 до 100 символов включительно
+    - Детские фильмы: жанр установлен и не входит в adult_genres
+    Методы с прежними именами - псевдонимы методов ядра.
+    """
+
+    CONFIG = CatalogConfig(['Драма', 'Фантастика', 'Комедия', 'Боевик', 'Ужасы'],
+                           restricted_genres=['Ужасы', 'Боевик'], min_length=1, max_length=100,
+                           children_policy=CHILDREN_ANY_GENRE)
+    # Методы только для чтения и изменяющие коллекцию (используются обертками)
+    READ_METHODS = ('get_movie_genre', 'get_movie_genres', 'get_movies_by_genre', 'get_movies_by_genre_page',
+                    'count_movies_by_genre', 'get_movies_for_children', 'get_movies_for_children_page',
+                    'count_movies_for_children', 'find_movies', 'count_movies_matching',
+                    'get_favorites_movies', 'get_all_movies', 'search_movies', 'changes_since',
+                    'diff', 'favorites_union', 'favorites_intersection', 'dump_jsonl', 'dump_snapshot')
+    WRITE_METHODS = ('add_new_movie', 'add_new_movies', 'set_movie_genre', 'set_movie_genres',
+                     'add_movie_to_favorites', 'remove_movie_from_favorites', 'merge', 'load_jsonl',
+                     'load_snapshot')
+
+    __slots__ = ()
+    # Доступные жанры фильмов (общая неизменяемая таблица класса)
+    available_genres = CONFIG.genres
+    # Жанры, не подходящие для детей
+    adult_genres = CONFIG.restricted_genres
+
+    def __init__(self, compact=False, cache_size=0, database=None):
         """
-        Добавляет новый фильм в коллекцию.
-        Условия добавления:
-        - Фильма еще нет в коллекции
-        - Длина названия от 1 до 100 символов включительно
+        compact=True включает компактное хранилище: названия в таблице строк,
+        жанры - однобайтовыми кодами. Ответы методов не меняются.
+        cache_size > 0 включает LRU-кеш выборок по жанру и детских фильмов.
+        database - путь к базе SQLite для постоянного хранения фильмов и избранного.
         """
-        if name not in self.movies_genre and 1 <= len(name) <= 100:
-            self.movies_genre[name] = ''  # Жанр по умолчанию - пустая строка
+        super().__init__(compact, cache_size=cache_size, database=database)
+
+    movies_genre = CatalogCollector.titles_genre
+
+    def add_new_movie(self, name):
+        """Добавляет фильм без жанра (название от 1 до 100 символов)."""
+        return self.add_title(name)
+
+    def add_new_movies(self, items):
+        """Пакетно добавляет фильмы, возвращает IngestReport."""
+        return self.add_titles(items)
 
     def set_movie_genre(self, name, genre):
-        """
-        Устанавливает жанр для фильма.
-        Условия установки:
-        - Фильм существует в коллекции
-        - Жанр есть в списке доступных жанров
-        """
-        if name in self.movies_genre and genre in self.available_genres:
-            self.movies_genre[name] = genre
+        """Устанавливает жанр фильма из available_genres."""
+        return self.set_genre(name, genre)
+
+    def set_movie_genres(self, name, genres):
+        """Устанавливает фильму несколько жанров."""
+        return self.set_genres(name, genres)
 
     def get_movie_genre(self, name):
-        """
-        Возвращает жанр фильма по названию.
-        - Возвращает None, если фильма нет в коллекции
-        - Возвращает жанр (строку), если фильм есть
-        """
-        return self.movies_genre.get(name)
+        """Возвращает жанр фильма или None, если фильма нет."""
+        return self.get_genre(name)
+
+    def get_movie_genres(self, name):
+        """Возвращает все жанры фильма или None, если фильма нет."""
+        return self.get_genres(name)
 
     def get_movies_by_genre(self, genre):
-        """
-        Возвращает список фильмов указанного жанра.
-        - Возвращает пустой список, если жанр недопустим
-        - Возвращает все фильмы с указанным жанром
-        """
-        if genre not in self.available_genres:
-            return []
+        """Возвращает фильмы указанного жанра в порядке добавления."""
+        return self.get_titles_by_genre(genre)
+
+    def iter_movies_by_genre(self, genre, cursor=None):
+        """Лениво перебирает фильмы указанного жанра."""
+        return self.iter_titles_by_genre(genre, cursor)
 
-        return [movie for movie, movie_genre in self.movies_genre.items()
-                if movie_genre == genre]
+    def get_movies_by_genre_page(self, genre, limit=20, cursor=None, offset=0):
+        """Возвращает страницу фильмов указанного жанра (Page)."""
+        return self.get_titles_by_genre_page(genre, limit, cursor, offset)
+
+    def count_movies_by_genre(self, genre):
+        """Возвращает количество фильмов указанного жанра."""
+        return self.count_titles_by_genre(genre)
 
     def get_movies_for_children(self):
-        """
-        Возвращает фильмы, подходящие для детей:
-        - Жанр установлен (не пустая строка)
-        - Жанр не входит в adult_genres
-        """
-        return [movie for movie, genre in self.movies_genre.items()
-                if genre and genre not in self.adult_genres]
+        """Возвращает фильмы с установленным жанром не из adult_genres."""
+        return self.get_titles_for_children()
+
+    def iter_movies_for_children(self, cursor=None):
+        """Лениво перебирает детские фильмы."""
+        return self.iter_titles_for_children(cursor)
+
+    def get_movies_for_children_page(self, limit=20, cursor=None, offset=0):
+        """Возвращает страницу детских фильмов (Page)."""
+        return self.get_titles_for_children_page(limit, cursor, offset)
+
+    def count_movies_for_children(self):
+        """Возвращает количество детских фильмов за O(1)."""
+        return self.count_titles_for_children()
+
+    def find_movies(self, query, limit=20, cursor=None, offset=0):
+        """Возвращает страницу фильмов по запросу с AND, OR, NOT."""
+        return self.find_titles(query, limit, cursor, offset)
+
+    def count_movies_matching(self, query):
+        """Возвращает количество фильмов по запросу с AND, OR, NOT."""
+        return self.count_titles_matching(query)
+
+    def search_movies(self, query, limit=20, offset=0, substring=False):
+        """Ищет фильмы по началу названия или подстроке."""
+        return self.search_titles(query, limit, offset, substring)
 
     def add_movie_to_favorites(self, name):
-        """
-        Добавляет фильм в избранное.
-        Условия:
-        - Фильм существует в коллекции
-        - Фильм еще не в избранном
-        """
-        if name in self.movies_genre and name not in self.favorites:
-            self.favorites.append(name)
+        """Добавляет фильм из коллекции в избранное."""
+        return self.add_to_favorites(name)
 
     def remove_movie_from_favorites(self, name):
-        """
-        Удаляет фильм из избранного.
-        - Если фильма нет в избранном, ничего не происходит
-        """
-        if name in self.favorites:
-            self.favorites.remove(name)
+        """Удаляет фильм из избранного, если он там есть."""
+        return self.remove_from_favorites(name)
 
     def get_favorites_movies(self):
-        """Возвращает список избранных фильмов."""
-        return self.favorites
+        """Возвращает избранные фильмы в порядке добавления."""
+        return self.get_favorites()
 
     def get_all_movies(self):
         """Возвращает полный словарь всех фильмов (название: жанр)."""
-        return self.movies_genre
\ No newline at end of file
+        return self.get_all_titles()
\ No newline at end of file
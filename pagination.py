@@ -0,0 +1,66 @@
+from itertools import islice
+
+
+class Page:
+    """
+    Страница результата запроса.
+    - items: названия страницы
+    - cursor: курсор для запроса следующей страницы или None, если страница последняя
+    Курсор - порядковый номер последнего названия страницы. Номера выдаются
+    при добавлении и только растут, поэтому курсор остается действительным
+    после добавления новых названий: они окажутся на следующих страницах.
+    Страница сравнивается со списком своих названий.
+    """
+
+    __slots__ = ('items', 'cursor')
+
+    def __init__(self, items, cursor=None):
+        self.items = items
+        self.cursor = cursor
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __eq__(self, other):
+        if isinstance(other, Page):
+            return self.items == other.items and self.cursor == other.cursor
+        if isinstance(other, (list, tuple)):
+            return self.items == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f'Page({self.items!r}, cursor={self.cursor!r})'
+
+
+def cursor_position(cursor):
+    """Порядковый номер, после которого продолжается выборка (-1 - с начала)."""
+    if cursor is None:
+        return -1
+    if isinstance(cursor, bool) or not isinstance(cursor, int) or cursor < 0:
+        raise ValueError(f'недопустимый курсор: {cursor!r}')
+    return cursor
+
+
+def take_page(pairs, limit=20, offset=0):
+    """
+    Собирает страницу из ленивой последовательности пар (номер, название).
+    Читается не больше offset + limit + 1 пар: лишняя пара только
+    показывает, что за страницей есть продолжение.
+    """
+    if limit < 1 or offset < 0:
+        raise ValueError('limit должен быть положительным, offset - неотрицательным')
+    window = list(islice(pairs, offset, offset + limit + 1))
+    if len(window) > limit:
+        window.pop()
+        return Page([name for _, name in window], window[-1][0])
+    return Page([name for _, name in window])
+
+
+def iter_names(pairs):
+    """Названия из ленивой последовательности пар (номер, название)."""
+    return (name for _, name in pairs)
@@ -0,0 +1,77 @@
+import threading
+from collections import OrderedDict
+
+
+class ResultCache:
+    """
+    LRU-кеш результатов запросов с версиями ключей.
+    - Размер ограничен maxsize: при переполнении вытесняется давно не использованный ключ
+    - invalidate(keys) увеличивает версию только затронутых ключей и удаляет их записи;
+      clear() сбрасывает все ключи сразу (новая эпоха)
+    - Результат, вычисленный по устаревшей версии ключа, в кеш не попадает,
+      даже если запись произошла, пока он вычислялся
+    - hits/misses/invalidations показывают, окупается ли кеш
+    Значения хранятся неизменяемыми (кортежи), копию для вызывающего делает коллекция.
+    """
+
+    def __init__(self, maxsize=128):
+        if maxsize < 1:
+            raise ValueError('размер кеша должен быть положительным')
+        self.maxsize = maxsize
+        self._entries = OrderedDict()  # Ключ -> (версия, значение)
+        self._versions = {}  # Ключ -> версия (только для ключей, которые сбрасывались)
+        self._epoch = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _version(self, key):
+        return self._epoch, self._versions.get(key, 0)
+
+    def get_or_compute(self, key, compute):
+        """Значение из кеша или результат compute(), сохраненный под текущей версией ключа."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == self._version(key):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            version = self._version(key)
+        value = compute()
+        with self._lock:
+            if version == self._version(key):
+                self._entries[key] = (version, value)
+                self._entries.move_to_end(key)
+                if len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, keys):
+        with self._lock:
+            for key in keys:
+                self._versions[key] = self._versions.get(key, 0) + 1
+                if self._entries.pop(key, None) is not None:
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._epoch += 1
+            self._versions = {}
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+            'invalidations': self.invalidations,
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+        }
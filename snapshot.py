@@ -0,0 +1,210 @@
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from compact_store import CodedTitleTable, title_hash
+from indexes import FavoritesSet
+
+# Формат компактного снимка коллекции (все числа little-endian):
+# - заголовок HEADER
+# - таблица жанров: для каждого жанра длина (uint16) и UTF-8 байты; код 0 - '' (без жанра)
+# - смещения названий в таблице строк: title_count + 1 чисел uint64
+# - коды жанров: по одному байту на название
+# - хеш-таблица название -> номер: hash_slots чисел uint32 (номер + 1, 0 - пустая ячейка)
+# - битовая карта избранного: по биту на название
+# - порядок избранного: favorites_count чисел uint32
+# - таблица строк: UTF-8 названия подряд
+# Секции выровнены по 8 байт, поэтому массивы читаются прямо из mmap без копирования.
+MAGIC = b'CLSNAP1\0'
+HEADER = struct.Struct('<8s11Q')
+MAX_GENRES = 256
+
+
+def write_snapshot(path, items, favorites, genres=()):
+    """
+    Сохраняет коллекцию в компактный снимок.
+    - items: пары (название, жанр) в порядке добавления
+    - favorites: названия избранного в порядке добавления; названия,
+      которых нет среди items, в снимок не попадают
+    - genres: допустимые жанры; получают коды 1, 2, ... в этом порядке
+    Файл заменяется атомарно.
+    """
+    codes_by_genre = {'': 0}
+    for genre in genres:
+        codes_by_genre.setdefault(genre, len(codes_by_genre))
+    ids = {}
+    offsets = array('Q', [0])
+    codes = bytearray()
+    hashes = array('I')
+    blob = bytearray()
+    for name, genre in items:
+        code = codes_by_genre.get(genre)
+        if code is None:
+            code = codes_by_genre[genre] = len(codes_by_genre)
+            if code >= MAX_GENRES:
+                raise ValueError(f'в снимке не может быть больше {MAX_GENRES} жанров')
+        encoded = name.encode('utf-8')
+        ids[name] = len(codes)
+        codes.append(code)
+        hashes.append(title_hash(encoded))
+        blob += encoded
+        offsets.append(len(blob))
+    title_count = len(codes)
+
+    hash_slots = 8
+    while hash_slots < title_count * 2:
+        hash_slots *= 2
+    table = array('I', bytes(4 * hash_slots))
+    mask = hash_slots - 1
+    for title_id, value in enumerate(hashes):
+        slot = value & mask
+        while table[slot]:
+            slot = (slot + 1) & mask
+        table[slot] = title_id + 1
+
+    bitmap = bytearray((title_count + 7) // 8)
+    order = array('I')
+    for name in favorites:
+        title_id = ids.get(name)
+        if title_id is None:
+            continue
+        bitmap[title_id >> 3] |= 1 << (title_id & 7)
+        order.append(title_id)
+
+    genre_table = bytearray()
+    for genre in codes_by_genre:
+        encoded = genre.encode('utf-8')
+        genre_table += struct.pack('<H', len(encoded)) + encoded
+
+    if sys.byteorder != 'little':
+        for numbers in (offsets, table, order):
+            numbers.byteswap()
+    sections = [genre_table, offsets.tobytes(), codes, table.tobytes(), bitmap, order.tobytes(), blob]
+    section_offsets = []
+    position = HEADER.size
+    for section in sections:
+        section_offsets.append(position)
+        position = _align(position + len(section))
+
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, title_count, len(order), hash_slots, len(codes_by_genre),
+                               *section_offsets))
+        for start, section in zip(section_offsets, sections):
+            file.write(bytes(start - file.tell()))
+            file.write(section)
+    os.replace(tmp_path, path)
+
+
+class MappedTitleStore(CodedTitleTable):
+    """
+    Хранилище только для чтения поверх снимка, открытого через mmap.
+    Жанры, выборки по жанру и избранное читаются прямо из отображенного
+    файла; Python-строки создаются только для возвращаемых названий.
+    Изменять такое хранилище нельзя: коллекция перед записью переносит
+    данные в изменяемое хранилище (см. _writable_store в коллекциях).
+    """
+
+    read_only = True
+
+    def __init__(self, path, is_for_children):
+        with open(path, 'rb') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, self._title_count, favorites_count, hash_slots, genre_count, genres_at,
+         offsets_at, codes_at, hash_at, bitmap_at, order_at, blob_at) = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            raise ValueError(f'{path}: не является снимком коллекции')
+        count = self._title_count
+        view = memoryview(self._mmap)
+        self._offsets = self._numbers(view[offsets_at:offsets_at + 8 * (count + 1)], 'Q')
+        self._codes = view[codes_at:codes_at + count]
+        self._hash = self._numbers(view[hash_at:hash_at + 4 * hash_slots], 'I')
+        self._bitmap = view[bitmap_at:bitmap_at + (count + 7) // 8]
+        self._order = self._numbers(view[order_at:order_at + 4 * favorites_count], 'I')
+        self._blob = view[blob_at:]
+
+        self._genres = []
+        position = genres_at
+        for _ in range(genre_count):
+            (length,) = struct.unpack_from('<H', self._mmap, position)
+            self._genres.append(str(self._mmap[position + 2:position + 2 + length], 'utf-8'))
+            position += 2 + length
+        self._compile_patterns(is_for_children)
+        self._counts = None
+        self._favorites = MappedFavorites(self)
+
+    @staticmethod
+    def _numbers(view, typecode):
+        if sys.byteorder == 'little':
+            return view.cast(typecode)
+        numbers = array(typecode, view)
+        numbers.byteswap()
+        return numbers
+
+    def __len__(self):
+        return self._title_count
+
+    def is_favorite(self, name):
+        title_id = self._find(name)
+        return title_id >= 0 and bool(self._bitmap[title_id >> 3] & (1 << (title_id & 7)))
+
+    def favorites(self):
+        """Избранное снимка (MappedFavorites), один объект на хранилище."""
+        return self._favorites
+
+    def favorites_count(self):
+        return len(self._order)
+
+    def favorite_names(self):
+        return (self._name(title_id) for title_id in self._order)
+
+    def _code_counts(self):
+        # Снимок неизменяем, поэтому количества считаются один раз
+        if self._counts is None:
+            codes = self._codes.tobytes()
+            self._counts = [codes.count(code) for code in range(len(self._genres))]
+        return self._counts
+
+
+class MappedFavorites(FavoritesSet):
+    """
+    Избранное снимка: то же поведение, что у FavoritesSet. Пока избранное
+    не менялось, проверка вхождения читает битовую карту, а обход - порядок
+    избранного прямо из файла; первое изменение копирует названия в словарь.
+    """
+
+    def __init__(self, store):
+        self._store = store
+        self._copy = None
+
+    @property
+    def _items(self):
+        # Методы FavoritesSet работают со словарем: он создается при первом обращении
+        if self._copy is None:
+            self._copy = dict.fromkeys(self._store.favorite_names())
+        return self._copy
+
+    def replace(self, names):
+        """Заменяет избранное названиями names (порядок сохраняется, повторы отбрасываются)."""
+        self._copy = dict.fromkeys(names)
+
+    def __contains__(self, name):
+        if self._copy is None:
+            return self._store.is_favorite(name)
+        return name in self._copy
+
+    def __len__(self):
+        if self._copy is None:
+            return self._store.favorites_count()
+        return len(self._copy)
+
+    def __iter__(self):
+        if self._copy is None:
+            return self._store.favorite_names()
+        return iter(self._copy)
+
+
+def _align(position):
+    return (position + 7) & ~7
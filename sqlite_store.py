@@ -0,0 +1,319 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+from itertools import islice
+
+from indexes import FavoritesSet
+
+# Названия пишутся в базу пачками такого размера (одна транзакция на пакет add_many)
+BATCH_SIZE = 10000
+
+# seq - порядковый номер добавления (rowid, с 1 без пропусков); children -
+# признак детской выборки, вычисленный политикой каталога при записи жанра;
+# genres_mask - маска жанров set_genres (бит i - i-й жанр каталога), NULL -
+# только основной жанр
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS titles (
+    seq INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    genre TEXT NOT NULL DEFAULT '',
+    children INTEGER NOT NULL DEFAULT 0,
+    genres_mask INTEGER
+);
+CREATE INDEX IF NOT EXISTS titles_genre ON titles (genre, seq);
+CREATE INDEX IF NOT EXISTS titles_children ON titles (seq) WHERE children = 1;
+CREATE TABLE IF NOT EXISTS favorites (
+    name TEXT PRIMARY KEY,
+    seq INTEGER NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+class ConnectionPool:
+    """
+    Пул соединений с одной базой SQLite.
+    - connection() выдает свободное соединение (или открывает новое) и
+      возвращает его в пул после использования; в пуле держится не больше size
+      соединений, так что параллельные читатели не делят одно соединение
+    - writer() - единственное соединение для записи под блокировкой:
+      в WAL писатель один, а читатели ему не мешают
+    """
+
+    def __init__(self, path, size=8):
+        self._path = str(path)
+        self._size = size
+        self._idle = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._writer = self._connect()
+        self._writer.execute('PRAGMA journal_mode=WAL')
+        self._writer.executescript(SCHEMA)
+        columns = {row[1] for row in self._writer.execute('PRAGMA table_info(titles)')}
+        if 'genres_mask' not in columns:
+            # База, созданная до появления столбца масок
+            self._writer.execute('ALTER TABLE titles ADD COLUMN genres_mask INTEGER')
+
+    def _connect(self):
+        connection = sqlite3.connect(self._path, isolation_level=None, check_same_thread=False)
+        # В режиме WAL synchronous=NORMAL не теряет согласованность и не делает fsync на каждую транзакцию
+        connection.execute('PRAGMA synchronous=NORMAL')
+        return connection
+
+    @contextmanager
+    def connection(self):
+        with self._lock:
+            connection = self._idle.pop() if self._idle else None
+        if connection is None:
+            connection = self._connect()
+        try:
+            yield connection
+        finally:
+            with self._lock:
+                if self._idle is not None and len(self._idle) < self._size:
+                    self._idle.append(connection)
+                    connection = None
+            if connection is not None:
+                connection.close()
+
+    @contextmanager
+    def writer(self):
+        """Транзакция записи: фиксируется при успехе, откатывается при исключении."""
+        with self._write_lock:
+            self._writer.execute('BEGIN IMMEDIATE')
+            try:
+                yield self._writer
+            except BaseException:
+                self._writer.execute('ROLLBACK')
+                raise
+            self._writer.execute('COMMIT')
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle or [], None
+        for connection in idle:
+            connection.close()
+        with self._write_lock:
+            self._writer.close()
+
+
+class SqliteTitleStore:
+    """
+    Хранилище в локальной базе SQLite: названия, жанры и избранное
+    переживают перезапуск процесса и не занимают память процесса.
+    - Выборки по жанру и детская выборка идут по индексам (genre, seq)
+      и частичному индексу детских названий, в порядке добавления
+    - Пакетное добавление - одна транзакция на BATCH_SIZE названий
+    - Чтения из разных потоков идут через пул соединений параллельно (WAL)
+    Существующая база открывается как есть; признак детской выборки
+    пересчитывается по текущей политике каталога. Наибольшая выданная
+    версия коллекции хранится в таблице meta (см. save_version).
+    """
+
+    read_only = False
+
+    def __init__(self, is_for_children, path, mapping=None, pool_size=8):
+        self._is_for_children = is_for_children
+        self._pool = ConnectionPool(path, pool_size)
+        self._favorites = SqliteFavorites(self._pool)
+        rows = self._query("SELECT value FROM meta WHERE key = 'version'")
+        self._saved_version = rows[0][0] if rows else 0
+        if mapping is None:
+            self._refresh_children()
+        else:
+            self.replace(mapping)
+
+    def _refresh_children(self):
+        with self._pool.writer() as connection:
+            genres = [genre for (genre,) in connection.execute('SELECT DISTINCT genre FROM titles')]
+            # Переписываются только строки, у которых признак изменился
+            connection.executemany('UPDATE titles SET children = ? WHERE genre = ? AND children != ?',
+                                   [(children, genre, children) for genre in genres
+                                    for children in [int(self._is_for_children(genre))]])
+
+    def _query(self, sql, parameters=()):
+        with self._pool.connection() as connection:
+            return connection.execute(sql, parameters).fetchall()
+
+    def _iterate(self, sql, parameters=()):
+        # Строки читаются курсором по мере обхода; соединение занято до конца обхода
+        with self._pool.connection() as connection:
+            yield from connection.execute(sql, parameters)
+
+    def replace(self, mapping):
+        """Заменяет содержимое парами из mapping (словарь или итерируемое пар)."""
+        items = iter(mapping.items() if hasattr(mapping, 'items') else mapping)
+        with self._pool.writer() as connection:
+            connection.execute('DELETE FROM titles')
+            self._insert(connection, items)
+
+    def _insert(self, connection, items):
+        is_for_children = self._is_for_children
+        connection.executemany('INSERT INTO titles (name, genre, children) VALUES (?, ?, ?)',
+                               ((name, genre, is_for_children(genre)) for name, genre in items))
+
+    def mapping(self):
+        """Материализует словарь название -> жанр (O(n))."""
+        return dict(self.items())
+
+    def items(self):
+        return self._iterate('SELECT name, genre FROM titles ORDER BY seq')
+
+    def items_from(self, position):
+        return self._query('SELECT name, genre FROM titles WHERE seq > ? ORDER BY seq', (position,))
+
+    def get(self, name):
+        rows = self._query('SELECT genre FROM titles WHERE name = ?', (name,))
+        return rows[0][0] if rows else None
+
+    def __contains__(self, name):
+        return bool(self._query('SELECT 1 FROM titles WHERE name = ?', (name,)))
+
+    def __len__(self):
+        # Номера идут с 1 без пропусков, поэтому размер - наибольший номер (O(log n))
+        return self._query('SELECT coalesce(max(seq), 0) FROM titles')[0][0]
+
+    def position(self, name):
+        rows = self._query('SELECT seq - 1 FROM titles WHERE name = ?', (name,))
+        return rows[0][0] if rows else -1
+
+    def name_at(self, position):
+        return self._query('SELECT name FROM titles WHERE seq = ?', (position + 1,))[0][0]
+
+    def add(self, name):
+        with self._pool.writer() as connection:
+            self._insert(connection, [(name, '')])
+
+    def add_many(self, titles):
+        """Добавляет новые названия: titles - словарь {название: жанр}."""
+        items = iter(titles.items())
+        while True:
+            batch = list(islice(items, BATCH_SIZE))
+            if not batch:
+                return
+            with self._pool.writer() as connection:
+                self._insert(connection, batch)
+
+    def set_genre(self, name, genre):
+        with self._pool.writer() as connection:
+            connection.execute('UPDATE titles SET genre = ?, children = ?, genres_mask = NULL WHERE name = ?',
+                               (genre, self._is_for_children(genre), name))
+
+    def set_genres_mask(self, name, mask):
+        """Сохраняет маску жанров названия (после set_genre она сбрасывается в NULL)."""
+        with self._pool.writer() as connection:
+            connection.execute('UPDATE titles SET genres_mask = ? WHERE name = ?', (mask, name))
+
+    def genres_masks(self):
+        """Пары (жанр, маска жанров или None) в порядке добавления."""
+        return self._iterate('SELECT genre, genres_mask FROM titles ORDER BY seq')
+
+    def titles(self, genre):
+        return [name for (name,) in self._query(
+            'SELECT name FROM titles WHERE genre = ? ORDER BY seq', (genre,))]
+
+    def iter_titles(self, genre, after=-1):
+        return self._iterate('SELECT seq - 1, name FROM titles WHERE genre = ? AND seq > ? ORDER BY seq',
+                             (genre, after + 1))
+
+    def count(self, genre):
+        return self._query('SELECT count(*) FROM titles WHERE genre = ?', (genre,))[0][0]
+
+    def children(self):
+        return [name for (name,) in self._query('SELECT name FROM titles WHERE children = 1 ORDER BY seq')]
+
+    def iter_children(self, after=-1):
+        return self._iterate('SELECT seq - 1, name FROM titles WHERE children = 1 AND seq > ? ORDER BY seq',
+                             (after + 1,))
+
+    def children_count(self):
+        return self._query('SELECT count(*) FROM titles WHERE children = 1')[0][0]
+
+    def saved_version(self):
+        """Наибольшая версия коллекции, сохраненная в базе (0, если ее нет)."""
+        return self._saved_version
+
+    def save_version(self, version):
+        """Сохраняет версию коллекции, если она больше сохраненной."""
+        if version <= self._saved_version:
+            return
+        with self._pool.writer() as connection:
+            connection.execute("INSERT INTO meta (key, value) VALUES ('version', ?) "
+                               'ON CONFLICT (key) DO UPDATE SET value = max(value, excluded.value)', (version,))
+        self._saved_version = max(self._saved_version, version)
+
+    def favorites(self):
+        """Избранное хранится в той же базе (SqliteFavorites)."""
+        return self._favorites
+
+    def close(self):
+        self._pool.close()
+
+
+class SqliteFavorites(FavoritesSet):
+    """
+    Избранное в таблице favorites: то же поведение, что у FavoritesSet,
+    но изменения сразу записываются в базу. Порядок добавления хранится
+    в столбце seq с уникальным индексом.
+    """
+
+    def __init__(self, pool):
+        self._pool = pool
+
+    def _query(self, sql, parameters=()):
+        with self._pool.connection() as connection:
+            return connection.execute(sql, parameters).fetchall()
+
+    def add(self, name):
+        with self._pool.writer() as connection:
+            connection.execute('INSERT OR IGNORE INTO favorites (name, seq) '
+                               'SELECT ?, coalesce(max(seq), 0) + 1 FROM favorites', (name,))
+
+    def discard(self, name):
+        with self._pool.writer() as connection:
+            connection.execute('DELETE FROM favorites WHERE name = ?', (name,))
+
+    def remove(self, name):
+        if name not in self:
+            raise ValueError(f'{name!r} is not in favorites')
+        self.discard(name)
+
+    def replace(self, names):
+        """Заменяет избранное названиями names (порядок сохраняется, повторы отбрасываются)."""
+        with self._pool.writer() as connection:
+            connection.execute('DELETE FROM favorites')
+            connection.executemany('INSERT INTO favorites (name, seq) VALUES (?, ?)',
+                                   ((name, seq) for seq, name in enumerate(dict.fromkeys(names), 1)))
+
+    def __contains__(self, name):
+        return bool(self._query('SELECT 1 FROM favorites WHERE name = ?', (name,)))
+
+    def __len__(self):
+        return self._query('SELECT count(*) FROM favorites')[0][0]
+
+    def __iter__(self):
+        return iter([name for (name,) in self._query('SELECT name FROM favorites ORDER BY seq')])
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        if index < 0:
+            index += len(self)
+        rows = self._query('SELECT name FROM favorites ORDER BY seq LIMIT 1 OFFSET ?', (index,)) \
+            if index >= 0 else []
+        if not rows:
+            raise IndexError('favorites index out of range')
+        return rows[0][0]
+
+    def __eq__(self, other):
+        if isinstance(other, (FavoritesSet, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(list(self))
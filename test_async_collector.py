@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+from async_collector import AsyncCollector
+from books_collector import BooksCollector
+from concurrent_collector import ConcurrentMovieCollector
+from movie_collector import MovieCollector
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+class TestAsyncCollector:
+
+    def test_all_public_methods_are_awaitable(self):
+        """Чтения и изменения доступны как корутины"""
+        async def scenario():
+            async with AsyncCollector(MovieCollector()) as movies:
+                await movies.add_new_movie('Шрек')
+                await movies.set_movie_genre('Шрек', 'Комедия')
+                await movies.add_movie_to_favorites('Шрек')
+                assert await movies.get_movie_genre('Шрек') == 'Комедия'
+                assert await movies.get_movies_by_genre('Комедия') == ['Шрек']
+                assert await movies.get_movies_for_children() == ['Шрек']
+                assert await movies.get_favorites_movies() == ['Шрек']
+                await movies.remove_movie_from_favorites('Шрек')
+                assert await movies.get_favorites_movies() == []
+
+        run(scenario())
+
+    def test_burst_is_coalesced(self):
+        """Всплеск изменений применяется небольшим числом пачек в исходном порядке"""
+        collector = MovieCollector()
+
+        async def scenario():
+            movies = AsyncCollector(collector)
+            names = [f'Фильм {number}' for number in range(500)]
+            await asyncio.gather(*(movies.add_new_movie(name) for name in names),
+                                 *(movies.set_movie_genre(name, 'Драма') for name in names[::2]))
+            await movies.close()
+            return movies, names
+
+        movies, names = run(scenario())
+        assert list(collector.get_all_movies()) == names
+        assert collector.get_movies_by_genre('Драма') == names[::2]
+        assert movies.applied == 750
+        assert movies.batches < 10
+
+    def test_reads_do_not_wait_for_writes(self):
+        """Чтение отвечает сразу, не дожидаясь применения очереди"""
+        async def scenario():
+            movies = AsyncCollector(MovieCollector())
+            pending = asyncio.ensure_future(movies.add_new_movie('Новый'))
+            assert await movies.get_all_movies() == {}
+            await pending
+            assert await movies.get_all_movies() == {'Новый': ''}
+            await movies.close()
+
+        run(scenario())
+
+    def test_errors_reach_the_caller(self):
+        """Исключение при применении операции получает вызвавшая корутина"""
+        async def scenario():
+            async with AsyncCollector(BooksCollector()) as books:
+                with pytest.raises(TypeError):
+                    await books.add_new_book(None)
+                await books.add_new_book('Книга')
+                assert await books.get_books_genre() == {'Книга': ''}
+
+        run(scenario())
+
+    def test_burst_keeps_single_call_semantics(self):
+        """В пачке каждая операция ведет себя как отдельный вызов: пара не становится жанром, ошибка - своя"""
+        collector = BooksCollector()
+
+        async def scenario():
+            async with AsyncCollector(collector) as books:
+                return await asyncio.gather(books.add_new_book('Первая'), books.add_new_book(('Книга', 'Ужасы')),
+                                            books.add_new_book(None), books.add_new_book('Вторая'),
+                                            return_exceptions=True)
+
+        results = run(scenario())
+        assert results[0] is None and results[1] is None and results[3] is None
+        assert isinstance(results[2], TypeError)
+        assert collector.get_books_genre() == {'Первая': '', ('Книга', 'Ужасы'): '', 'Вторая': ''}
+        assert collector.get_books_with_specific_genre('Ужасы') == []
+
+    def test_concurrent_collector_and_unknown_method(self):
+        """Фасад работает с потокобезопасной коллекцией и отклоняет неизвестные методы"""
+        async def scenario():
+            async with AsyncCollector(ConcurrentMovieCollector()) as movies:
+                await asyncio.gather(movies.add_new_movie('А'), movies.add_new_movie('Б'))
+                assert await movies.get_all_movies() == {'А': '', 'Б': ''}
+                with pytest.raises(AttributeError):
+                    movies.drop_everything
+
+        run(scenario())
@@ -0,0 +1,83 @@
+import copy
+import json
+
+import pytest
+
+import benchmarks
+
+
+@pytest.fixture(scope='module')
+def result():
+    """Фикстура выполняет замеры на маленьком каталоге с минимальным бюджетом"""
+    return benchmarks.run(sizes=(50,), time_budget=0.001)
+
+
+class TestBenchmarks:
+
+    def test_every_public_method_measured(self, result):
+        """Замер есть для каждого публичного метода обеих коллекций"""
+        for suite, collector_class in (('MovieCollector', benchmarks.MovieCollector),
+                                       ('BooksCollector', benchmarks.BooksCollector)):
+            measured = set(result['results'][suite]['50']['operations'])
+            skipped = {'load_jsonl', 'dump_jsonl', 'load_snapshot', 'dump_snapshot'}
+            expected = set(collector_class.READ_METHODS + collector_class.WRITE_METHODS) - skipped
+            assert expected <= measured
+
+    def test_statistics_fields(self, result):
+        """Для операции сохраняются пропускная способность, процентили и пиковая память"""
+        stats = result['results']['MovieCollector']['50']['operations']['get_movies_by_genre']
+        assert stats['calls'] >= benchmarks.MIN_CALLS
+        assert stats['p50_us'] <= stats['p95_us'] <= stats['p99_us'] <= stats['max_us']
+        assert stats['throughput'] > 0
+        assert stats['peak_bytes'] >= 0
+        assert result['results']['MovieCollector']['50']['seed_memory_bytes'] > 0
+        json.dumps(result)
+
+    def test_reads_measure_seed_size(self, result):
+        """Чтения замеряются на каталоге заданного размера, изменения - каждое на своем"""
+        for suite, collector_class in (('MovieCollector', benchmarks.MovieCollector),
+                                       ('BooksCollector', benchmarks.BooksCollector)):
+            for name, stats in result['results'][suite]['50']['operations'].items():
+                assert stats['catalog_size'] == 50, (suite, name)
+                if name not in collector_class.WRITE_METHODS:
+                    assert stats['catalog_size_after'] == 50, (suite, name)
+        added = result['results']['MovieCollector']['50']['operations']['add_new_movie']
+        assert added['catalog_size_after'] == 50 + added['calls'] + 1
+
+    def test_compare_detects_regression(self, result):
+        """Сравнение сообщает только о замедлениях больше порога"""
+        slower = copy.deepcopy(result)
+        stats = slower['results']['BooksCollector']['50']['operations']['get_book_genre']
+        stats['p50_us'] = result['results']['BooksCollector']['50']['operations']['get_book_genre']['p50_us'] * 2
+        regressions = benchmarks.compare(result, slower, threshold=0.5)
+        assert [(suite, size, name) for suite, size, name, *_ in regressions] == [
+            ('BooksCollector', '50', 'get_book_genre')]
+        assert benchmarks.compare(result, slower, threshold=1.5) == []
+
+    def test_compare_command_exit_code(self, result, tmp_path, capsys):
+        """Команда compare завершается с кодом 1 при замедлении"""
+        slower = copy.deepcopy(result)
+        slower['results']['MovieCollector']['50']['operations']['contains']['p50_us'] *= 10
+        old_path, new_path = tmp_path / 'old.json', tmp_path / 'new.json'
+        old_path.write_text(json.dumps(result), encoding='utf-8')
+        new_path.write_text(json.dumps(slower), encoding='utf-8')
+        assert benchmarks.main(['compare', str(old_path), str(old_path)]) == 0
+        assert benchmarks.main(['compare', str(old_path), str(new_path), '--threshold', '0.5']) == 1
+        assert 'contains' in capsys.readouterr().out
+
+    def test_startup(self, capsys):
+        """Замер создания коллекций: время и память на экземпляр"""
+        startup = benchmarks.startup(instances=100)
+        assert set(startup) == set(benchmarks.COLLECTORS)
+        for stats in startup.values():
+            assert stats['create_us'] > 0
+            assert 0 < stats['instance_bytes'] < 1000
+        assert benchmarks.main(['startup', '--count', '10']) == 0
+        assert 'BooksCollector' in capsys.readouterr().out
+
+    def test_percentile(self):
+        """Процентиль по ближайшему рангу"""
+        values = list(range(1, 101))
+        assert benchmarks.percentile(values, 0.5) == 50
+        assert benchmarks.percentile(values, 0.99) == 99
+        assert benchmarks.percentile([], 0.5) == 0.0
@@ -42,6 +42,24 @@ class TestBooksCollector:
         collector.add_new_book('Дубль')  # Попытка добавить дубликат
         assert list(collector.books_genre.keys()) == ['Дубль']  # Проверяем только одну книгу в словаре
 
+    # Тесты метода add_new_books
+    def test_add_new_books_bulk(self, collector):
+        # Пакетная загрузка применяет те же правила, что и поштучные методы
+        report = collector.add_new_books([
+            'Книга', ('Мультик', 'Мультфильмы'), ('Ужастик', 'Ужасы'), 'О' * 41, 'Книга'
+        ])
+        assert collector.get_books_genre() == {'Книга': '', 'Мультик': 'Мультфильмы', 'Ужастик': 'Ужасы'}
+        assert report.added == 3
+        assert report.rejected == [(3, 'О' * 41, 'invalid_length'), (4, 'Книга', 'duplicate')]
+        assert collector.get_books_with_specific_genre('Ужасы') == ['Ужастик']
+        assert collector.get_books_for_children() == ['Мультик']
+
+    def test_add_new_books_invalid_genre(self, collector):
+        # Книга с недопустимым жанром добавляется без жанра
+        report = collector.add_new_books([('Книга', 'Боевик')])
+        assert collector.get_book_genre('Книга') == ''
+        assert report.rejected == [(0, 'Книга', 'invalid_genre')]
+
     # Тесты метода set_book_genre
     def test_set_book_genre_valid(self, collector):
         # Подготовка: напрямую добавляем книгу в словарь
@@ -79,6 +97,12 @@ class TestBooksCollector:
         # Пытаемся получить жанр несуществующей книги
         assert collector.get_book_genre('Призрак') is None  # Должно вернуть None
 
+    def test_contains(self, collector):
+        # Проверка наличия книги оператором in
+        collector.add_new_book('Книга')
+        assert 'Книга' in collector
+        assert 'Призрак' not in collector
+
     # Тесты метода get_books_with_specific_genre
     def test_get_books_with_specific_genre_exists(self, collector):
         # Подготовка: создаем несколько книг с разными жанрами
@@ -92,6 +116,22 @@ class TestBooksCollector:
         # Проверяем, что вернулись только книги с нужным жанром
         assert result == ['Книга1', 'Книга2']
 
+    def test_get_books_with_specific_genre_keeps_insertion_order(self, collector):
+        # Жанр назначается в обратном порядке, а результат идет в порядке добавления
+        collector.add_new_book('Книга1')
+        collector.add_new_book('Книга2')
+        collector.set_book_genre('Книга2', 'Комедии')
+        collector.set_book_genre('Книга1', 'Комедии')
+        assert collector.get_books_with_specific_genre('Комедии') == ['Книга1', 'Книга2']
+
+    def test_get_books_with_specific_genre_after_genre_change(self, collector):
+        # После смены жанра книга пропадает из выдачи по старому жанру
+        collector.add_new_book('Книга')
+        collector.set_book_genre('Книга', 'Ужасы')
+        collector.set_book_genre('Книга', 'Комедии')
+        assert collector.get_books_with_specific_genre('Ужасы') == []
+        assert collector.get_books_with_specific_genre('Комедии') == ['Книга']
+
     def test_get_books_with_specific_genre_no_matches(self, collector):
         # Подготовка: книга с другим жанром
         collector.books_genre = {'Книга': 'Фантастика'}
@@ -139,6 +179,17 @@ class TestBooksCollector:
         # Не должен включать книги с неразрешенными жанрами
         assert collector.get_books_for_children() == []
 
+    def test_get_books_for_children_updates_on_genre_change(self, collector):
+        # Смена жанра на возрастной убирает книгу из детской выборки и наоборот
+        collector.add_new_book('Книга1')
+        collector.add_new_book('Книга2')
+        collector.set_book_genre('Книга2', 'Комедии')
+        collector.set_book_genre('Книга1', 'Мультфильмы')
+        assert collector.get_books_for_children() == ['Книга1', 'Книга2']
+        collector.set_book_genre('Книга1', 'Ужасы')
+        assert collector.get_books_for_children() == ['Книга2']
+        assert collector.count_books_for_children() == 1
+
     # Тесты метода add_book_in_favorites
     def test_add_book_in_favorites_valid(self, collector):
         # Подготовка: добавляем книгу в коллекцию
@@ -177,6 +228,14 @@ class TestBooksCollector:
         # Проверяем, что исходный список не изменился
         assert collector.favorites == ['Другая книга']
 
+    def test_delete_book_from_favorites_keeps_order(self, collector):
+        # После удаления из середины порядок остальных книг сохраняется
+        collector.books_genre = {'Книга1': '', 'Книга2': '', 'Книга3': ''}
+        for name in ['Книга1', 'Книга2', 'Книга3']:
+            collector.add_book_in_favorites(name)
+        collector.delete_book_from_favorites('Книга2')
+        assert collector.get_list_of_favorites_books() == ['Книга1', 'Книга3']
+
     # Тест метода get_list_of_favorites_books
     def test_get_list_of_favorites_books(self, collector):
         # Подготовка: задаем список избранного
@@ -0,0 +1,242 @@
+import asyncio
+import json
+
+import pytest
+
+from async_collector import AsyncCollector
+from books_collector import BooksCollector
+from catalog import CHILDREN_ALLOWED_GENRES, CHILDREN_ANY_GENRE, CatalogCollector, CatalogConfig
+from concurrent_collector import RWLock, _synchronize
+from movie_collector import MovieCollector
+from title_store import EMPTY_STORE
+
+
+class PodcastsCollector(CatalogCollector):
+    """Новый каталог - только конфигурация"""
+    CONFIG = CatalogConfig(['Новости', 'Юмор', 'Тру-крайм'], restricted_genres=['Тру-крайм'],
+                           min_length=3, max_length=20)
+
+
+@_synchronize
+class ConcurrentPodcastsCollector(PodcastsCollector):
+    """Потокобезопасный вариант нового каталога"""
+
+    def __init__(self, *args, **kwargs):
+        self._lock = RWLock()
+        super().__init__(*args, **kwargs)
+
+
+class TestCatalogConfig:
+
+    def test_children_policies(self):
+        """Политики детской выборки различаются для жанров вне списка"""
+        allowed = CatalogConfig(['Драма', 'Ужасы'], ['Ужасы'], children_policy=CHILDREN_ALLOWED_GENRES)
+        any_genre = CatalogConfig(['Драма', 'Ужасы'], ['Ужасы'], children_policy=CHILDREN_ANY_GENRE)
+        assert allowed.is_for_children('Драма') and any_genre.is_for_children('Драма')
+        assert not allowed.is_for_children('Мюзикл')
+        assert any_genre.is_for_children('Мюзикл')
+        assert not allowed.is_for_children('') and not any_genre.is_for_children('')
+        assert not allowed.is_for_children('Ужасы') and not any_genre.is_for_children('Ужасы')
+
+    def test_unknown_policy(self):
+        """Неизвестная политика детской выборки вызывает ValueError"""
+        with pytest.raises(ValueError):
+            CatalogConfig(['Драма'], children_policy='никакая')
+
+    def test_primary_genre(self):
+        """Основной жанр - первый ограниченный, иначе первый"""
+        config = CatalogConfig(['Драма', 'Комедия', 'Ужасы'], ['Ужасы'])
+        assert config.primary_genre(['Комедия', 'Ужасы']) == 'Ужасы'
+        assert config.primary_genre(['Комедия', 'Драма']) == 'Комедия'
+
+
+class TestNewCatalog:
+
+    @pytest.fixture(params=[False, True])
+    def podcasts(self, request):
+        """Фикстура создает каталог подкастов в обычном и компактном режиме"""
+        return PodcastsCollector(compact=request.param)
+
+    def test_rules_from_config(self, podcasts):
+        """Длина названия и жанры берутся из конфигурации"""
+        podcasts.add_title('Да')
+        podcasts.add_title('Подкаст без названия длиннее двадцати')
+        podcasts.add_titles([('Утро', 'Новости'), ('Дело', 'Тру-крайм'), ('Смех', 'Драма')])
+        podcasts.add_title('Вечер')
+        podcasts.set_genre('Вечер', 'Юмор')
+        assert podcasts.get_all_titles() == {'Утро': 'Новости', 'Дело': 'Тру-крайм',
+                                             'Смех': '', 'Вечер': 'Юмор'}
+        assert podcasts.get_titles_for_children() == ['Утро', 'Вечер']
+        assert podcasts.find_titles('Новости OR Тру-крайм') == ['Утро', 'Дело']
+        podcasts.add_to_favorites('Дело')
+        assert podcasts.get_favorites() == ['Дело']
+
+    def test_wrappers_work_with_generic_methods(self):
+        """Потокобезопасная и асинхронная обертки работают с общими именами методов"""
+        podcasts = ConcurrentPodcastsCollector()
+
+        async def main():
+            async with AsyncCollector(podcasts) as facade:
+                await asyncio.gather(*(facade.add_title(f'Выпуск {n}') for n in range(10)))
+                return await facade.count_titles_by_genre('Юмор'), facade.batches
+
+        assert asyncio.run(main()) == (0, 1)
+        assert len(podcasts.get_all_titles()) == 10
+
+
+class TestFrontEnds:
+
+    def test_front_ends_share_engine(self):
+        """Книги и фильмы - обертки над одним ядром с разной конфигурацией"""
+        assert issubclass(BooksCollector, CatalogCollector)
+        assert issubclass(MovieCollector, CatalogCollector)
+        assert BooksCollector().genre == list(BooksCollector.CONFIG.genres)
+        assert MovieCollector().adult_genres == ['Ужасы', 'Боевик']
+
+    def test_children_policy_differs_for_unknown_genre(self):
+        """Жанр вне списка: книга не детская, фильм - детский, как и раньше"""
+        books = BooksCollector()
+        books.books_genre = {'Книга': 'Мюзикл'}
+        movies = MovieCollector()
+        movies.movies_genre = {'Фильм': 'Мюзикл'}
+        assert books.get_books_for_children() == []
+        assert movies.get_movies_for_children() == ['Фильм']
+
+    def test_name_length_bounds(self):
+        """Границы длины названия: книги до 40 символов, фильмы до 100"""
+        books = BooksCollector()
+        movies = MovieCollector()
+        for collector in (books, movies):
+            collector.add_title('А' * 40)
+            collector.add_title('Б' * 41)
+        assert len(books.get_books_genre()) == 1
+        assert len(movies.get_all_movies()) == 2
+
+    def test_favorites_getters_return_list(self):
+        """Избранное возвращается обычным списком: методы списка и JSON работают"""
+        books = BooksCollector()
+        books.add_new_books(['А', 'Б'])
+        books.add_book_in_favorites('Б')
+        books.add_book_in_favorites('А')
+        favorites = books.get_list_of_favorites_books()
+        assert type(favorites) is list
+        assert favorites.index('А') == 1 and favorites.count('Б') == 1
+        assert favorites + ['В'] == ['Б', 'А', 'В']
+        assert json.dumps(favorites, ensure_ascii=False) == '["Б", "А"]'
+        favorites.append('В')
+        assert books.get_list_of_favorites_books() == ['Б', 'А']
+
+
+class TestStartup:
+
+    def test_genre_tables_shared_and_immutable(self):
+        """Таблицы жанров - общие неизменяемые атрибуты класса, равные спискам"""
+        first, second = MovieCollector(), MovieCollector()
+        assert first.available_genres is second.available_genres is MovieCollector.CONFIG.genres
+        assert first.available_genres == ['Драма', 'Фантастика', 'Комедия', 'Боевик', 'Ужасы']
+        assert BooksCollector().genre_age_rating == ('Ужасы', 'Детективы')
+        assert BooksCollector().genre != ['Фантастика']
+        with pytest.raises(AttributeError):
+            first.available_genres.append('Мюзикл')
+
+    def test_instances_have_no_dict(self):
+        """Экземпляры ядра и оберток хранят атрибуты в слотах"""
+        for collector in (BooksCollector(), MovieCollector()):
+            assert not hasattr(collector, '__dict__')
+            with pytest.raises(AttributeError):
+                collector.unknown_attribute = 1
+
+    def test_store_created_on_first_write(self):
+        """Пустая коллекция делит пустое хранилище, настоящее создается при первой записи"""
+        first, second = BooksCollector(), BooksCollector()
+        assert first._store is second._store
+        assert first.get_books_genre() == {} and first.version == 0
+        first.add_new_book('Книга')
+        assert first._store is not second._store
+        assert first.get_books_genre() == {'Книга': ''}
+        assert second.get_books_genre() == {}
+        assert first.changes_since(0).titles == {'Книга': ''} and first.version == 1
+
+    def test_write_through_dict_before_first_write(self):
+        """Запись в словарь новой коллекции создает хранилище и не теряется"""
+        first, second = BooksCollector(), BooksCollector()
+        first.books_genre['A'] = 'Фантастика'
+        assert first.get_books_genre() == {'A': 'Фантастика'}
+        assert first.get_books_with_specific_genre('Фантастика') == ['A']
+        assert second.get_books_genre() == {} and second._store is EMPTY_STORE
+        with pytest.raises(TypeError):
+            EMPTY_STORE.mapping()['A'] = ''
+
+    def test_favorites_before_first_write(self):
+        """Избранное пустой коллекции создается лениво и переживает создание хранилища"""
+        collector = MovieCollector(compact=True)
+        assert collector.get_favorites_movies() == []
+        collector.add_new_movie('Фильм')
+        collector.add_movie_to_favorites('Фильм')
+        assert collector.get_favorites_movies() == ['Фильм']
+        assert collector.changes_since(0).favorites == {'Фильм': True}
+
+
+class TestTitlesView:
+
+    @pytest.fixture(params=[False, True], ids=['dict', 'compact'])
+    def movies(self, request):
+        """Фикстура с коллекцией фильмов в обоих режимах хранения"""
+        return MovieCollector(compact=request.param, cache_size=4)
+
+    def test_write_updates_indexes(self, movies):
+        """Запись в словарь обновляет индекс жанров и детскую выборку"""
+        movies.add_new_movie('X')
+        assert movies.get_movies_by_genre('Драма') == []
+        movies.movies_genre['X'] = 'Драма'
+        assert movies.get_movies_by_genre('Драма') == ['X']
+        assert movies.get_movies_for_children() == ['X']
+        movies.movies_genre['X'] = 'Ужасы'
+        assert movies.get_movies_by_genre('Драма') == []
+        assert movies.get_movies_for_children() == []
+
+    def test_write_adds_new_title(self, movies):
+        """Запись нового названия добавляет его, дальнейшие методы с ним работают"""
+        movies.movies_genre['Y'] = ''
+        movies.set_movie_genre('Y', 'Комедия')
+        assert movies.get_movies_by_genre('Комедия') == ['Y']
+        assert movies.changes_since(0).titles == {'Y': 'Комедия'}
+        assert movies.search_movies('y') == ['Y']
+
+    def test_view_is_live(self, movies):
+        """Словарь видит последующие изменения и сравнивается с обычным словарем"""
+        view = movies.movies_genre
+        movies.add_new_movies([('А', 'Драма'), 'Б'])
+        assert view == {'А': 'Драма', 'Б': ''}
+        assert dict(view) == {'А': 'Драма', 'Б': ''} and list(view.items()) == [('А', 'Драма'), ('Б', '')]
+        assert len(view) == 2 and 'А' in view and view.get('В') is None
+
+    def test_getters_return_plain_dict(self, movies):
+        """get_all_movies возвращает обычный словарь: сериализуется и не связан с коллекцией"""
+        movies.add_new_movies([('А', 'Драма'), 'Б'])
+        titles = movies.get_all_movies()
+        assert type(titles) is dict
+        assert json.loads(json.dumps(titles)) == {'А': 'Драма', 'Б': ''}
+        assert titles.copy() | {'В': ''} == {'А': 'Драма', 'Б': '', 'В': ''}
+        titles['Г'] = 'Драма'
+        assert 'Г' not in movies and movies.get_movies_by_genre('Драма') == ['А']
+
+    def test_delete_and_invalid_values_rejected(self, movies):
+        """Удаление и нестроковые значения вызывают TypeError"""
+        movies.add_new_movie('X')
+        with pytest.raises(TypeError):
+            del movies.movies_genre['X']
+        with pytest.raises(TypeError):
+            movies.movies_genre.pop('X')
+        with pytest.raises(TypeError):
+            movies.movies_genre['X'] = None
+        assert movies.get_movie_genre('X') == ''
+
+    def test_assigned_dict_copied(self):
+        """Присвоенный словарь копируется: его изменения не обходят индексы"""
+        books = BooksCollector()
+        titles = {'Книга': 'Ужасы'}
+        books.books_genre = titles
+        titles['Другая'] = 'Ужасы'
+        assert books.get_books_with_specific_genre('Ужасы') == ['Книга']
+        assert 'Другая' not in books
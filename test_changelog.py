@@ -0,0 +1,175 @@
+import time
+
+import pytest
+
+from books_collector import BooksCollector
+from changelog import FAVORITE, GENRE, ChangeLog
+from movie_collector import MovieCollector
+from title_store import DictTitleStore
+
+
+class TestChangeLog:
+
+    @pytest.fixture
+    def store(self):
+        """Фикстура создает хранилище, в которое пишутся изменения журнала"""
+        return DictTitleStore(lambda genre: genre == 'Комедия')
+
+    def test_adds_are_runs(self, store):
+        """Добавления хранятся сериями, а не поштучно"""
+        log = ChangeLog()
+        store.add_many({'Шрек': '', 'Пила': 'Ужасы'})
+        log.record_added(2)
+        store.add('Матрица')
+        log.record_added(1)
+        assert log.version == 3
+        assert len(log) == 1
+        assert log.size_at(1) == 1
+        assert log.changes_since(1, store, ()).titles == {'Пила': 'Ужасы', 'Матрица': ''}
+
+    def test_genre_changes_coalesce(self, store):
+        """Повторные изменения одного ключа хранятся одной записью, значения текущие"""
+        log = ChangeLog()
+        store.add_many({'Шрек': '', 'Пила': ''})
+        log.record_added(2)
+        store.set_genre('Шрек', 'Драма')
+        log.record(GENRE, 'Шрек')
+        store.add('Матрица')
+        log.record_added(1)
+        store.set_genre('Шрек', 'Комедия')
+        log.record(GENRE, 'Шрек')
+        assert log.version == 5
+        assert log.size_at(2) == 2
+        assert log.size_at(3) == 2
+        assert log.size_at(4) == 3
+        assert log.changes_since(2, store, ()).titles == {'Матрица': '', 'Шрек': 'Комедия'}
+        assert log.changes_since(4, store, ()).titles == {'Шрек': 'Комедия'}
+        assert len(log.changes_since(5, store, ())) == 0
+
+    def test_favorites(self, store):
+        """Для избранного возвращается текущее состояние"""
+        log = ChangeLog()
+        store.add('Шрек')
+        log.record_added(1)
+        log.record(FAVORITE, 'Шрек')
+        assert log.changes_since(1, store, ['Шрек']).favorites == {'Шрек': True}
+        log.record(FAVORITE, 'Шрек')
+        assert log.changes_since(1, store, []).favorites == {'Шрек': False}
+
+    def test_compaction_bounds_memory(self, store):
+        """Журнал не превышает max_entries, старые версии требуют полной выгрузки"""
+        log = ChangeLog(max_entries=100)
+        for number in range(1000):
+            store.add(str(number))
+            log.record_added(1)
+            log.record(GENRE, str(number))
+        assert len(log) <= 100
+        assert log.changes_since(10, store, ()).full
+        recent = log.changes_since(1980, store, ())
+        assert not recent.full
+        assert list(recent.titles) == [str(number) for number in range(990, 1000)]
+
+    def test_compaction_is_amortized(self, store):
+        """Чередование добавлений и смен жанра далеко за max_entries остается линейным"""
+        log = ChangeLog(max_entries=1000)
+        started = time.perf_counter()
+        for number in range(20000):
+            store.add(str(number))
+            log.record_added(1)
+            log.record(GENRE, str(number))
+        assert time.perf_counter() - started < 2
+        assert len(log) <= 1000
+        recent = log.changes_since(log.version - 10, store, ())
+        assert not recent.full
+        assert list(recent.titles) == [str(number) for number in range(19995, 20000)]
+
+    def test_empty_runs_are_merged(self, store):
+        """Серия без добавлений не создает новую точку в журнале"""
+        log = ChangeLog()
+        store.add('Шрек')
+        log.record_added(1)
+        log.record(GENRE, 'Шрек')
+        log.record_added(0)
+        log.record(FAVORITE, 'Шрек')
+        log.record_added(0)
+        assert len(log._run_versions) == 2
+        assert log.size_at(1) == 1 and log.size_at(log.version) == 1
+
+    def test_reset(self):
+        """После замены коллекции целиком все прежние версии требуют полной выгрузки"""
+        log = ChangeLog()
+        log.record_added(1)
+        log.reset(5)
+        assert log.changes_since(1, DictTitleStore(bool), ()).full
+        assert log.size_at(log.version) == 5
+
+
+def replicate(source, replica, version):
+    """Применяет изменения source после version к реплике, возвращает новую версию"""
+    delta = source.changes_since(version)
+    assert not delta.full
+    replica.add_new_movies(name for name in delta.titles if name not in replica)
+    for name, genre in delta.titles.items():
+        if genre:
+            replica.set_movie_genre(name, genre)
+    for name, favorite in delta.favorites.items():
+        if favorite:
+            replica.add_movie_to_favorites(name)
+        else:
+            replica.remove_movie_from_favorites(name)
+    return delta.version
+
+
+class TestCollectorChanges:
+
+    @pytest.mark.parametrize('compact', [False, True])
+    def test_movie_replica_sync(self, compact):
+        """Реплика, применяющая дельты, совпадает с исходной коллекцией"""
+        source = MovieCollector(compact=compact)
+        replica = MovieCollector()
+        source.add_new_movie('Шрек')
+        source.add_new_movies([('Пила', 'Ужасы'), ('Матрица', 'Фантастика')])
+        version = replicate(source, replica, 0)
+        source.set_movie_genre('Шрек', 'Комедия')
+        source.add_movie_to_favorites('Шрек')
+        source.add_movie_to_favorites('Пила')
+        source.remove_movie_from_favorites('Пила')
+        delta = source.changes_since(version)
+        assert delta.titles == {'Шрек': 'Комедия'}
+        assert delta.favorites == {'Шрек': True, 'Пила': False}
+        version = replicate(source, replica, version)
+        assert replica.get_all_movies() == source.get_all_movies()
+        assert replica.get_favorites_movies() == source.get_favorites_movies()
+        assert version == source.version
+
+    def test_noop_changes_not_logged(self):
+        """Изменения, которые ничего не меняют, не увеличивают версию"""
+        collector = BooksCollector()
+        collector.add_new_book('Дюна')
+        collector.set_book_genre('Дюна', 'Фантастика')
+        version = collector.version
+        collector.add_new_book('Дюна')
+        collector.set_book_genre('Дюна', 'Фантастика')
+        collector.set_book_genre('Дюна', 'Мюзикл')
+        collector.add_book_in_favorites('Дюна')
+        collector.add_book_in_favorites('Дюна')
+        collector.delete_book_from_favorites('Нет такой')
+        assert collector.version == version + 1
+        assert collector.changes_since(version).favorites == {'Дюна': True}
+
+    @pytest.mark.parametrize('replace', ['genre_dict', 'favorites', 'snapshot'])
+    def test_full_replace_requires_full_sync(self, replace, tmp_path):
+        """Замена словаря, избранного или загрузка снимка требуют полной выгрузки"""
+        collector = BooksCollector()
+        collector.add_new_book('Дюна')
+        version = collector.version
+        if replace == 'genre_dict':
+            collector.books_genre = {'Солярис': ''}
+        elif replace == 'favorites':
+            collector.favorites = ['Дюна']
+        else:
+            path = tmp_path / 'books.snap'
+            collector.dump_snapshot(path)
+            collector.load_snapshot(path)
+        assert collector.changes_since(version).full
+        assert not collector.changes_since(collector.version).full
@@ -0,0 +1,115 @@
+import random
+import tracemalloc
+
+import pytest
+
+from books_collector import BooksCollector
+from compact_store import CompactTitleStore
+from movie_collector import MovieCollector
+from title_store import DictTitleStore
+
+
+def is_for_children(genre):
+    return genre in ('Комедия', 'Драма')
+
+
+class TestCompactTitleStore:
+
+    @pytest.fixture
+    def store(self):
+        """Фикстура создает пустое компактное хранилище"""
+        return CompactTitleStore(is_for_children, genres=['Драма', 'Комедия', 'Ужасы'])
+
+    def test_basic_operations(self, store):
+        """Добавление, смена жанра и выборки"""
+        store.add('Пила')
+        store.add_many({'Шрек': 'Комедия', 'Без жанра': ''})
+        store.set_genre('Пила', 'Ужасы')
+        assert store.get('Пила') == 'Ужасы'
+        assert store.get('Без жанра') == ''
+        assert store.get('Призрак') is None
+        assert 'Шрек' in store
+        assert len(store) == 3
+        assert store.titles('Ужасы') == ['Пила']
+        assert store.count('Комедия') == 1
+        assert store.children() == ['Шрек']
+        assert store.mapping() == {'Пила': 'Ужасы', 'Шрек': 'Комедия', 'Без жанра': ''}
+
+    def test_unknown_genre_from_mapping(self, store):
+        """Жанр вне списка получает новый код, как при прямой замене словаря"""
+        store.replace({'Странный': 'Мюзикл'})
+        assert store.get('Странный') == 'Мюзикл'
+        assert store.titles('Мюзикл') == ['Странный']
+
+    def test_matches_dict_store(self):
+        """Случайная последовательность операций дает те же ответы, что и словарь"""
+        rng = random.Random(7)
+        genres = ['', 'Драма', 'Комедия', 'Ужасы']
+        compact = CompactTitleStore(is_for_children, genres=genres)
+        plain = DictTitleStore(is_for_children)
+        for step in range(3000):
+            name = f'Фильм {rng.randrange(500)}'
+            if name not in plain:
+                compact.add(name)
+                plain.add(name)
+            else:
+                genre = rng.choice(genres)
+                compact.set_genre(name, genre)
+                plain.set_genre(name, genre)
+        assert compact.mapping() == plain.mapping()
+        assert list(compact.items()) == list(plain.items())
+        for genre in genres:
+            assert compact.titles(genre) == plain.titles(genre)
+            assert compact.count(genre) == plain.count(genre)
+        assert compact.children() == plain.children()
+        assert compact.children_count() == plain.children_count()
+
+    def test_memory_at_least_halved(self):
+        """Компактный режим расходует как минимум вдвое меньше памяти на название"""
+        def traced_size(compact):
+            tracemalloc.start()
+            collector = MovieCollector(compact=compact)
+            collector.add_new_movies((f'Фильм номер {number}', 'Драма') for number in range(20000))
+            size, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            return size
+
+        assert traced_size(True) * 2 <= traced_size(False)
+
+
+class TestCompactCollectors:
+
+    def test_movie_collector_compact_mode(self):
+        """Публичные методы в компактном режиме отвечают как обычно"""
+        collector = MovieCollector(compact=True)
+        collector.add_new_movie('История игрушек')
+        collector.set_movie_genre('История игрушек', 'Комедия')
+        collector.add_new_movie('Пила')
+        collector.set_movie_genre('Пила', 'Ужасы')
+        collector.add_new_movie('Пила')
+        collector.add_movie_to_favorites('Пила')
+        assert collector.get_all_movies() == {'История игрушек': 'Комедия', 'Пила': 'Ужасы'}
+        assert collector.get_movies_by_genre('Ужасы') == ['Пила']
+        assert collector.get_movies_for_children() == ['История игрушек']
+        assert collector.get_favorites_movies() == ['Пила']
+
+    def test_books_collector_compact_mode(self):
+        """Прямая замена словаря книг в компактном режиме"""
+        collector = BooksCollector(compact=True)
+        collector.books_genre = {'Мультик': 'Мультфильмы', 'Ужастик': 'Ужасы', 'Странная': 'Боевик'}
+        assert collector.get_books_for_children() == ['Мультик']
+        assert collector.get_books_with_specific_genre('Боевик') == []
+        collector.add_new_book('Мультик')
+        assert collector.get_book_genre('Мультик') == 'Мультфильмы'
+
+    def test_snapshot_thaws_into_compact_store(self, tmp_path):
+        """Запись после загрузки снимка переносит данные в компактное хранилище"""
+        source = MovieCollector()
+        source.add_new_movies([('Шрек', 'Комедия'), ('Пила', 'Ужасы')])
+        path = tmp_path / 'movies.snap'
+        source.dump_snapshot(path)
+        collector = MovieCollector(compact=True)
+        collector.load_snapshot(path)
+        collector.add_new_movie('Новый')
+        assert isinstance(collector._store, CompactTitleStore)
+        assert list(collector.get_all_movies()) == ['Шрек', 'Пила', 'Новый']
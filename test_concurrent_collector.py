@@ -0,0 +1,156 @@
+import random
+import threading
+
+import pytest
+
+from concurrent_collector import ConcurrentBooksCollector, ConcurrentMovieCollector, RWLock
+
+
+class TestRWLock:
+
+    def test_readers_run_in_parallel(self):
+        """Несколько читателей одновременно удерживают блокировку"""
+        lock = RWLock()
+        barrier = threading.Barrier(3, timeout=5)
+
+        def reader():
+            with lock.read_locked():
+                barrier.wait()
+
+        threads = [threading.Thread(target=reader) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert not barrier.broken
+
+    def test_writer_excludes_readers(self):
+        """Пока писатель держит блокировку, читатель ждет"""
+        lock = RWLock()
+        events = []
+        lock.acquire_write()
+        reader = threading.Thread(target=lambda: (lock.acquire_read(), events.append('read'), lock.release_read()))
+        reader.start()
+        reader.join(0.1)
+        events.append('write done')
+        lock.release_write()
+        reader.join()
+        assert events == ['write done', 'read']
+
+    def test_reentrant(self):
+        """Писатель может повторно захватить запись и чтение"""
+        lock = RWLock()
+        with lock.write_locked():
+            with lock.write_locked():
+                with lock.read_locked():
+                    pass
+        with lock.read_locked():
+            with lock.read_locked():
+                pass
+        with lock.write_locked():
+            pass
+
+    def test_upgrade_not_allowed(self):
+        """Повышение чтения до записи запрещено, чтобы избежать взаимоблокировки"""
+        lock = RWLock()
+        with lock.read_locked():
+            with pytest.raises(RuntimeError):
+                lock.acquire_write()
+
+
+class TestConcurrentCollectors:
+
+    def test_stress_movies(self):
+        """Много потоков одновременно добавляют, меняют жанры и избранное"""
+        collector = ConcurrentMovieCollector()
+        genres = collector.available_genres
+        errors = []
+
+        def worker(seed):
+            rng = random.Random(seed)
+            try:
+                for _ in range(1500):
+                    name = f'Фильм {rng.randrange(300)}'
+                    action = rng.randrange(8)
+                    if action == 0:
+                        collector.add_new_movie(name)
+                    elif action == 1:
+                        collector.set_movie_genre(name, rng.choice(genres))
+                    elif action == 2:
+                        collector.add_movie_to_favorites(name)
+                    elif action == 3:
+                        collector.remove_movie_from_favorites(name)
+                    elif action == 4:
+                        collector.get_movies_by_genre(rng.choice(genres))
+                    elif action == 5:
+                        # Запись напрямую в словарь фильмов тоже идет под блокировкой
+                        collector.movies_genre[name] = rng.choice(genres)
+                    elif action == 6 and rng.randrange(50) == 0:
+                        collector.favorites = list(collector.get_favorites_movies())[::2]
+                    else:
+                        list(collector.get_favorites_movies())
+                        collector.get_movies_for_children()
+                        collector.get_all_movies()
+            except Exception as error:  # Ошибку из потока проверяем в основном потоке
+                errors.append(error)
+
+        threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        movies = collector.get_all_movies()
+        favorites = list(collector.get_favorites_movies())
+        assert len(favorites) == len(set(favorites))
+        assert set(favorites) <= set(movies)
+        for genre in genres:
+            assert collector.get_movies_by_genre(genre) == [name for name, movie_genre in movies.items()
+                                                            if movie_genre == genre]
+        assert collector.get_movies_for_children() == [name for name, genre in movies.items()
+                                                       if genre and genre not in collector.adult_genres]
+
+    def test_stress_books_bulk_and_single(self):
+        """Пакетные и поштучные добавления книг из разных потоков не теряются"""
+        collector = ConcurrentBooksCollector()
+
+        def worker(number):
+            collector.add_new_books([f'Книга {number}-{index}' for index in range(200)])
+            for index in range(200):
+                collector.add_new_book(f'Одиночная {number}-{index}')
+                collector.set_book_genre(f'Одиночная {number}-{index}', 'Комедии')
+                collector.add_book_in_favorites(f'Одиночная {number}-{index}')
+
+        threads = [threading.Thread(target=worker, args=(number,)) for number in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(collector.get_books_genre()) == 6 * 400
+        assert len(collector.get_list_of_favorites_books()) == 6 * 200
+        assert collector.count_books_for_children() == 6 * 200
+
+    def test_returned_objects_are_copies(self):
+        """Возвращаемые словарь и избранное не меняются при последующих записях"""
+        collector = ConcurrentMovieCollector()
+        collector.add_new_movie('Первый')
+        collector.add_movie_to_favorites('Первый')
+        movies = collector.get_all_movies()
+        favorites = collector.get_favorites_movies()
+        collector.add_new_movie('Второй')
+        collector.add_movie_to_favorites('Второй')
+        assert movies == {'Первый': ''}
+        assert favorites == ['Первый']
+
+    def test_load_jsonl_does_not_deadlock(self, tmp_path):
+        """Загрузка, вызывающая другие защищенные методы, не блокирует сама себя"""
+        source = ConcurrentMovieCollector()
+        source.add_new_movies([('Шрек', 'Комедия')])
+        source.add_movie_to_favorites('Шрек')
+        path = tmp_path / 'movies.jsonl'
+        source.dump_jsonl(path)
+        restored = ConcurrentMovieCollector()
+        restored.load_jsonl(path)
+        assert restored.get_favorites_movies() == ['Шрек']
@@ -0,0 +1,128 @@
+import pytest
+
+import genre_masks
+from books_collector import BooksCollector
+from genre_masks import GenreMaskColumn, parse_query
+from movie_collector import MovieCollector
+
+
+class TestParseQuery:
+
+    def test_precedence(self):
+        """NOT связывает сильнее AND, AND - сильнее OR"""
+        assert parse_query('А OR Б AND NOT В') == \
+            ('or', ('genre', 'А'), ('and', ('genre', 'Б'), ('not', ('genre', 'В'))))
+
+    def test_parentheses_and_multiword_genre(self):
+        """Скобки меняют порядок, жанр может состоять из нескольких слов"""
+        assert parse_query('(Научная фантастика OR Драма) AND Комедия') == \
+            ('and', ('or', ('genre', 'Научная фантастика'), ('genre', 'Драма')), ('genre', 'Комедия'))
+
+    @pytest.mark.parametrize('query', ['', 'AND Драма', 'Драма AND', '(Драма', 'Драма )'])
+    def test_syntax_errors(self, query):
+        """Ошибки синтаксиса вызывают ValueError"""
+        with pytest.raises(ValueError):
+            parse_query(query)
+
+
+class TestGenreMaskColumn:
+
+    @pytest.fixture(params=['numpy', 'translate'])
+    def column(self, request, monkeypatch):
+        """Фикстура создает столбец масок; проверяются оба способа фильтрации"""
+        if request.param == 'numpy':
+            if genre_masks.numpy is None:
+                pytest.skip('NumPy не установлен')
+        else:
+            monkeypatch.setattr(genre_masks, 'numpy', None)
+        column = GenreMaskColumn(['Драма', 'Комедия', 'Ужасы'])
+        for genres in (['Драма'], ['Драма', 'Комедия'], [], ['Комедия', 'Ужасы'], ['Комедия']):
+            column.append(genres)
+        return column
+
+    def test_positions_and_count(self, column):
+        """Фильтрация по таблице истинности запроса"""
+        table = column.compile('Комедия AND NOT Ужасы')
+        assert list(column.positions(table)) == [1, 4]
+        assert list(column.positions(table, after=1)) == [4]
+        assert column.count(table) == 2
+        assert column.count(column.compile('NOT (Драма OR Комедия)')) == 1
+        assert column.count(column.compile('Мюзикл')) == 0
+
+    def test_set_and_genres_at(self, column):
+        """Маска заменяется целиком, жанры возвращаются в порядке столбца"""
+        assert column.set(2, ['Ужасы', 'Драма'])
+        assert not column.set(2, ['Драма', 'Ужасы'])
+        assert column.genres_at(2) == ['Драма', 'Ужасы']
+
+    def test_too_many_genres(self):
+        """Больше восьми жанров в маску не помещаются"""
+        with pytest.raises(ValueError):
+            GenreMaskColumn([str(number) for number in range(9)])
+
+
+class TestCollectorGenres:
+
+    @pytest.fixture(params=[False, True])
+    def movies(self, request):
+        """Фикстура создает коллекцию фильмов с несколькими жанрами"""
+        collector = MovieCollector(compact=request.param)
+        collector.add_new_movies([('Пятый элемент', 'Фантастика'), ('Назад в будущее', 'Фантастика'),
+                                  ('Маска', 'Комедия'), ('Чужой', 'Ужасы')])
+        collector.set_movie_genres('Пятый элемент', ['Фантастика', 'Комедия', 'Боевик'])
+        collector.set_movie_genres('Назад в будущее', ['Фантастика', 'Комедия'])
+        collector.set_movie_genres('Чужой', ['Фантастика', 'Ужасы'])
+        return collector
+
+    def test_find_movies(self, movies):
+        """Запрос с AND, OR и NOT по нескольким жанрам"""
+        assert movies.find_movies('Фантастика AND Комедия') == ['Пятый элемент', 'Назад в будущее']
+        assert movies.find_movies('Фантастика AND Комедия AND NOT Боевик') == ['Назад в будущее']
+        assert movies.find_movies('Ужасы OR Комедия AND NOT Фантастика') == ['Маска', 'Чужой']
+        assert movies.count_movies_matching('Фантастика') == 3
+
+    def test_pages(self, movies):
+        """Результат запроса разбивается на страницы по курсору"""
+        page = movies.find_movies('Фантастика', limit=2)
+        assert page == ['Пятый элемент', 'Назад в будущее']
+        assert movies.find_movies('Фантастика', cursor=page.cursor) == ['Чужой']
+
+    def test_primary_genre_keeps_children_safe(self, movies):
+        """Основной жанр - первый взрослый, поэтому такие фильмы не детские"""
+        assert movies.get_movie_genre('Пятый элемент') == 'Боевик'
+        assert movies.get_movie_genre('Назад в будущее') == 'Фантастика'
+        assert movies.get_movie_genres('Пятый элемент') == ['Фантастика', 'Комедия', 'Боевик']
+        assert movies.get_movies_for_children() == ['Назад в будущее', 'Маска']
+
+    def test_single_genre_resets_mask(self, movies):
+        """set_movie_genre оставляет фильму один жанр"""
+        movies.set_movie_genre('Назад в будущее', 'Фантастика')
+        assert movies.get_movie_genres('Назад в будущее') == ['Фантастика']
+        assert movies.find_movies('Комедия') == ['Пятый элемент', 'Маска']
+
+    def test_new_movies_tracked(self, movies):
+        """Добавленные после построения масок фильмы участвуют в запросах"""
+        movies.add_new_movie('Без жанра')
+        movies.add_new_movies([('Шрек', 'Комедия')])
+        assert movies.find_movies('NOT (Фантастика OR Комедия OR Ужасы)') == ['Без жанра']
+        assert movies.find_movies('Комедия AND NOT Фантастика') == ['Маска', 'Шрек']
+
+    def test_invalid_genres_ignored(self, movies):
+        """Список с недопустимым жанром не применяется"""
+        movies.set_movie_genres('Маска', ['Комедия', 'Мюзикл'])
+        movies.set_movie_genres('Нет такого', ['Комедия'])
+        movies.set_movie_genres('Маска', [])
+        assert movies.get_movie_genres('Маска') == ['Комедия']
+        assert movies.get_movie_genres('Нет такого') is None
+
+    def test_books(self):
+        """Книги с несколькими жанрами и запросы по ним"""
+        collector = BooksCollector()
+        collector.add_new_books(['Дюна', 'Шерлок'])
+        assert collector.get_book_genres('Дюна') == []
+        collector.set_book_genres('Дюна', ['Фантастика', 'Комедии'])
+        collector.set_book_genres('Шерлок', ['Комедии', 'Детективы'])
+        assert collector.get_book_genre('Шерлок') == 'Детективы'
+        assert collector.get_books_for_children() == ['Дюна']
+        assert collector.find_books('Комедии AND NOT Детективы') == ['Дюна']
+        assert collector.count_books_matching('Комедии') == 2
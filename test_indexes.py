@@ -0,0 +1,177 @@
+import random
+
+import pytest
+from indexes import FavoritesSet, GenreIndex, TitleBucket
+
+
+class TestTitleBucket:
+
+    @pytest.fixture
+    def bucket(self):
+        """Фикстура создает пустое упорядоченное множество названий"""
+        return TitleBucket()
+
+    def test_iteration_follows_seq_order(self, bucket):
+        """Порядок обхода определяется порядковым номером, а не порядком вставки"""
+        bucket.add('Третья', 3)
+        bucket.add('Первая', 1)
+        bucket.add('Вторая', 2)
+        assert list(bucket) == ['Первая', 'Вторая', 'Третья']
+
+    def test_add_duplicate_ignored(self, bucket):
+        """Повторное добавление названия не создает дубликат"""
+        bucket.add('Книга', 1)
+        bucket.add('Книга', 1)
+        assert list(bucket) == ['Книга']
+        assert len(bucket) == 1
+
+    def test_discard(self, bucket):
+        """Удаление исключает название из обхода и из проверки вхождения"""
+        bucket.add('A', 1)
+        bucket.add('B', 2)
+        bucket.discard('A')
+        bucket.discard('Нет такого')
+        assert 'A' not in bucket
+        assert list(bucket) == ['B']
+        assert len(bucket) == 1
+
+    def test_readd_after_discard(self, bucket):
+        """Название можно удалить и добавить снова с тем же номером"""
+        bucket.add('A', 1)
+        bucket.add('B', 2)
+        bucket.discard('B')
+        bucket.add('B', 2)
+        bucket.discard('B')
+        bucket.add('B', 2)
+        assert list(bucket) == ['A', 'B']
+
+    def test_many_discards_compact(self, bucket):
+        """Массовое удаление не ломает порядок оставшихся названий"""
+        for seq in range(200):
+            bucket.add(str(seq), seq)
+        for seq in range(0, 200, 3):
+            bucket.discard(str(seq))
+        assert list(bucket) == [str(seq) for seq in range(200) if seq % 3]
+
+    def test_discard_with_out_of_order_inserts(self, bucket):
+        """Удаление после вставок не в конец сохраняет порядок и не теряет названия"""
+        for seq in range(0, 10, 2):
+            bucket.add(str(seq), seq)
+        bucket.add('3', 3)
+        bucket.add('7', 7)
+        bucket.discard('4')
+        bucket.discard('7')
+        assert list(bucket) == ['0', '2', '3', '6', '8']
+        bucket.add('7', 7)
+        assert list(bucket) == ['0', '2', '3', '6', '7', '8']
+
+    def test_iter_after(self, bucket):
+        """Обход с номера учитывает ожидающие и добавленные во время обхода названия"""
+        bucket.add('A', 1)
+        bucket.add('C', 5)
+        bucket.add('B', 3)
+        bucket.discard('C')
+        iterator = bucket.iter_after(1)
+        assert next(iterator) == (3, 'B')
+        bucket.add('D', 7)
+        assert list(iterator) == [(7, 'D')]
+        assert list(bucket.iter_after(7)) == []
+
+    def test_random_operations_match_sorted_model(self, bucket, monkeypatch):
+        """Случайные вставки и удаления с маленькими блоками совпадают с моделью"""
+        monkeypatch.setattr(TitleBucket, 'BLOCK_SIZE', 4)
+        rng = random.Random(7)
+        model = {}
+        for _ in range(2000):
+            seq = rng.randrange(300)
+            if rng.random() < 0.6:
+                bucket.add(str(seq), seq)
+                model[str(seq)] = seq
+            else:
+                bucket.discard(str(seq))
+                model.pop(str(seq), None)
+        expected = sorted(model.items(), key=lambda item: item[1])
+        assert list(bucket) == [name for name, _ in expected]
+        assert list(bucket.iter_after(150)) == [(seq, name) for name, seq in expected if seq > 150]
+        assert len(bucket) == len(model)
+
+    def test_iter_after_survives_splits_and_deletes(self, bucket, monkeypatch):
+        """Ленивый обход продолжается с последнего номера после сдвигов в блоках"""
+        monkeypatch.setattr(TitleBucket, 'BLOCK_SIZE', 2)
+        for seq in range(0, 20, 2):
+            bucket.add(str(seq), seq)
+        iterator = bucket.iter_after(-1)
+        assert [next(iterator) for _ in range(3)] == [(0, '0'), (2, '2'), (4, '4')]
+        bucket.add('1', 1)  # Раньше места обхода - не выдается
+        bucket.add('5', 5)
+        bucket.discard('6')
+        bucket.discard('8')
+        for seq in (7, 9, 11):
+            bucket.add(str(seq), seq)
+        assert [seq for seq, _ in iterator] == [5, 7, 9, 10, 11, 12, 14, 16, 18]
+
+
+class TestGenreIndex:
+
+    def test_titles_keep_collection_order(self):
+        """Названия жанра возвращаются в порядке добавления в коллекцию"""
+        index = GenreIndex()
+        index.add_title('Первая')
+        index.add_title('Вторая')
+        index.set_genre('Вторая', '', 'Ужасы')
+        index.set_genre('Первая', '', 'Ужасы')
+        assert index.titles('Ужасы') == ['Первая', 'Вторая']
+        assert index.titles('') == []
+        assert index.count('Ужасы') == 2
+
+    def test_rebuild(self):
+        """Пересборка индекса по словарю"""
+        index = GenreIndex()
+        index.add_title('Старая')
+        index.rebuild({'A': 'Ужасы', 'B': '', 'C': 'Ужасы'})
+        assert index.titles('Ужасы') == ['A', 'C']
+        assert index.titles('') == ['B']
+
+    def test_unknown_genre(self):
+        """Запрос по жанру без названий возвращает пустой список"""
+        assert GenreIndex().titles('Комедии') == []
+
+
+class TestFavoritesSet:
+
+    def test_keeps_order_and_uniqueness(self):
+        """Порядок добавления сохраняется, дубликаты не появляются"""
+        favorites = FavoritesSet()
+        favorites.add('Б')
+        favorites.add('А')
+        favorites.add('Б')
+        assert favorites == ['Б', 'А']
+        assert len(favorites) == 2
+
+    def test_list_compatibility(self):
+        """Сравнение со списком, индексы, срезы и вхождение работают как у списка"""
+        favorites = FavoritesSet(['А', 'Б', 'В'])
+        assert favorites == ['А', 'Б', 'В']
+        assert favorites != ['В', 'Б', 'А']
+        assert favorites[0] == 'А'
+        assert favorites[-1] == 'В'
+        assert favorites[1:] == ['Б', 'В']
+        assert 'Б' in favorites
+        assert list(favorites) == ['А', 'Б', 'В']
+        assert repr(favorites) == "['А', 'Б', 'В']"
+
+    def test_index_out_of_range(self):
+        """Обращение за пределы вызывает IndexError"""
+        with pytest.raises(IndexError):
+            FavoritesSet(['А'])[1]
+
+    def test_discard_and_remove(self):
+        """discard молча игнорирует отсутствующее название, remove - нет"""
+        favorites = FavoritesSet(['А', 'Б'])
+        favorites.discard('А')
+        favorites.discard('Нет')
+        assert favorites == ['Б']
+        with pytest.raises(ValueError):
+            favorites.remove('Нет')
+        favorites.remove('Б')
+        assert favorites == []
@@ -0,0 +1,44 @@
+from ingest import (DUPLICATE, INVALID_GENRE, INVALID_ITEM, INVALID_LENGTH,
+                    IngestReport, validate_batch)
+
+
+class TestValidateBatch:
+
+    GENRES = frozenset(['Драма', 'Комедия'])
+
+    def test_accepts_names_and_pairs(self):
+        """Принимаются как отдельные названия, так и пары (название, жанр)"""
+        accepted, report = validate_batch(['А', ('Б', 'Драма')], {}, 1, 10, self.GENRES)
+        assert accepted == {'А': '', 'Б': 'Драма'}
+        assert report.added == 2
+        assert report.rejected == []
+
+    def test_rejection_reasons(self):
+        """Каждый отклоненный элемент сопровождается номером и причиной"""
+        items = ['', 'Длинное название', 'Есть', ('Дубль', ''), 'Дубль', ('Жанр', 'Мюзикл'), 42]
+        accepted, report = validate_batch(items, {'Есть': ''}, 1, 10, self.GENRES)
+        assert report.rejected == [
+            (0, '', INVALID_LENGTH),
+            (1, 'Длинное название', INVALID_LENGTH),
+            (2, 'Есть', DUPLICATE),
+            (4, 'Дубль', DUPLICATE),
+            (5, 'Жанр', INVALID_GENRE),
+            (6, 42, INVALID_ITEM),
+        ]
+        # Название с недопустимым жанром добавляется без жанра
+        assert accepted == {'Дубль': '', 'Жанр': ''}
+        assert report.added == 2
+
+    def test_reasons_summary(self):
+        """Сводка по причинам отклонения"""
+        report = IngestReport()
+        report.reject(0, '', INVALID_LENGTH)
+        report.reject(1, '', INVALID_LENGTH)
+        report.reject(2, 'А', DUPLICATE)
+        assert report.reasons() == {INVALID_LENGTH: 2, DUPLICATE: 1}
+
+    def test_non_string_genre_is_invalid_item(self):
+        """Пара с жанром не строкой отклоняется, а не роняет проверку"""
+        accepted, report = validate_batch([('А', ['Драма']), ('Б', None)], {}, 1, 10, self.GENRES)
+        assert accepted == {'Б': ''}
+        assert report.rejected == [(0, ('А', ['Драма']), INVALID_ITEM)]
@@ -0,0 +1,104 @@
+import pytest
+
+from books_collector import BooksCollector
+from concurrent_collector import ConcurrentMovieCollector
+from instrumentation import instrument, uninstrument
+from movie_collector import MovieCollector
+
+
+class TestInstrumentation:
+
+    @pytest.fixture
+    def movies(self):
+        """Фикстура создает коллекцию фильмов с включенными замерами"""
+        collector = MovieCollector()
+        collector.add_new_movies([('Пила', 'Ужасы'), ('Шрек', 'Комедия'), ('Рэмбо', 'Боевик')])
+        instrument(collector)
+        return collector
+
+    def test_counts_latency_and_result_size(self, movies):
+        """Для каждого метода считаются вызовы, задержка и размер результата"""
+        movies.get_movies_by_genre('Ужасы')
+        movies.get_movies_by_genre('Комедия')
+        movies.get_movies_for_children()
+        movies.add_movie_to_favorites('Пила')
+        snapshot = movies._instrumentation.snapshot()
+        assert snapshot['get_movies_by_genre']['calls'] == 2
+        assert snapshot['get_movies_by_genre']['result_items'] == 2
+        assert snapshot['get_movies_for_children']['result_items'] == 1
+        assert snapshot['add_movie_to_favorites']['calls'] == 1
+        stats = snapshot['get_movies_by_genre']
+        assert 0 <= stats['max_seconds'] <= stats['total_seconds']
+        assert stats['mean_seconds'] == pytest.approx(stats['total_seconds'] / 2)
+
+    def test_behaviour_unchanged(self, movies):
+        """Замеры не меняют ответы и тип коллекции"""
+        assert isinstance(movies, MovieCollector)
+        assert type(movies).__name__ == 'MovieCollector'
+        assert movies.get_movie_genre('Шрек') == 'Комедия'
+        assert movies.get_movies_by_genre.__name__ == 'get_movies_by_genre'
+
+    def test_errors_counted(self):
+        """Исключение в методе учитывается и пробрасывается дальше"""
+        books = BooksCollector()
+        instrumentation = instrument(books)
+        with pytest.raises(TypeError):
+            books.add_new_book(None)
+        stats = instrumentation.snapshot()['add_new_book']
+        assert stats['calls'] == 1
+        assert stats['errors'] == 1
+        assert stats['result_items'] == 0
+
+    def test_prometheus_export(self, movies):
+        """Экспорт в текстовом формате Prometheus"""
+        movies.get_all_movies()
+        text = movies._instrumentation.prometheus()
+        assert '# TYPE collector_calls_total counter' in text
+        assert 'collector_calls_total{collector="MovieCollector",method="get_all_movies"} 1' in text
+        assert 'collector_result_items_total{collector="MovieCollector",method="get_all_movies"} 3' in text
+        assert text.endswith('\n')
+
+    def test_prometheus_keeps_precision(self, movies):
+        """Большие счетчики выводятся целыми, секунды - без округления"""
+        movies.get_all_movies()
+        stats = movies._instrumentation._stats['get_all_movies']
+        stats.calls = 1234567
+        stats.total_ns = 1234567891
+        text = movies._instrumentation.prometheus()
+        assert 'collector_calls_total{collector="MovieCollector",method="get_all_movies"} 1234567\n' in text
+        assert 'collector_latency_seconds_total{collector="MovieCollector",method="get_all_movies"} 1.234567891\n' in text
+
+    def test_uninstrument(self, movies):
+        """После выключения класс восстанавливается, статистика возвращается"""
+        movies.get_all_movies()
+        instrumentation = uninstrument(movies)
+        assert type(movies) is MovieCollector
+        movies.get_all_movies()
+        assert instrumentation.snapshot()['get_all_movies']['calls'] == 1
+        assert uninstrument(movies) is None
+
+    def test_instrument_twice_and_reset(self, movies):
+        """Повторное включение возвращает те же замеры, reset обнуляет их"""
+        assert instrument(movies) is movies._instrumentation
+        movies.get_all_movies()
+        movies._instrumentation.reset()
+        assert movies._instrumentation.snapshot() == {}
+
+    def test_profile_sampling(self):
+        """Каждый N-й вызов попадает в профиль cProfile, вложенные вызовы не мешают"""
+        movies = MovieCollector()
+        instrumentation = instrument(movies, profile_every=2)
+        assert instrumentation.profile_stats() is None
+        for number in range(10):
+            movies.add_new_movies([f'Фильм {number}'])
+        stats = instrumentation.profile_stats()
+        functions = {function for _, _, function in stats.stats}
+        assert 'add_new_movies' in functions
+
+    def test_concurrent_collector(self):
+        """Замеры работают поверх потокобезопасной коллекции"""
+        movies = ConcurrentMovieCollector()
+        instrumentation = instrument(movies)
+        movies.add_new_movie('Фильм')
+        assert movies.get_all_movies() == {'Фильм': ''}
+        assert instrumentation.snapshot()['get_all_movies']['result_items'] == 1
@@ -0,0 +1,108 @@
+import json
+
+import pytest
+
+import jsonl_io
+from books_collector import BooksCollector
+from movie_collector import MovieCollector
+
+
+class TestJsonl:
+
+    @pytest.fixture
+    def movies(self):
+        """Фикстура создает коллекцию фильмов с жанрами и избранным"""
+        collector = MovieCollector()
+        collector.add_new_movies([('Пила', 'Ужасы'), 'Без жанра', ('Шрек', 'Комедия')])
+        collector.add_movie_to_favorites('Шрек')
+        collector.add_movie_to_favorites('Пила')
+        return collector
+
+    def test_movies_roundtrip(self, movies, tmp_path):
+        """Сохраненная коллекция фильмов восстанавливается полностью"""
+        path = tmp_path / 'movies.jsonl'
+        movies.dump_jsonl(path)
+        restored = MovieCollector()
+        report = restored.load_jsonl(path)
+        assert report.added == 3
+        assert restored.get_all_movies() == movies.get_all_movies()
+        assert restored.get_favorites_movies() == ['Шрек', 'Пила']
+        assert restored.get_movies_for_children() == ['Шрек']
+
+    def test_books_roundtrip(self, tmp_path):
+        """Сохраненная коллекция книг восстанавливается полностью"""
+        books = BooksCollector()
+        books.add_new_books([('Мультик', 'Мультфильмы'), 'Книга'])
+        books.add_book_in_favorites('Книга')
+        path = tmp_path / 'books.jsonl'
+        books.dump_jsonl(path)
+        restored = BooksCollector()
+        restored.load_jsonl(path)
+        assert restored.get_books_genre() == {'Мультик': 'Мультфильмы', 'Книга': ''}
+        assert restored.get_list_of_favorites_books() == ['Книга']
+
+    def test_dump_format(self, movies, tmp_path):
+        """Каждая строка - отдельный JSON-объект, кириллица не экранируется"""
+        path = tmp_path / 'movies.jsonl'
+        movies.dump_jsonl(path)
+        lines = path.read_text(encoding='utf-8').splitlines()
+        assert lines[0] == '{"name": "Пила", "genre": "Ужасы"}'
+        assert [json.loads(line) for line in lines[3:]] == [{'favorite': 'Шрек'}, {'favorite': 'Пила'}]
+
+    def test_load_in_small_batches(self, monkeypatch, tmp_path):
+        """Загрузка пакетами не зависит от размера пакета, включая избранное внутри пакета"""
+        monkeypatch.setattr(jsonl_io, 'BATCH_SIZE', 2)
+        path = tmp_path / 'movies.jsonl'
+        path.write_text('\n'.join([
+            '{"name": "Первый", "genre": "Драма"}',
+            '{"favorite": "Первый"}',
+            '{"name": "Второй", "genre": "Мюзикл"}',
+            '',
+            '{"name": ""}',
+            '{"name": "Третий"}',
+            '{"name": "Четвертый"}',
+            '{"favorite": "Четвертый"}',
+            '[1, 2]',
+        ]), encoding='utf-8')
+        collector = MovieCollector()
+        report = collector.load_jsonl(path)
+        assert list(collector.get_all_movies()) == ['Первый', 'Второй', 'Третий', 'Четвертый']
+        assert collector.get_favorites_movies() == ['Первый', 'Четвертый']
+        # Номера отклоненных элементов - номера строк файла
+        assert report.rejected == [
+            (3, 'Второй', 'invalid_genre'),
+            (5, '', 'invalid_length'),
+            (9, None, 'invalid_item'),
+        ]
+
+    def test_load_rejects_non_string_values(self, tmp_path):
+        """Жанр или избранное не строкой отклоняются как некорректная запись"""
+        path = tmp_path / 'movies.jsonl'
+        path.write_text('\n'.join([
+            '{"name": "А", "genre": ["Драма"]}',
+            '{"name": "Б", "genre": null}',
+            '{"favorite": ["Б"]}',
+            '{"favorite": "Б"}',
+        ]), encoding='utf-8')
+        collector = MovieCollector()
+        report = collector.load_jsonl(path)
+        assert collector.get_all_movies() == {'Б': ''}
+        assert collector.get_favorites_movies() == ['Б']
+        assert report.rejected == [(1, None, 'invalid_item'), (3, None, 'invalid_item')]
+
+    def test_load_keeps_report_bounded(self, tmp_path, monkeypatch):
+        """Отчет хранит не больше MAX_REJECTED отклонений, но считает все"""
+        monkeypatch.setattr('jsonl_io.MAX_REJECTED', 3)
+        path = tmp_path / 'bad.jsonl'
+        path.write_text('\n'.join(['{"name": ""}'] * 10 + ['[1]'] * 5), encoding='utf-8')
+        report = MovieCollector().load_jsonl(path)
+        assert len(report.rejected) == 3
+        assert report.rejected_count == 15
+        assert report.reasons() == {'invalid_length': 10, 'invalid_item': 5}
+
+    def test_load_invalid_json(self, tmp_path):
+        """Некорректный JSON приводит к ошибке с номером строки"""
+        path = tmp_path / 'broken.jsonl'
+        path.write_text('{"name": "А"}\n{broken\n', encoding='utf-8')
+        with pytest.raises(ValueError, match=':2:'):
+            MovieCollector().load_jsonl(path)
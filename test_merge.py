@@ -0,0 +1,190 @@
+import pytest
+
+from books_collector import BooksCollector
+from concurrent_collector import ConcurrentMovieCollector
+from ingest import DUPLICATE, INVALID_GENRE, INVALID_LENGTH
+from merge import ADDED, PREFER_RESTRICTED, REGENRED, REMOVED, TAKE_THEIRS, favorites_intersection, \
+    favorites_union
+from movie_collector import MovieCollector
+
+
+def make_movies(titles, favorites=(), **options):
+    collector = MovieCollector(**options)
+    collector.add_new_movies(titles)
+    for name in favorites:
+        collector.add_movie_to_favorites(name)
+    return collector
+
+
+@pytest.fixture(params=[{}, {'compact': True}], ids=['dict', 'compact'])
+def options(request):
+    """Фикстура с режимом хранения: словарь или компактное хранилище"""
+    return request.param
+
+
+@pytest.fixture
+def ours(options):
+    """Фикстура с нашей коллекцией фильмов"""
+    return make_movies([('Общий', 'Драма'), ('Без жанра', ''), ('Только наш', 'Комедия'),
+                        ('Одинаковый', 'Боевик')], favorites=['Общий', 'Только наш'], **options)
+
+
+@pytest.fixture
+def theirs(options):
+    """Фикстура со второй коллекцией фильмов"""
+    return make_movies([('Общий', 'Ужасы'), ('Без жанра', 'Драма'), ('Только их', 'Фантастика'),
+                        ('Одинаковый', 'Боевик')], favorites=['Только их', 'Общий'], **options)
+
+
+class TestMerge:
+
+    def test_keep_ours_by_default(self, ours, theirs):
+        """По умолчанию конфликт решается в пользу нашего жанра, пустой жанр заполняется"""
+        report = ours.merge(theirs)
+        assert report.added == 1 and report.regenred == 1
+        assert report.conflicts == [('Общий', 'Драма', 'Ужасы')]
+        assert ours.get_movie_genre('Общий') == 'Драма'
+        assert ours.get_movie_genre('Без жанра') == 'Драма'
+        assert ours.get_movie_genre('Только их') == 'Фантастика'
+        assert list(ours.get_all_movies()) == ['Общий', 'Без жанра', 'Только наш', 'Одинаковый', 'Только их']
+
+    def test_take_theirs(self, ours, theirs):
+        """Политика TAKE_THEIRS берет их жанр, индексы и детская выборка обновляются"""
+        ours.merge(theirs, TAKE_THEIRS)
+        assert ours.get_movie_genre('Общий') == 'Ужасы'
+        assert ours.get_movies_by_genre('Ужасы') == ['Общий']
+        assert 'Общий' not in ours.get_movies_for_children()
+
+    def test_prefer_restricted_and_callable(self, theirs):
+        """PREFER_RESTRICTED выбирает жанр с ограничением, функция решает сама"""
+        restricted = make_movies([('Общий', 'Драма')])
+        restricted.merge(theirs, PREFER_RESTRICTED)
+        assert restricted.get_movie_genre('Общий') == 'Ужасы'
+        custom = make_movies([('Общий', 'Драма')])
+        custom.merge(theirs, lambda name, ours, other: 'Комедия')
+        assert custom.get_movie_genre('Общий') == 'Комедия'
+
+    def test_unknown_policy(self, ours, theirs):
+        """Неизвестная политика вызывает ValueError до изменения коллекции"""
+        with pytest.raises(ValueError):
+            ours.merge(theirs, 'latest')
+        assert 'Только их' not in ours
+
+    def test_favorites_merged(self, ours, theirs):
+        """Избранное другой коллекции добавляется после нашего, favorites=False отключает"""
+        ours.merge(theirs)
+        assert ours.get_favorites_movies() == ['Общий', 'Только наш', 'Только их']
+        other = make_movies([('Общий', 'Драма')], favorites=['Общий'])
+        other.merge(theirs, favorites=False)
+        assert other.get_favorites_movies() == ['Общий']
+
+    def test_catalog_rules_applied(self):
+        """Названия и жанры другого каталога проверяются правилами нашего"""
+        books = BooksCollector()
+        books.add_new_books([('Общая', 'Комедии')])
+        movies = make_movies([('Общая', 'Драма'), ('Н' * 60, 'Драма'), ('Новая', 'Мюзикл')])
+        movies.movies_genre['Новая'] = 'Мюзикл'
+        report = books.merge(movies, TAKE_THEIRS)
+        assert books.get_book_genre('Общая') == 'Комедии'
+        assert books.get_book_genre('Новая') == ''
+        assert report.reasons() == {INVALID_GENRE: 2, INVALID_LENGTH: 1}
+        assert report.added == 1
+
+    def test_common_titles_not_duplicates(self):
+        """Общие названия не считаются дубликатами при слиянии"""
+        report = make_movies(['Фильм']).merge(make_movies(['Фильм']))
+        assert DUPLICATE not in report.reasons()
+
+    def test_changes_and_cache_updated(self, theirs):
+        """Слияние попадает в журнал изменений и сбрасывает кеш выборок"""
+        ours = make_movies([('Общий', 'Драма')], cache_size=8)
+        assert ours.get_movies_by_genre('Ужасы') == []
+        version = ours.version
+        ours.merge(theirs, TAKE_THEIRS, favorites=False)
+        assert ours.get_movies_by_genre('Ужасы') == ['Общий']
+        changes = ours.changes_since(version)
+        assert changes.titles == {'Общий': 'Ужасы', 'Без жанра': 'Драма', 'Только их': 'Фантастика',
+                                  'Одинаковый': 'Боевик'}
+
+    def test_merge_self_and_empty(self, ours):
+        """Слияние с собой ничего не меняет, с пустой коллекцией - тоже"""
+        before = dict(ours.get_all_movies())
+        assert ours.merge(ours).added == 0
+        assert ours.merge(MovieCollector()).added == 0
+        assert ours.get_all_movies() == before
+        empty = MovieCollector()
+        assert empty.merge(ours).added == 4
+        assert empty.get_all_movies() == before
+
+    def test_merge_in_batches(self, monkeypatch):
+        """Новые названия добавляются пакетами по BATCH_SIZE"""
+        monkeypatch.setattr('merge.BATCH_SIZE', 2)
+        source = make_movies([f'Фильм {n}' for n in range(5)])
+        target = make_movies(['Фильм 3'])
+        report = target.merge(source)
+        assert report.added == 4 and not report.rejected
+        assert len(target.get_all_movies()) == 5
+
+    def test_concurrent_wrapper(self, theirs):
+        """Потокобезопасная коллекция сливает и сравнивает под своей блокировкой"""
+        collector = ConcurrentMovieCollector()
+        collector.merge(theirs)
+        assert not collector.diff(theirs)
+
+
+class TestDiff:
+
+    def test_added_removed_regenred(self, ours, theirs):
+        """Различия: только у них, только у нас, разные жанры"""
+        diff = ours.diff(theirs)
+        assert diff.added == {'Только их': 'Фантастика'}
+        assert diff.removed == {'Только наш': 'Комедия'}
+        assert diff.regenred == {'Общий': ('Драма', 'Ужасы'), 'Без жанра': ('', 'Драма')}
+        assert len(diff) == 4
+
+    def test_iter_diff_lazy(self, ours, theirs):
+        """iter_diff отдает различия по одному в порядке: наши, затем их"""
+        differences = ours.iter_diff(theirs)
+        assert next(differences) == (REGENRED, 'Общий', 'Драма', 'Ужасы')
+        assert list(differences) == [(REGENRED, 'Без жанра', '', 'Драма'),
+                                     (REMOVED, 'Только наш', 'Комедия', None),
+                                     (ADDED, 'Только их', None, 'Фантастика')]
+
+    def test_diff_after_merge(self, ours, theirs):
+        """После слияния с TAKE_THEIRS остаются только наши названия"""
+        ours.merge(theirs, TAKE_THEIRS)
+        diff = ours.diff(theirs)
+        assert not diff.added and not diff.regenred
+        assert diff.removed == {'Только наш': 'Комедия'}
+
+    def test_diff_with_snapshot(self, ours, theirs, tmp_path):
+        """Сравнение работает со снимком без переноса его в память"""
+        path = tmp_path / 'theirs.snap'
+        theirs.dump_snapshot(path)
+        mapped = MovieCollector()
+        mapped.load_snapshot(path)
+        assert ours.diff(mapped).regenred == ours.diff(theirs).regenred
+        assert mapped._store.read_only
+
+
+class TestFavoritesAlgebra:
+
+    def test_union(self, ours, theirs):
+        """Объединение: наш порядок, затем новые названия другой коллекции"""
+        assert ours.favorites_union(theirs) == ['Общий', 'Только наш', 'Только их']
+
+    def test_intersection(self, ours, theirs):
+        """Пересечение в нашем порядке"""
+        assert ours.favorites_intersection(theirs) == ['Общий']
+        assert ours.favorites_intersection(MovieCollector()) == []
+
+    def test_result_is_independent(self, ours, theirs):
+        """Результат - новый набор, избранное коллекций не меняется"""
+        union = ours.favorites_union(theirs)
+        union.add('Другой')
+        assert ours.get_favorites_movies() == ['Общий', 'Только наш']
+
+    def test_functions_accept_iterables(self):
+        """Функции модуля работают с любыми наборами названий"""
+        assert favorites_union(['А', 'Б'], ('Б', 'В')) == ['А', 'Б', 'В']
+        assert favorites_intersection(['А', 'Б', 'В'], {'В', 'А'}) == ['А', 'В']
@@ -45,6 +45,32 @@ class TestMovieCollector:
         collector.add_new_movie("Дубликат")
         assert list(collector.movies_genre.keys()) == ["Дубликат"]
 
+    # Тесты для add_new_movies
+    def test_add_new_movies_bulk(self, collector):
+        """Пакетная загрузка совпадает с поштучным добавлением и установкой жанра"""
+        items = [("Пила", "Ужасы"), "Без жанра", ("Шрек", "Комедия"), "", ("Шрек", "Драма")]
+        report = collector.add_new_movies(items)
+        expected = MovieCollector()
+        for item in items:
+            name, genre = item if isinstance(item, tuple) else (item, None)
+            if name not in expected.movies_genre:
+                expected.add_new_movie(name)
+                if genre:
+                    expected.set_movie_genre(name, genre)
+        assert collector.get_all_movies() == expected.get_all_movies()
+        assert collector.get_movies_for_children() == ["Шрек"]
+        assert collector.get_movies_by_genre("Ужасы") == ["Пила"]
+        assert report.added == 3
+        assert report.reasons() == {"invalid_length": 1, "duplicate": 1}
+
+    def test_add_new_movies_then_single_add(self, collector):
+        """После пакетной загрузки поштучные методы сохраняют порядок"""
+        collector.add_new_movies(["Первый", "Второй"])
+        collector.add_new_movie("Третий")
+        collector.set_movie_genre("Третий", "Драма")
+        collector.set_movie_genre("Первый", "Драма")
+        assert collector.get_movies_by_genre("Драма") == ["Первый", "Третий"]
+
     # Тесты для set_movie_genre
     def test_set_movie_genre_valid(self, collector):
         """Установка валидного жанра для существующего фильма"""
@@ -79,6 +105,12 @@ class TestMovieCollector:
         """Получение жанра для несуществующего фильма"""
         assert collector.get_movie_genre("Неизвестный") is None
 
+    def test_contains(self, collector):
+        """Проверка наличия фильма оператором in"""
+        collector.add_new_movie("Фильм")
+        assert "Фильм" in collector
+        assert "Призрак" not in collector
+
     # Тесты для get_movies_by_genre
     def test_get_movies_by_genre_exists(self, collector):
         """Получение фильмов по существующему жанру"""
@@ -96,6 +128,16 @@ class TestMovieCollector:
         assert "Комедия 2" in result
         assert "Драма" not in result
 
+    def test_get_movies_by_genre_keeps_insertion_order(self, collector):
+        """Фильмы жанра возвращаются в порядке добавления, а не назначения жанра"""
+        collector.add_new_movie("Первый")
+        collector.add_new_movie("Второй")
+        collector.set_movie_genre("Второй", "Драма")
+        collector.set_movie_genre("Первый", "Драма")
+        collector.set_movie_genre("Второй", "Комедия")
+        collector.set_movie_genre("Второй", "Драма")
+        assert collector.get_movies_by_genre("Драма") == ["Первый", "Второй"]
+
     def test_get_movies_by_genre_no_matches(self, collector):
         """Получение фильмов по жанру без совпадений"""
         collector.add_new_movie("Фильм")
@@ -141,6 +183,17 @@ class TestMovieCollector:
         collector.set_movie_genre("Боевик", "Боевик")
         assert collector.get_movies_for_children() == []
 
+    def test_get_movies_for_children_updates_on_genre_change(self, collector):
+        """Детская выборка обновляется при смене жанра и сохраняет порядок добавления"""
+        collector.add_new_movie("Первый")
+        collector.add_new_movie("Второй")
+        collector.set_movie_genre("Второй", "Комедия")
+        collector.set_movie_genre("Первый", "Драма")
+        assert collector.get_movies_for_children() == ["Первый", "Второй"]
+        collector.set_movie_genre("Первый", "Боевик")
+        assert collector.get_movies_for_children() == ["Второй"]
+        assert collector.count_movies_for_children() == 1
+
     # Тесты для работы с избранным
     def test_add_to_favorites_valid(self, collector):
         """Добавление существующего фильма в избранное"""
@@ -0,0 +1,117 @@
+import pytest
+
+from books_collector import BooksCollector
+from movie_collector import MovieCollector
+from pagination import Page, take_page
+
+
+class TestTakePage:
+
+    def test_page_and_cursor(self):
+        """Страница содержит limit названий и курсор последнего из них"""
+        pairs = [(seq, f'Фильм {seq}') for seq in range(0, 10, 2)]
+        page = take_page(iter(pairs), limit=2)
+        assert page == ['Фильм 0', 'Фильм 2']
+        assert page.cursor == 2
+        assert take_page(iter(pairs), limit=2, offset=3) == Page(['Фильм 6', 'Фильм 8'])
+
+    def test_reads_only_page(self):
+        """Из ленивой последовательности читается не больше offset + limit + 1 элементов"""
+        consumed = []
+
+        def pairs():
+            for seq in range(1000):
+                consumed.append(seq)
+                yield seq, str(seq)
+
+        take_page(pairs(), limit=5, offset=10)
+        assert len(consumed) == 16
+
+    def test_invalid_arguments(self):
+        """Недопустимые limit и offset вызывают ValueError"""
+        with pytest.raises(ValueError):
+            take_page((), limit=0)
+        with pytest.raises(ValueError):
+            take_page((), offset=-1)
+
+
+@pytest.fixture(params=['dict', 'compact', 'snapshot'])
+def movies(request, tmp_path):
+    """Фикстура создает коллекцию фильмов в каждом режиме хранения"""
+    collector = MovieCollector(compact=request.param == 'compact')
+    collector.add_new_movies([(f'Фильм {n}', 'Ужасы' if n % 3 else 'Комедия') for n in range(30)])
+    if request.param == 'snapshot':
+        path = tmp_path / 'movies.snap'
+        collector.dump_snapshot(path)
+        collector = MovieCollector()
+        collector.load_snapshot(path)
+    return collector
+
+
+class TestMoviePages:
+
+    def test_pages_cover_full_list(self, movies):
+        """Страницы по курсору в сумме дают тот же список, что get_movies_by_genre"""
+        collected = []
+        cursor = None
+        while True:
+            page = movies.get_movies_by_genre_page('Ужасы', limit=7, cursor=cursor)
+            collected.extend(page)
+            cursor = page.cursor
+            if cursor is None:
+                break
+        assert collected == movies.get_movies_by_genre('Ужасы')
+
+    def test_cursor_survives_inserts(self, movies):
+        """Курсор остается действительным после добавления фильмов"""
+        first = movies.get_movies_for_children_page(limit=5)
+        assert first == ['Фильм 0', 'Фильм 3', 'Фильм 6', 'Фильм 9', 'Фильм 12']
+        movies.add_new_movies([('Новая комедия', 'Комедия'), ('Новый ужастик', 'Ужасы')])
+        rest = movies.get_movies_for_children_page(limit=100, cursor=first.cursor)
+        assert rest == ['Фильм 15', 'Фильм 18', 'Фильм 21', 'Фильм 24', 'Фильм 27', 'Новая комедия']
+        assert rest.cursor is None
+
+    def test_offset(self, movies):
+        """offset пропускает фильмы после курсора"""
+        page = movies.get_movies_by_genre_page('Комедия', limit=2, offset=3)
+        assert page == ['Фильм 9', 'Фильм 12']
+
+    def test_lazy_iteration_and_count(self, movies):
+        """Первое совпадение и количество получаются без построения списка"""
+        assert next(movies.iter_movies_by_genre('Ужасы')) == 'Фильм 1'
+        assert next(movies.iter_movies_for_children(cursor=3)) == 'Фильм 6'
+        assert movies.count_movies_by_genre('Ужасы') == 20
+        assert movies.count_movies_by_genre('Мюзикл') == 0
+        assert list(movies.iter_movies_by_genre('Мюзикл')) == []
+        assert movies.get_movies_by_genre_page('Мюзикл') == Page([])
+
+    def test_genre_change_after_cursor(self, movies):
+        """Фильм, сменивший жанр, попадает на страницы в своей позиции"""
+        movies.set_movie_genre('Фильм 1', 'Комедия')
+        assert movies.get_movies_by_genre_page('Комедия', limit=3) == ['Фильм 0', 'Фильм 1', 'Фильм 3']
+        assert movies.get_movies_by_genre_page('Ужасы', limit=1) == ['Фильм 2']
+
+    def test_invalid_cursor(self, movies):
+        """Некорректный курсор вызывает ValueError"""
+        with pytest.raises(ValueError):
+            movies.get_movies_by_genre_page('Ужасы', cursor='abc')
+
+
+class TestBookPages:
+
+    @pytest.fixture(params=[False, True])
+    def collector(self, request):
+        """Фикстура создает коллекцию книг в обычном и компактном режиме"""
+        collector = BooksCollector(compact=request.param)
+        collector.add_new_books([(f'Книга {n}', 'Мультфильмы' if n % 2 else 'Ужасы') for n in range(10)])
+        return collector
+
+    def test_pages(self, collector):
+        """Страницы книг по жанру и детских книг"""
+        page = collector.get_books_with_specific_genre_page('Ужасы', limit=3)
+        assert page == ['Книга 0', 'Книга 2', 'Книга 4']
+        assert collector.get_books_with_specific_genre_page('Ужасы', cursor=page.cursor) == ['Книга 6', 'Книга 8']
+        assert collector.get_books_for_children_page(limit=2, cursor=5) == ['Книга 7', 'Книга 9']
+        assert collector.count_books_with_specific_genre('Мультфильмы') == 5
+        assert list(collector.iter_books_with_specific_genre('Комедии')) == []
+        assert next(collector.iter_books_for_children()) == 'Книга 1'
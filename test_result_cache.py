@@ -0,0 +1,120 @@
+import pytest
+
+from books_collector import BooksCollector
+from movie_collector import MovieCollector
+from result_cache import ResultCache
+
+
+class TestResultCache:
+
+    def test_lru_eviction(self):
+        """При переполнении вытесняется давно не использованный ключ"""
+        cache = ResultCache(maxsize=2)
+        cache.get_or_compute('а', lambda: 1)
+        cache.get_or_compute('б', lambda: 2)
+        cache.get_or_compute('а', lambda: 0)
+        cache.get_or_compute('в', lambda: 3)
+        assert len(cache) == 2
+        assert cache.get_or_compute('а', lambda: 0) == 1
+        assert cache.get_or_compute('б', lambda: 20) == 20
+        assert cache.stats()['hits'] == 2
+
+    def test_invalidate_only_affected(self):
+        """invalidate сбрасывает только указанные ключи"""
+        cache = ResultCache()
+        cache.get_or_compute('а', lambda: 1)
+        cache.get_or_compute('б', lambda: 2)
+        cache.invalidate(['а'])
+        assert cache.get_or_compute('а', lambda: 10) == 10
+        assert cache.get_or_compute('б', lambda: 20) == 2
+        assert cache.stats()['invalidations'] == 1
+
+    def test_stale_result_not_stored(self):
+        """Результат, вычисленный до сброса ключа, в кеш не попадает"""
+        cache = ResultCache()
+
+        def compute():
+            cache.invalidate(['а'])
+            return 'устарело'
+
+        assert cache.get_or_compute('а', compute) == 'устарело'
+        assert cache.get_or_compute('а', lambda: 'свежее') == 'свежее'
+
+    def test_clear(self):
+        """clear сбрасывает все ключи"""
+        cache = ResultCache()
+        cache.get_or_compute('а', lambda: 1)
+        cache.clear()
+        assert cache.get_or_compute('а', lambda: 2) == 2
+
+    def test_invalid_size(self):
+        """Размер кеша должен быть положительным"""
+        with pytest.raises(ValueError):
+            ResultCache(0)
+
+
+class TestCollectorCache:
+
+    @pytest.fixture(params=[False, True])
+    def movies(self, request):
+        """Фикстура создает коллекцию фильмов с включенным кешем"""
+        collector = MovieCollector(compact=request.param, cache_size=16)
+        collector.add_new_movies([('Шрек', 'Комедия'), ('Пила', 'Ужасы'), ('Маска', 'Комедия')])
+        return collector
+
+    def test_hits_and_copies(self, movies):
+        """Повторные запросы обслуживаются кешем, вызывающий получает копию"""
+        first = movies.get_movies_by_genre('Комедия')
+        first.append('Испорчено')
+        assert movies.get_movies_by_genre('Комедия') == ['Шрек', 'Маска']
+        assert movies.get_movies_for_children() == ['Шрек', 'Маска']
+        stats = movies.cache_stats()
+        assert (stats['hits'], stats['misses']) == (1, 2)
+
+    def test_set_genre_invalidates_affected(self, movies):
+        """Смена жанра сбрасывает выборки старого и нового жанра и детскую"""
+        movies.get_movies_by_genre('Комедия')
+        movies.get_movies_by_genre('Ужасы')
+        movies.get_movies_by_genre('Драма')
+        movies.get_movies_for_children()
+        movies.set_movie_genre('Шрек', 'Ужасы')
+        assert movies.get_movies_by_genre('Комедия') == ['Маска']
+        assert movies.get_movies_by_genre('Ужасы') == ['Шрек', 'Пила']
+        assert movies.get_movies_for_children() == ['Маска']
+        assert movies.get_movies_by_genre('Драма') == []
+        stats = movies.cache_stats()
+        assert stats['invalidations'] == 3
+        assert stats['hits'] == 1
+
+    def test_adds_invalidate_only_their_genres(self, movies):
+        """Добавление без жанра ничего не сбрасывает, пакет - только свои жанры"""
+        movies.get_movies_by_genre('Комедия')
+        movies.get_movies_by_genre('Ужасы')
+        movies.get_movies_for_children()
+        movies.add_new_movie('Без жанра')
+        movies.add_new_movies([('Чужой', 'Ужасы')])
+        assert movies.get_movies_by_genre('Комедия') == ['Шрек', 'Маска']
+        assert movies.get_movies_for_children() == ['Шрек', 'Маска']
+        assert movies.get_movies_by_genre('Ужасы') == ['Пила', 'Чужой']
+        assert movies.cache_stats()['hits'] == 2
+
+    def test_replace_clears(self, movies, tmp_path):
+        """Замена словаря и загрузка снимка сбрасывают весь кеш"""
+        movies.get_movies_by_genre('Комедия')
+        movies.movies_genre = {'Маска': 'Комедия'}
+        assert movies.get_movies_by_genre('Комедия') == ['Маска']
+        path = tmp_path / 'movies.snap'
+        MovieCollector().dump_snapshot(path)
+        movies.load_snapshot(path)
+        assert movies.get_movies_by_genre('Комедия') == []
+
+    def test_disabled_by_default(self):
+        """Без cache_size кеш выключен"""
+        collector = BooksCollector()
+        assert collector.cache_stats() is None
+        collector = BooksCollector(cache_size=4)
+        collector.add_new_books([('Дюна', 'Фантастика'), ('Оно', 'Ужасы')])
+        assert collector.get_books_with_specific_genre('Фантастика') == ['Дюна']
+        assert collector.get_books_for_children() == ['Дюна']
+        collector.set_book_genre('Оно', 'Мультфильмы')
+        assert collector.get_books_for_children() == ['Дюна', 'Оно']
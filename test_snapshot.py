@@ -0,0 +1,115 @@
+import pytest
+
+from books_collector import BooksCollector
+from movie_collector import MovieCollector
+from snapshot import MappedTitleStore, write_snapshot
+
+
+class TestSnapshot:
+
+    @pytest.fixture
+    def movies(self):
+        """Фикстура создает коллекцию фильмов с жанрами и избранным"""
+        collector = MovieCollector()
+        collector.add_new_movies([('Пила', 'Ужасы'), 'Без жанра', ('Шрек', 'Комедия'),
+                                  ('Матрица', 'Фантастика'), ('Рэмбо', 'Боевик')])
+        collector.add_movie_to_favorites('Матрица')
+        collector.add_movie_to_favorites('Пила')
+        return collector
+
+    @pytest.fixture
+    def mapped(self, movies, tmp_path):
+        """Фикстура открывает снимок коллекции фильмов через mmap"""
+        path = tmp_path / 'movies.snap'
+        movies.dump_snapshot(path)
+        collector = MovieCollector()
+        collector.load_snapshot(path)
+        return collector
+
+    def test_reads_from_mapped_snapshot(self, movies, mapped):
+        """Все методы чтения отвечают так же, как исходная коллекция"""
+        assert mapped.get_movie_genre('Шрек') == 'Комедия'
+        assert mapped.get_movie_genre('Без жанра') == ''
+        assert mapped.get_movie_genre('Призрак') is None
+        assert mapped.get_movies_by_genre('Ужасы') == ['Пила']
+        assert mapped.get_movies_by_genre('Мюзикл') == []
+        assert mapped.get_movies_for_children() == ['Шрек', 'Матрица']
+        assert mapped.count_movies_for_children() == 2
+        assert mapped.get_favorites_movies() == ['Матрица', 'Пила']
+        assert mapped.get_all_movies() == movies.get_all_movies()
+
+    def test_store_is_read_only_until_write(self, mapped):
+        """Снимок остается в mmap до первого изменения коллекции"""
+        assert isinstance(mapped._store, MappedTitleStore)
+        mapped.add_movie_to_favorites('Шрек')
+        assert isinstance(mapped._store, MappedTitleStore)
+        mapped.set_movie_genre('Без жанра', 'Драма')
+        assert not mapped._store.read_only
+        assert mapped.get_movies_for_children() == ['Без жанра', 'Шрек', 'Матрица']
+        assert mapped.get_favorites_movies() == ['Матрица', 'Пила', 'Шрек']
+
+    def test_add_after_load(self, mapped):
+        """Добавление после загрузки снимка сохраняет старые данные и правила"""
+        mapped.add_new_movie('Шрек')
+        mapped.add_new_movie('Новый')
+        assert list(mapped.get_all_movies())[-1] == 'Новый'
+        assert mapped.get_movie_genre('Шрек') == 'Комедия'
+
+    def test_favorites_bitmap(self, movies, tmp_path):
+        """Битовая карта избранного доступна без материализации списка"""
+        path = tmp_path / 'movies.snap'
+        movies.dump_snapshot(path)
+        store = MappedTitleStore(path, bool)
+        assert store.is_favorite('Пила')
+        assert not store.is_favorite('Шрек')
+        assert not store.is_favorite('Призрак')
+
+    def test_favorites_served_from_bitmap(self, mapped):
+        """Проверка избранного у загруженного снимка читает битовую карту, изменение - копирует"""
+        favorites = mapped.favorites
+        assert 'Пила' in favorites and 'Шрек' not in favorites and None not in favorites
+        assert favorites._copy is None
+        mapped.remove_movie_from_favorites('Пила')
+        assert mapped.get_favorites_movies() == ['Матрица']
+        assert isinstance(mapped._store, MappedTitleStore)
+
+    def test_favorites_outside_catalog_skipped(self, movies, tmp_path):
+        """Избранное с названием не из коллекции сохраняется без него"""
+        movies.favorites = ['Матрица', 'Другой фильм']
+        path = tmp_path / 'movies.snap'
+        movies.dump_snapshot(path)
+        restored = MovieCollector()
+        restored.load_snapshot(path)
+        assert restored.get_favorites_movies() == ['Матрица']
+
+    def test_books_snapshot(self, tmp_path):
+        """Снимок работает и для книг, включая жанр вне списка допустимых"""
+        books = BooksCollector()
+        books.books_genre = {'Мультик': 'Мультфильмы', 'Детектив': 'Детективы', 'Странная': 'Боевик'}
+        books.add_book_in_favorites('Детектив')
+        path = tmp_path / 'books.snap'
+        books.dump_snapshot(path)
+        restored = BooksCollector()
+        restored.load_snapshot(path)
+        assert restored.get_books_genre() == books.get_books_genre()
+        assert restored.get_books_for_children() == ['Мультик']
+        assert restored.get_books_with_specific_genre('Детективы') == ['Детектив']
+        assert restored.get_list_of_favorites_books() == ['Детектив']
+
+    def test_many_titles(self, tmp_path):
+        """Поиск по хеш-таблице снимка находит каждое название"""
+        names = [f'Фильм {number}' for number in range(5000)]
+        path = tmp_path / 'big.snap'
+        write_snapshot(path, ((name, '') for name in names), names[::1000])
+        store = MappedTitleStore(path, bool)
+        assert len(store) == 5000
+        assert all(name in store for name in names)
+        assert 'Фильм 5000' not in store
+        assert list(store.favorites()) == names[::1000]
+
+    def test_not_a_snapshot(self, tmp_path):
+        """Файл другого формата не открывается"""
+        path = tmp_path / 'other.bin'
+        path.write_bytes(b'\0' * 128)
+        with pytest.raises(ValueError):
+            MappedTitleStore(path, bool)
@@ -0,0 +1,167 @@
+import sqlite3
+import threading
+
+import pytest
+
+from books_collector import BooksCollector
+from movie_collector import MovieCollector
+from sqlite_store import SqliteTitleStore
+
+
+def fill(collector):
+    """Одинаковая последовательность операций для сравнения хранилищ"""
+    collector.add_new_movie('Шрек')
+    collector.add_new_movie('')
+    collector.add_new_movies([('Пила', 'Ужасы'), ('Матрица', 'Фантастика'), ('Шрек', 'Драма'), 'Без жанра'])
+    collector.set_movie_genre('Шрек', 'Комедия')
+    collector.set_movie_genre('Матрица', 'Мюзикл')
+    collector.add_movie_to_favorites('Пила')
+    collector.add_movie_to_favorites('Шрек')
+    collector.add_movie_to_favorites('Призрак')
+    collector.remove_movie_from_favorites('Пила')
+
+
+class TestSqliteStore:
+
+    @pytest.fixture
+    def database(self, tmp_path):
+        """Фикстура возвращает путь к файлу базы"""
+        return tmp_path / 'movies.db'
+
+    def test_same_answers_as_dict_store(self, database):
+        """Публичные методы отвечают так же, как со словарем в памяти"""
+        expected = MovieCollector()
+        actual = MovieCollector(database=database)
+        for collector in (expected, actual):
+            fill(collector)
+        assert actual.get_all_movies() == expected.get_all_movies()
+        assert actual.get_movies_by_genre('Комедия') == expected.get_movies_by_genre('Комедия')
+        assert actual.get_movies_for_children() == expected.get_movies_for_children()
+        assert actual.count_movies_for_children() == expected.count_movies_for_children()
+        assert actual.get_favorites_movies() == expected.get_favorites_movies()
+        assert actual.get_movie_genre('Призрак') is None
+        assert 'Без жанра' in actual and 'Призрак' not in actual
+        assert actual.get_movies_by_genre_page('Ужасы') == expected.get_movies_by_genre_page('Ужасы')
+        assert actual.search_movies('ш') == expected.search_movies('ш')
+        assert actual.find_movies('Комедия OR Ужасы') == expected.find_movies('Комедия OR Ужасы')
+        assert actual.changes_since(2).titles == expected.changes_since(2).titles
+        actual.close()
+
+    def test_persistence(self, database):
+        """Содержимое и избранное переживают повторное открытие базы"""
+        collector = BooksCollector(database=database)
+        collector.add_new_books([('Дюна', 'Фантастика'), ('Оно', 'Ужасы')])
+        collector.add_book_in_favorites('Оно')
+        collector.add_book_in_favorites('Дюна')
+        collector.close()
+        reopened = BooksCollector(database=database)
+        assert reopened.get_books_genre() == {'Дюна': 'Фантастика', 'Оно': 'Ужасы'}
+        assert reopened.get_list_of_favorites_books() == ['Оно', 'Дюна']
+        assert reopened.get_books_for_children() == ['Дюна']
+        version = reopened.version
+        reopened.add_new_book('Солярис')
+        assert reopened.changes_since(version).titles == {'Солярис': ''}
+        reopened.close()
+
+    def test_multiple_genres_persist(self, database):
+        """Жанры set_genres переживают повторное открытие, set_genre их заменяет"""
+        collector = MovieCollector(database=database)
+        collector.add_new_movies(['Икс', 'Игрек'])
+        collector.set_movie_genres('Икс', ['Драма', 'Комедия'])
+        collector.close()
+        reopened = MovieCollector(database=database)
+        assert reopened.get_movie_genres('Икс') == ['Драма', 'Комедия']
+        assert reopened.count_movies_matching('Драма AND Комедия') == 1
+        reopened.set_movie_genre('Икс', 'Ужасы')
+        reopened.close()
+        reopened = MovieCollector(database=database)
+        assert reopened.get_movie_genres('Икс') == ['Ужасы']
+        assert reopened.get_movie_genres('Игрек') == []
+        assert reopened.count_movies_matching('Драма') == 0
+        reopened.close()
+
+    def test_versions_continue_after_reopen(self, database):
+        """После повторного открытия версии растут дальше, а старые требуют полной выгрузки"""
+        collector = MovieCollector(database=database)
+        collector.add_new_movie('Шрек')
+        synced = collector.changes_since(0).version
+        collector.add_new_movie('Пила')
+        collector.close()
+        reopened = MovieCollector(database=database)
+        assert reopened.version > synced
+        assert reopened.changes_since(synced).full
+        assert reopened.changes_since(0).full
+        reopened.close()
+
+    def test_reopen_does_not_rewrite_rows(self, database):
+        """При открытии переписываются только строки, у которых изменился признак детской выборки"""
+        SqliteTitleStore(bool, database, {'А': 'Драма', 'Б': ''}).close()
+        store = SqliteTitleStore(bool, database)
+        assert store._pool._writer.total_changes == 0
+        store.close()
+        store = SqliteTitleStore(lambda genre: genre == '', database)
+        assert store._pool._writer.total_changes == 2
+        assert store.children() == ['Б']
+        store.close()
+
+    def test_assignments_replace_content(self, database):
+        """Присваивание словаря и избранного заменяет содержимое базы"""
+        collector = BooksCollector(database=database)
+        collector.add_new_book('Старая')
+        collector.books_genre = {'Книга': 'Фантастика'}
+        collector.favorites = ['Избранная1', 'Избранная2', 'Избранная1']
+        assert collector.get_books_genre() == {'Книга': 'Фантастика'}
+        assert collector.get_list_of_favorites_books() == ['Избранная1', 'Избранная2']
+        assert collector.favorites[-1] == 'Избранная2'
+        collector.close()
+
+    def test_snapshot_round_trip(self, database, tmp_path):
+        """Снимок загружается в коллекцию с базой, первая запись переносит его в базу"""
+        source = MovieCollector()
+        fill(source)
+        path = tmp_path / 'movies.snap'
+        source.dump_snapshot(path)
+        collector = MovieCollector(database=database)
+        collector.load_snapshot(path)
+        collector.add_new_movie('Новый')
+        collector.close()
+        reopened = MovieCollector(database=database)
+        assert list(reopened.get_all_movies()) == list(source.get_all_movies()) + ['Новый']
+        assert reopened.get_favorites_movies() == ['Шрек']
+        reopened.close()
+
+    def test_wal_and_indexes(self, database):
+        """База в режиме WAL, выборки по жанру и детские идут по индексам"""
+        store = SqliteTitleStore(bool, database)
+        connection = sqlite3.connect(database)
+        assert connection.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+        plan = connection.execute('EXPLAIN QUERY PLAN SELECT name FROM titles WHERE genre = ? ORDER BY seq',
+                                  ('Драма',)).fetchall()
+        assert 'titles_genre' in str(plan)
+        plan = connection.execute('EXPLAIN QUERY PLAN SELECT name FROM titles WHERE children = 1 ORDER BY seq'
+                                  ).fetchall()
+        assert 'titles_children' in str(plan)
+        connection.close()
+        store.close()
+
+    def test_parallel_readers(self, database):
+        """Параллельные читатели из разных потоков видят согласованные данные"""
+        collector = MovieCollector(database=database)
+        collector.add_new_movies((f'Фильм {number}', 'Драма') for number in range(500))
+        errors = []
+
+        def read():
+            try:
+                for _ in range(50):
+                    assert len(collector.get_movies_by_genre('Драма')) == 500
+                    assert collector.get_movie_genre('Фильм 7') == 'Драма'
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=read) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert errors == []
+        collector.close()
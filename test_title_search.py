@@ -0,0 +1,107 @@
+import random
+
+import pytest
+
+from books_collector import BooksCollector
+from movie_collector import MovieCollector
+from title_search import TitleSearchIndex, fold
+
+
+class TestTitleSearchIndex:
+
+    @pytest.fixture
+    def index(self):
+        """Фикстура создает индекс по нескольким кириллическим названиям"""
+        return TitleSearchIndex(['Матрица', 'матрешка', 'Мастер и Маргарита', 'Ёлки', 'Аватар'])
+
+    def test_fold(self):
+        """Свертка приводит к нижнему регистру и заменяет ё на е"""
+        assert fold('ЁЛКИ Ёж') == 'елки еж'
+
+    def test_prefix_case_insensitive(self, index):
+        """Префиксный поиск не зависит от регистра, результат в алфавитном порядке"""
+        assert index.prefix('МАТ') == ['матрешка', 'Матрица']
+        assert index.prefix('ма') == ['Мастер и Маргарита', 'матрешка', 'Матрица']
+        assert index.prefix('елк') == ['Ёлки']
+        assert index.prefix('Я') == []
+
+    def test_prefix_pagination(self, index):
+        """Префиксный поиск поддерживает limit и offset"""
+        assert index.prefix('ма', limit=2) == ['Мастер и Маргарита', 'матрешка']
+        assert index.prefix('ма', limit=2, offset=2) == ['Матрица']
+        assert index.prefix('ма', limit=2, offset=5) == []
+
+    def test_substring(self, index):
+        """Поиск подстроки возвращает названия в порядке добавления"""
+        assert index.substring('ТР') == ['Матрица', 'матрешка']
+        assert index.substring('тар') == ['Аватар']
+        assert index.substring('маргарит') == ['Мастер и Маргарита']
+        assert index.substring('ритм') == []
+        assert index.substring('а', limit=2, offset=1) == ['матрешка', 'Мастер и Маргарита']
+
+    def test_incremental_add(self, index):
+        """Добавленные названия сразу участвуют в поиске"""
+        index.add('Матильда')
+        index.add_many(['Мать', 'Амати'])
+        assert index.prefix('мат') == ['Матильда', 'матрешка', 'Матрица', 'Мать']
+        assert index.substring('мати') == ['Матильда', 'Амати']
+        assert len(index) == 8
+
+    def test_short_substring(self, index):
+        """Запрос короче триграммы находит названия любой длины без повторов"""
+        index.add_many(['Ма', 'Я'])
+        assert index.substring('ма') == ['Матрица', 'матрешка', 'Мастер и Маргарита', 'Ма']
+        assert index.substring('Я') == ['Я']
+        assert index.substring('е', limit=2) == ['матрешка', 'Мастер и Маргарита']
+        assert index.substring('щ') == []
+        assert index.substring('') == index.substring('', limit=None)
+        assert len(index.substring('')) == 7
+
+    def test_blocks_match_sorted_model(self, monkeypatch):
+        """Вставки по одному и пакетами с маленькими блоками дают тот же порядок, что сортировка"""
+        monkeypatch.setattr(TitleSearchIndex, 'BLOCK_SIZE', 3)
+        rng = random.Random(5)
+        names = [''.join(rng.choice('абвг') for _ in range(rng.randrange(1, 6))) + str(n) for n in range(300)]
+        index = TitleSearchIndex(names[:10])
+        for name in names[10:100]:
+            index.add(name)
+        index.add_many(names[100:110])
+        index.add_many(names[110:])
+        for query in ('', 'а', 'аб', 'вг', 'г1'):
+            expected = [name for name in sorted(names, key=lambda name: (fold(name), names.index(name)))
+                        if fold(name).startswith(query)]
+            assert index.prefix(query) == expected
+            assert index.substring(query) == [name for name in names if query in fold(name)]
+
+
+class TestCollectorSearch:
+
+    def test_search_movies(self):
+        """Поиск фильмов учитывает добавления после построения индекса"""
+        collector = MovieCollector()
+        collector.add_new_movies(['Матрица', 'Мастер', 'Аватар'])
+        assert collector.search_movies('мат') == ['Матрица']
+        collector.add_new_movie('Матрица: Перезагрузка')
+        collector.add_new_movies(['Матрешка'])
+        assert collector.search_movies('мат') == ['Матрешка', 'Матрица', 'Матрица: Перезагрузка']
+        assert collector.search_movies('зАгРуз', substring=True) == ['Матрица: Перезагрузка']
+        assert collector.search_movies('мат', limit=1, offset=1) == ['Матрица']
+
+    def test_search_books_after_replace(self):
+        """После замены словаря книг индекс строится заново"""
+        collector = BooksCollector()
+        collector.add_new_book('Старая книга')
+        assert collector.search_books('стар') == ['Старая книга']
+        collector.books_genre = {'Новая книга': ''}
+        assert collector.search_books('стар') == []
+        assert collector.search_books('книга', substring=True) == ['Новая книга']
+
+    def test_search_snapshot(self, tmp_path):
+        """Поиск работает по коллекции, загруженной из снимка"""
+        source = MovieCollector()
+        source.add_new_movies(['Ёжик в тумане', 'Шрек'])
+        path = tmp_path / 'movies.snap'
+        source.dump_snapshot(path)
+        collector = MovieCollector()
+        collector.load_snapshot(path)
+        assert collector.search_movies('еж') == ['Ёжик в тумане']
@@ -0,0 +1,111 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from books_collector import BooksCollector
+from movie_collector import MovieCollector
+from user_favorites import UserFavorites
+
+
+class TestUserFavorites:
+
+    @pytest.fixture
+    def movies(self):
+        """Фикстура создает коллекцию из ста фильмов"""
+        collector = MovieCollector()
+        collector.add_new_movies([f'Фильм {number}' for number in range(100)])
+        return collector
+
+    @pytest.fixture
+    def favorites(self, movies):
+        """Фикстура создает избранное пользователей и удаляет его файлы после теста"""
+        with UserFavorites(movies, shards=3) as favorites:
+            yield favorites
+
+    def test_per_user_semantics(self, favorites):
+        """Избранное каждого пользователя независимо и повторяет правила коллекции"""
+        favorites.add_to_favorites('anna', 'Фильм 1')
+        favorites.add_to_favorites('anna', 'Фильм 1')
+        favorites.add_to_favorites('anna', 'Призрак')
+        favorites.add_to_favorites('boris', 'Фильм 2')
+        assert favorites.get_favorites('anna') == ['Фильм 1']
+        assert favorites.get_favorites('boris') == ['Фильм 2']
+        assert favorites.get_favorites('nobody') == []
+        favorites.remove_from_favorites('anna', 'Фильм 1')
+        favorites.remove_from_favorites('anna', 'Фильм 99')
+        favorites.remove_from_favorites('nobody', 'Фильм 1')
+        assert favorites.get_favorites('anna') == []
+
+    def test_cross_user_queries(self, favorites):
+        """Подсчет пользователей по названиям и список пользователей названия"""
+        for user in range(500):
+            favorites.add_to_favorites(user, 'Фильм 0')
+            if user % 5 == 0:
+                favorites.add_to_favorites(user, 'Фильм 3')
+        favorites.remove_from_favorites(10, 'Фильм 3')
+        assert favorites.count_users(['Фильм 0', 'Фильм 3', 'Фильм 4', 'Призрак']) == {
+            'Фильм 0': 500, 'Фильм 3': 99, 'Фильм 4': 0, 'Призрак': 0,
+        }
+        assert sorted(favorites.users_with_favorite('Фильм 3')) == [user for user in range(0, 500, 5)
+                                                                     if user != 10]
+        assert favorites.users_with_favorite('Призрак') == []
+
+    def test_columns_grow_beyond_initial_width(self, favorites):
+        """Таблица названий расширяется без потери уже отмеченных битов"""
+        for number in range(100):
+            favorites.add_to_favorites('anna', f'Фильм {number}')
+        favorites.add_to_favorites('boris', 'Фильм 99')
+        assert favorites.get_favorites('anna') == [f'Фильм {number}' for number in range(100)]
+        assert favorites.count_users(['Фильм 99', 'Фильм 0']) == {'Фильм 99': 2, 'Фильм 0': 1}
+
+    def test_user_insertion_order(self, favorites):
+        """Избранное пользователя идет в порядке его добавлений, а не в порядке таблицы названий"""
+        favorites.add_to_favorites('boris', 'Фильм 1')
+        favorites.add_to_favorites('boris', 'Фильм 5')
+        favorites.add_to_favorites('anna', 'Фильм 5')
+        favorites.add_to_favorites('anna', 'Фильм 1')
+        favorites.add_to_favorites('anna', 'Фильм 7')
+        assert favorites.get_favorites('anna') == ['Фильм 5', 'Фильм 1', 'Фильм 7']
+        favorites.remove_from_favorites('anna', 'Фильм 5')
+        favorites.add_to_favorites('anna', 'Фильм 5')
+        assert favorites.get_favorites('anna') == ['Фильм 1', 'Фильм 7', 'Фильм 5']
+
+    def test_new_columns_do_not_rewrite_rows(self, favorites):
+        """Расширение таблицы названий добавляет сегмент, не переписывая файлы с уже отмеченными битами"""
+        for user in range(200):
+            favorites.add_to_favorites(user, 'Фильм 0')
+        first_segments = [shard.segments[0] for shard in favorites._shards]
+        for number in range(1, 100):
+            favorites.add_to_favorites(0, f'Фильм {number}')
+        assert [shard.segments[0] for shard in favorites._shards] == first_segments
+        assert all(len(shard.segments) == 2 for shard in favorites._shards)
+        assert favorites.count_users(['Фильм 0', 'Фильм 99']) == {'Фильм 0': 200, 'Фильм 99': 1}
+        assert favorites.users_with_favorite('Фильм 99') == [0]
+
+    def test_queries_without_executor_read_own_maps(self, favorites, monkeypatch):
+        """Без executor запросы читают отображения процесса, не открывая файлы сегментов"""
+        def reopen(*args):
+            raise AssertionError('файл сегмента открыт заново')
+
+        monkeypatch.setattr('user_favorites._in_file', reopen)
+        favorites.add_to_favorites('anna', 'Фильм 1')
+        favorites.add_to_favorites('boris', 'Фильм 1')
+        assert favorites.count_users(['Фильм 1']) == {'Фильм 1': 2}
+        assert sorted(favorites.users_with_favorite('Фильм 1')) == ['anna', 'boris']
+
+    def test_process_pool(self, movies):
+        """Запросы по шардам выполняются в пуле процессов"""
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            with UserFavorites(movies, shards=4, executor=executor) as favorites:
+                for user in range(200):
+                    favorites.add_to_favorites(f'user{user}', f'Фильм {user % 7}')
+                assert favorites.count_users(['Фильм 0', 'Фильм 6']) == {'Фильм 0': 29, 'Фильм 6': 28}
+                assert len(favorites.users_with_favorite('Фильм 1')) == 29
+
+    def test_books_collector(self):
+        """Избранное пользователей работает и поверх коллекции книг"""
+        books = BooksCollector()
+        books.add_new_book('Книга')
+        with UserFavorites(books) as favorites:
+            favorites.add_to_favorites('anna', 'Книга')
+            assert favorites.count_users(['Книга']) == {'Книга': 1}
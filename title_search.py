@@ -0,0 +1,153 @@
+from bisect import bisect_left, insort
+from heapq import merge
+from itertools import chain, islice, takewhile
+
+
+def fold(text):
+    """
+    Приводит название к виду для поиска без учета регистра.
+    casefold() работает для любых алфавитов, 'ё' дополнительно приравнивается к 'е'.
+    """
+    return text.casefold().replace('ё', 'е')
+
+
+class TitleSearchIndex:
+    """
+    Индекс поиска по названиям.
+    - Префиксный поиск: пары (свернутое_название, номер) по возрастанию,
+      разбитые на блоки не длиннее 2 * BLOCK_SIZE, и bisect по последним парам
+      блоков - O(log n + размер страницы); добавление меняет один блок - O(log n + BLOCK_SIZE)
+    - Поиск подстроки: списки вхождений n-грамм (по умолчанию триграмм);
+      кандидаты берутся из самого короткого списка и проверяются по
+      свернутому названию, перебор останавливается на заполненной странице
+    - Запрос короче n-граммы: кандидаты - слияние списков вхождений n-грамм,
+      содержащих запрос, и названий короче n-граммы; каждый кандидат
+      подходит, поэтому стоимость - O(числа таких n-грамм + размер страницы)
+    Индекс только растет: названия из коллекций не удаляются.
+    """
+
+    BLOCK_SIZE = 1000
+
+    def __init__(self, names=(), ngram=3):
+        self._ngram = ngram
+        self._names = []  # Номер -> название
+        self._folded = []  # Номер -> свернутое название
+        self._blocks = []  # Блоки пар (свернутое название, номер), по возрастанию
+        self._maxes = []  # Последняя пара каждого блока
+        self._postings = {}  # n-грамма -> номера названий по возрастанию
+        self._grams_by_part = {}  # Подстрока короче n-граммы -> n-граммы, которые ее содержат
+        self._short = []  # Номера названий короче n-граммы (у них нет n-грамм)
+        self.add_many(names)
+
+    def __len__(self):
+        return len(self._names)
+
+    def add(self, name):
+        self._insert(self._append(name))
+
+    def add_many(self, names):
+        pairs = [self._append(name) for name in names]
+        if len(pairs) <= self.BLOCK_SIZE:
+            for pair in pairs:
+                self._insert(pair)
+            return
+        # Большой пакет: блоки собираются заново,
+        # Timsort сливает уже отсортированную часть с новой за O(n + k log k)
+        pairs[:0] = chain.from_iterable(self._blocks)
+        pairs.sort()
+        size = self.BLOCK_SIZE
+        self._blocks = [pairs[start:start + size] for start in range(0, len(pairs), size)]
+        self._maxes = [block[-1] for block in self._blocks]
+
+    def _insert(self, pair):
+        blocks, maxes = self._blocks, self._maxes
+        if not blocks:
+            blocks.append([pair])
+            maxes.append(pair)
+            return
+        block = min(bisect_left(maxes, pair), len(blocks) - 1)
+        insort(blocks[block], pair)
+        maxes[block] = blocks[block][-1]
+        if len(blocks[block]) > 2 * self.BLOCK_SIZE:
+            half = self.BLOCK_SIZE
+            pairs = blocks[block]
+            blocks.insert(block + 1, pairs[half:])
+            del pairs[half:]
+            maxes.insert(block, pairs[-1])
+
+    def _append(self, name):
+        seq = len(self._names)
+        folded = fold(name)
+        self._names.append(name)
+        self._folded.append(folded)
+        size = self._ngram
+        if len(folded) < size:
+            self._short.append(seq)
+        for gram in {folded[start:start + size] for start in range(len(folded) - size + 1)}:
+            postings = self._postings.get(gram)
+            if postings is None:
+                self._postings[gram] = [seq]
+                self._add_parts(gram)
+            else:
+                postings.append(seq)
+        return folded, seq
+
+    def _add_parts(self, gram):
+        # Новая n-грамма: запоминается для всех своих подстрок короче n-граммы
+        parts = {gram[start:start + length] for length in range(1, len(gram))
+                 for start in range(len(gram) - length + 1)}
+        for part in parts:
+            grams = self._grams_by_part.get(part)
+            if grams is None:
+                self._grams_by_part[part] = [gram]
+            else:
+                grams.append(gram)
+
+    def prefix(self, query, limit=None, offset=0):
+        """Названия, начинающиеся с query, в алфавитном порядке свернутых названий."""
+        query = fold(query)
+        key = (query,)
+        block = bisect_left(self._maxes, key)
+        if block == len(self._blocks):
+            return []
+        start = bisect_left(self._blocks[block], key)
+        pairs = chain(islice(self._blocks[block], start, None),
+                      chain.from_iterable(islice(self._blocks, block + 1, None)))
+        in_prefix = takewhile(lambda pair: pair[0].startswith(query), pairs)
+        return self._page((self._names[seq] for _, seq in in_prefix), limit, offset)
+
+    def substring(self, query, limit=None, offset=0):
+        """Названия, содержащие query, в порядке добавления в коллекцию."""
+        query = fold(query)
+        folded = self._folded
+        if not query:
+            candidates = range(len(folded))
+        elif len(query) < self._ngram:
+            candidates = self._short_candidates(query)
+        else:
+            size = self._ngram
+            grams = {query[start:start + size] for start in range(len(query) - size + 1)}
+            lists = [self._postings.get(gram) for gram in grams]
+            if not all(lists):
+                return []
+            candidates = min(lists, key=len)
+        matches = (self._names[seq] for seq in candidates if query in folded[seq])
+        return self._page(matches, limit, offset)
+
+    def _short_candidates(self, query):
+        # Название длиной не меньше n-граммы содержит запрос короче нее, только
+        # если его содержит одна из n-грамм названия: номера берутся слиянием
+        # их списков вхождений (по возрастанию, без повторов)
+        postings = self._postings
+        lists = [postings[gram] for gram in self._grams_by_part.get(query, ())]
+        lists.append(self._short)
+        previous = -1
+        for seq in merge(*lists):
+            if seq != previous:
+                previous = seq
+                yield seq
+
+    @staticmethod
+    def _page(matches, limit, offset):
+        stop = None if limit is None else offset + limit
+        return list(islice(matches, offset, stop))
@@ -0,0 +1,164 @@
+from types import MappingProxyType
+
+from indexes import GenreIndex, TitleBucket
+
+
+class DictTitleStore:
+    """
+    Хранилище по умолчанию: словарь название -> жанр и индексы к нему.
+    - Индекс жанр -> названия
+    - Детская выборка (названия, для жанра которых is_for_children истинно)
+    Проверку правил (длина названия, допустимость жанра) выполняет коллекция,
+    хранилище только сохраняет данные и поддерживает индексы.
+    """
+
+    read_only = False
+
+    def __init__(self, is_for_children, mapping=None):
+        self._is_for_children = is_for_children
+        self.replace({} if mapping is None else mapping)
+
+    def replace(self, mapping):
+        """Заменяет содержимое словарем mapping и пересобирает индексы."""
+        self._mapping = mapping
+        self._names = list(mapping)  # Порядковый номер -> название
+        self._genre_index = GenreIndex()
+        self._genre_index.rebuild(mapping)
+        self._children = TitleBucket()
+        for name, genre in mapping.items():
+            self._update_children(name, genre)
+
+    def mapping(self):
+        return self._mapping
+
+    def items(self):
+        return self._mapping.items()
+
+    def items_from(self, position):
+        """Пары (название, жанр), начиная с position в порядке добавления - O(n - position)."""
+        mapping = self._mapping
+        return [(name, mapping[name]) for name in self._names[max(position, 0):]]
+
+    def get(self, name):
+        return self._mapping.get(name)
+
+    def __contains__(self, name):
+        return name in self._mapping
+
+    def __len__(self):
+        return len(self._mapping)
+
+    def position(self, name):
+        """Порядковый номер названия (его место в порядке добавления)."""
+        return self._genre_index.position(name)
+
+    def name_at(self, position):
+        return self._names[position]
+
+    def add(self, name):
+        self._genre_index.add_title(name)
+        self._mapping[name] = ''
+        self._names.append(name)
+
+    def add_many(self, titles):
+        """Добавляет новые названия: titles - словарь {название: жанр}."""
+        self._genre_index.add_titles(titles.items())
+        self._mapping.update(titles)
+        self._names.extend(titles)
+        for name, genre in titles.items():
+            if genre:
+                self._update_children(name, genre)
+
+    def set_genre(self, name, genre):
+        self._genre_index.set_genre(name, self._mapping[name], genre)
+        self._mapping[name] = genre
+        self._update_children(name, genre)
+
+    def titles(self, genre):
+        return self._genre_index.titles(genre)
+
+    def iter_titles(self, genre, after=-1):
+        return self._genre_index.iter_titles(genre, after)
+
+    def count(self, genre):
+        return self._genre_index.count(genre)
+
+    def children(self):
+        return list(self._children)
+
+    def iter_children(self, after=-1):
+        return self._children.iter_after(after)
+
+    def children_count(self):
+        return len(self._children)
+
+    def favorites(self):
+        """Избранное, сохраненное вместе с данными (у словаря его нет)."""
+        return ()
+
+    def _update_children(self, name, genre):
+        if self._is_for_children(genre):
+            self._children.add(name, self._genre_index.position(name))
+        else:
+            self._children.discard(name)
+
+
+class EmptyTitleStore:
+    """
+    Пустое хранилище только для чтения, общее для всех новых коллекций.
+    Коллекция создает настоящее хранилище с индексами только при первой
+    записи (через _writable_store, как для снимка), поэтому конструктор
+    ничего не выделяет.
+    """
+
+    read_only = True
+
+    def mapping(self):
+        # Общее неизменяемое значение: запись в него - TypeError, а не потерянное изменение
+        return _EMPTY_MAPPING
+
+    def items(self):
+        return ()
+
+    def items_from(self, position):
+        return []
+
+    def get(self, name):
+        return None
+
+    def __contains__(self, name):
+        return False
+
+    def __len__(self):
+        return 0
+
+    def position(self, name):
+        return -1
+
+    def name_at(self, position):
+        raise IndexError(position)
+
+    def titles(self, genre):
+        return []
+
+    def iter_titles(self, genre, after=-1):
+        return iter(())
+
+    def count(self, genre):
+        return 0
+
+    def children(self):
+        return []
+
+    def iter_children(self, after=-1):
+        return iter(())
+
+    def children_count(self):
+        return 0
+
+    def favorites(self):
+        return ()
+
+
+_EMPTY_MAPPING = MappingProxyType({})
+EMPTY_STORE = EmptyTitleStore()
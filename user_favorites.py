@@ -0,0 +1,250 @@
+import mmap
+import os
+import shutil
+import tempfile
+from bisect import bisect_right
+from zlib import crc32
+
+# Для каждого номера бита: таблица байт -> 1, если бит установлен, иначе 0.
+# bytes.translate по такой таблице и count(1) считают биты колонки на уровне C.
+_BIT_TABLES = [bytes((value >> bit) & 1 for value in range(256)) for bit in range(8)]
+
+
+def _scan_columns(view, rows, stride, columns):
+    """Для каждой колонки - номера строк (пользователей шарда), у которых бит установлен."""
+    result = []
+    for column in columns:
+        byte, bit = divmod(column, 8)
+        flags = view[byte:rows * stride:stride].translate(_BIT_TABLES[bit])
+        rows_with_bit = []
+        position = flags.find(1)
+        while position >= 0:
+            rows_with_bit.append(position)
+            position = flags.find(1, position + 1)
+        result.append(rows_with_bit)
+    return result
+
+
+def _count_columns(view, rows, stride, columns):
+    """Число установленных битов в каждой колонке."""
+    return [view[column >> 3:rows * stride:stride].translate(_BIT_TABLES[column & 7]).count(1)
+            for column in columns]
+
+
+def _in_file(function, path, rows, stride, columns):
+    """
+    Выполняется в процессе пула: применяет function к файлу сегмента шарда.
+    Страницы MAP_SHARED, записанные основным процессом, видны сразу, без msync.
+    """
+    with open(path, 'rb') as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            return function(view, rows, stride, columns)
+
+
+class _Segment:
+    """
+    Группа колонок шарда: по stride байт на строку (пользователя)
+    в файле, отображенном через mmap.
+    """
+
+    def __init__(self, path, stride, capacity):
+        self.path = path
+        self.stride = stride
+        self._file = open(path, 'w+b')
+        self._map = None
+        self.resize(capacity)
+
+    def resize(self, capacity):
+        # Файл растет через truncate: новые байты заполняет нулями система, строки не копируются
+        self._file.truncate(capacity * self.stride)
+        if self._map is not None:
+            self._map.close()
+        self._map = mmap.mmap(self._file.fileno(), capacity * self.stride)
+
+    def set_bit(self, row, column, value):
+        position = row * self.stride + (column >> 3)
+        if value:
+            self._map[position] |= 1 << (column & 7)
+        else:
+            self._map[position] &= ~(1 << (column & 7)) & 0xFF
+
+    def apply(self, function, rows, columns):
+        """Применяет function к отображению этого процесса, не открывая файл заново."""
+        return function(self._map, rows, self.stride, columns)
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+class _Shard:
+    """
+    Группа пользователей. Биты избранного лежат в сегментах колонок
+    (см. UserFavorites), порядок добавления - в словаре на строку.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.rows = {}  # Пользователь -> номер строки
+        self.users = []  # Номер строки -> пользователь
+        self.orders = []  # Номер строки -> {колонка: None} в порядке добавления
+        self.segments = []
+        self._capacity = 64
+
+    def add_segment(self, stride):
+        path = f'{self.path}.{len(self.segments)}.bits'
+        self.segments.append(_Segment(path, stride, self._capacity))
+
+    def row(self, user, create=False):
+        row = self.rows.get(user)
+        if row is None and create:
+            row = self.rows[user] = len(self.users)
+            self.users.append(user)
+            self.orders.append({})
+            if row >= self._capacity:
+                self._capacity *= 2
+                for segment in self.segments:
+                    segment.resize(self._capacity)
+        return row
+
+    def close(self):
+        for segment in self.segments:
+            segment.close()
+
+
+class UserFavorites:
+    """
+    Избранное для множества пользователей поверх одной коллекции.
+    Семантика как у add_*_to_favorites / delete_* / get_*favorites*:
+    добавить можно только название из коллекции, повторное добавление
+    и удаление отсутствующего ничего не делают.
+    - Пользователи распределяются по шардам по стабильному хешу
+    - Избранное пользователя - строка битов над таблицей названий,
+      шарды хранятся в файлах, отображенных через mmap
+    - Запросы по многим пользователям (count_users, users_with_favorite)
+      выполняются по шардам параллельно в executor (например,
+      ProcessPoolExecutor): процессы читают шарды через mmap без копирования
+    - Новые колонки добавляются сегментом: каждый следующий сегмент вдвое
+      шире предыдущего, и уже записанные строки не переписываются
+    Избранное пользователя возвращается в порядке добавления этим пользователем.
+    """
+
+    FIRST_STRIDE = 8  # Ширина первого сегмента в байтах (64 колонки)
+
+    def __init__(self, collector, shards=4, executor=None, directory=None):
+        self._collector = collector
+        self._executor = executor
+        self._directory = tempfile.mkdtemp(prefix='user_favorites_', dir=directory)
+        self._columns = {}  # Название -> номер колонки
+        self._titles = []  # Номер колонки -> название
+        self._firsts = []  # Первая колонка каждого сегмента
+        self._strides = []  # Ширина каждого сегмента в байтах
+        self._shards = [_Shard(os.path.join(self._directory, f'shard{number}')) for number in range(shards)]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        for shard in self._shards:
+            shard.close()
+        shutil.rmtree(self._directory, ignore_errors=True)
+
+    def _shard(self, user):
+        return self._shards[crc32(str(user).encode('utf-8')) % len(self._shards)]
+
+    def _column(self, name):
+        column = self._columns.get(name)
+        if column is None:
+            column = self._columns[name] = len(self._titles)
+            self._titles.append(name)
+            if not self._firsts or column >= self._firsts[-1] + self._strides[-1] * 8:
+                # Колонки кончились: новый сегмент вдвое шире, старые не трогаются
+                stride = self._strides[-1] * 2 if self._strides else self.FIRST_STRIDE
+                self._firsts.append(column)
+                self._strides.append(stride)
+                for shard in self._shards:
+                    shard.add_segment(stride)
+        return column
+
+    def _locate(self, column):
+        # Номер сегмента и колонка внутри него
+        segment = bisect_right(self._firsts, column) - 1
+        return segment, column - self._firsts[segment]
+
+    def add_to_favorites(self, user, name):
+        if name in self._collector:
+            shard = self._shard(user)
+            column = self._column(name)
+            row = shard.row(user, create=True)
+            order = shard.orders[row]
+            if column not in order:
+                order[column] = None
+                segment, local = self._locate(column)
+                shard.segments[segment].set_bit(row, local, True)
+
+    def remove_from_favorites(self, user, name):
+        shard = self._shard(user)
+        row = shard.row(user)
+        column = self._columns.get(name)
+        if row is not None and column is not None and column in shard.orders[row]:
+            del shard.orders[row][column]
+            segment, local = self._locate(column)
+            shard.segments[segment].set_bit(row, local, False)
+
+    def get_favorites(self, user):
+        shard = self._shard(user)
+        row = shard.row(user)
+        if row is None:
+            return []
+        return [self._titles[column] for column in shard.orders[row]]
+
+    def count_users(self, names):
+        """Сколько пользователей добавили в избранное каждое из названий: {название: число}."""
+        names = list(names)
+        columns = [self._columns[name] for name in names if name in self._columns]
+        totals = [0] * len(columns)
+        for counts in self._map_shards(_count_columns, columns):
+            totals = [total + count for total, count in zip(totals, counts)]
+        counted = dict(zip((name for name in names if name in self._columns), totals))
+        return {name: counted.get(name, 0) for name in names}
+
+    def users_with_favorite(self, name):
+        """Пользователи, у которых название в избранном."""
+        column = self._columns.get(name)
+        if column is None:
+            return []
+        users = []
+        for shard, (rows,) in zip(self._shards, self._map_shards(_scan_columns, [column])):
+            users.extend(shard.users[row] for row in rows)
+        return users
+
+    def _map_shards(self, function, columns):
+        """
+        Выполняет function по каждому сегменту каждого шарда с запрошенными
+        колонками; возвращает для каждого шарда результаты в порядке columns.
+        """
+        groups = {}  # Сегмент -> [(индекс в columns, колонка внутри сегмента)]
+        for index, column in enumerate(columns):
+            segment, local = self._locate(column)
+            groups.setdefault(segment, []).append((index, local))
+        tasks = []  # (номер шарда, индексы в columns, сегмент, колонки внутри сегмента)
+        for number, shard in enumerate(self._shards):
+            for segment, pairs in groups.items():
+                tasks.append((number, [index for index, _ in pairs], shard.segments[segment],
+                              [local for _, local in pairs]))
+        if self._executor is None:
+            outputs = [segment.apply(function, len(self._shards[number].users), local)
+                       for number, _, segment, local in tasks]
+        else:
+            futures = [self._executor.submit(_in_file, function, segment.path, len(self._shards[number].users),
+                                             segment.stride, local)
+                       for number, _, segment, local in tasks]
+            outputs = [future.result() for future in futures]
+        results = [[None] * len(columns) for _ in self._shards]
+        for (number, indexes, _, _), output in zip(tasks, outputs):
+            for index, value in zip(indexes, output):
+                results[number][index] = value
+        return results